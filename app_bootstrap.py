@@ -3,19 +3,32 @@
 """
 公共引导模块：按后端(PySide2/PySide6)启动应用，负责 DB 就绪、样式加载与事件循环。
 放在项目根目录，避免大规模改动 import 路径。
+
+启动时只导入必需模块：requests 仅在需要下载数据库时导入，Qt 与主窗口在 run_app 内导入。
+
+调试开关（命令行参数，启动后从 sys.argv 中移除）：
+    --debug-imports        首个窗口显示后打印启动耗时与导入耗时排行（类似 python -X importtime）
+    --startup-budget=毫秒   首个窗口显示后立即退出；耗时超出预算时退出码为 1
+                           （tests/test_startup.py 以此做启动回归检查，发布流程中运行）
 """
 
 from __future__ import annotations
 
 import hashlib
+import sqlite3
 import sys
+import time
 from pathlib import Path
-from typing import Literal, Optional
-
-import requests
+from typing import TYPE_CHECKING, Any, List, Literal, Optional, Tuple
 
 import config
 
+if TYPE_CHECKING:
+    from core.diagnostics.import_timer import ImportTimer
+
+# 进程内可测到的最早时间点，作为启动耗时的起点
+_STARTED_AT = time.perf_counter()
+
 
 def _sha256_file(path: Path) -> str:
     """计算本地文件的 SHA256（用于下载后校验完整性）"""
@@ -30,6 +43,8 @@ def _download_db(db_path: Path, url: str, expected_sha256: Optional[str] = None)
     """
     下载数据库到本地；如提供 expected_sha256 则进行校验
     """
+    import requests
+
     resp = requests.get(url, stream=True, timeout=30)
     resp.raise_for_status()
     tmp = db_path.with_suffix(".downloading")
@@ -42,22 +57,71 @@ def _download_db(db_path: Path, url: str, expected_sha256: Optional[str] = None)
         if actual.lower() != expected_sha256.lower():
             tmp.unlink(missing_ok=True)
             raise ValueError(f"DB 校验失败：期望 {expected_sha256}，实际 {actual}")
+    # 数据完整性校验：有 error 级问题（干支与公元不符、必填列为空等）的版本不予接受
+    from core.diagnostics.integrity import SEVERITY_ERROR, check_database
+    try:
+        report = check_database(tmp)
+    except sqlite3.DatabaseError as e:
+        # 下载到的不是有效的 SQLite 文件（如被截断、或是错误页面）
+        tmp.unlink(missing_ok=True)
+        raise ValueError(f"DB 数据校验失败：无法读取数据库（{e}）") from e
+    if not report.ok:
+        tmp.unlink(missing_ok=True)
+        errors = [f"{f.description} {f.count} 行" for f in report.findings if f.severity == SEVERITY_ERROR and f.count]
+        raise ValueError(f"DB 数据校验失败：{'；'.join(errors)}")
     tmp.replace(db_path)
 
 
+def _parse_debug_flags(argv: List[str]) -> Tuple[bool, Optional[float], List[str]]:
+    """取出调试开关，返回 (是否打印导入报告, 启动预算毫秒, 其余参数)"""
+    debug_imports = False
+    budget_ms: Optional[float] = None
+    rest: List[str] = []
+    for arg in argv:
+        if arg == "--debug-imports":
+            debug_imports = True
+        elif arg.startswith("--startup-budget="):
+            budget_ms = float(arg.split("=", 1)[1])
+        else:
+            rest.append(arg)
+    return debug_imports, budget_ms, rest
+
+
+def _on_first_window(
+    app: Any, timer: ImportTimer, debug_imports: bool, budget_ms: Optional[float]
+) -> None:
+    """首个窗口显示后：停止导入计时、打印报告；设置了启动预算时按结果退出"""
+    from core.diagnostics.import_timer import format_startup_report
+
+    elapsed_ms = (time.perf_counter() - _STARTED_AT) * 1000
+    timer.uninstall()
+    for line in format_startup_report(timer if debug_imports else None, elapsed_ms, budget_ms):
+        print(f"[STARTUP] {line}")
+    if budget_ms is not None:
+        app.exit(0 if elapsed_ms <= budget_ms else 1)
+
+
 def run_app(ui_backend: Literal["pyside2", "pyside6"]) -> None:
     """
     启动应用：根据 ui_backend 选择 PySide2 / PySide6。
     仅作为入口脚本的调度函数被调用。
     """
+    debug_imports, budget_ms, argv = _parse_debug_flags(sys.argv)
+    timer = None
+    if debug_imports or budget_ms is not None:
+        from core.diagnostics.import_timer import ImportTimer
+        timer = ImportTimer().install()
+
     if ui_backend == "pyside6":
         # —— PySide6 路径（Win10/11）——
+        from PySide6.QtCore import QTimer
         from PySide6.QtWidgets import QApplication
         from PySide6.QtGui import QIcon
         from ui_pyside6.main_window import MainWindow
         is_py6 = True
     else:
         # —— PySide2 路径（Win7）——
+        from PySide2.QtCore import QTimer
         from PySide2.QtWidgets import QApplication
         from PySide2.QtGui import QIcon
         from ui_pyside2.main_window import MainWindow
@@ -72,7 +136,7 @@ def run_app(ui_backend: Literal["pyside2", "pyside6"]) -> None:
         print("[INFO] 数据库下载完成。")
 
     # —— 初始化 Qt 应用、加载样式和图标 ——
-    app = QApplication(sys.argv)
+    app = QApplication(argv)
 
     try:
         app.setStyle("Fusion")
@@ -94,6 +158,10 @@ def run_app(ui_backend: Literal["pyside2", "pyside6"]) -> None:
     win.resize(1000, 650)
     win.show()
 
+    if timer is not None:
+        # 事件队列中的首帧绘制等事件处理完后才触发，即首个窗口真正显示出来的时刻
+        QTimer.singleShot(0, lambda: _on_first_window(app, timer, debug_imports, budget_ms))
+
     # —— 事件循环 ——
     if is_py6:
         sys.exit(app.exec())
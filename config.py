@@ -1,7 +1,9 @@
 """
 配置：常量定义
 """
+import os
 from pathlib import Path
+from typing import Optional
 
 # 项目根目录
 BASE_DIR = Path(__file__).parent
@@ -26,4 +28,26 @@ HIGHCONTRAST_STYLE_QSS: Path = BASE_DIR / "resources" / "style_highcontrast.qss"
 SOLARIZED_STYLE_QSS: Path = BASE_DIR / "resources" / "style_solarized.qss"
 
 # 应用程序图标路径
-ICON_PATH: Path = BASE_DIR / "resources" / "logo.ico"
\ No newline at end of file
+ICON_PATH: Path = BASE_DIR / "resources" / "logo.ico"
+
+# 本地缓存目录（查询结果缓存等），Windows 下位于 %LOCALAPPDATA%\ShiJian
+CACHE_DIR: Path = Path(os.environ.get("LOCALAPPDATA") or Path.home() / ".cache") / "ShiJian"
+
+# 跨会话查询结果缓存
+QUERY_CACHE_ENABLED: bool = True
+QUERY_CACHE_PATH: Path = CACHE_DIR / "query_cache.db"
+QUERY_CACHE_MAX_BYTES: int = 8 * 1024 * 1024
+
+# 索引旁路文件：优先使用年表库同目录（打包时预先生成）的文件，
+# 该目录只读或文件失效时在本地缓存目录重建
+INDEX_SIDECAR_ENABLED: bool = True
+INDEX_SIDECAR_FALLBACK_DIR: Path = CACHE_DIR
+
+# 按年份查询后在后台预取前后各若干年，逐年翻看时即时显示
+YEAR_PREFETCH_RADIUS: int = 5
+
+# 低内存模式：大结果集分页流式显示、缩小内存缓存、内存紧张时释放可重建的索引。
+# None 表示自动判断（32 位进程启用）；MEMORY_BUDGET_MB 为常驻内存预算
+LOW_MEMORY_MODE: Optional[bool] = None
+MEMORY_BUDGET_MB: int = 384
+LOW_MEMORY_PAGE_ROWS: int = 1000
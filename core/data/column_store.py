@@ -0,0 +1,124 @@
+# core/data/column_store.py
+# -*- coding: utf-8 -*-
+"""
+列式内存快照：把 history_chronology 一次性读入按列存放的数组，
+提供公元有序索引（二分定位区间）与各文本列的“取值 -> 行号”倒排表，
+供查询优化器、统计与校验等需要整表扫描的功能使用。
+"""
+from __future__ import annotations
+
+import bisect
+import sqlite3
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from core.diagnostics.perf_recorder import PERF, PHASE_MATERIALIZE
+from core.models.history_entry import HistoryEntry
+
+# 文本列（与 ChronologyRepository.TEXT_COLUMNS 一致）
+STORE_TEXT_COLUMNS: Tuple[str, ...] = ("干支", "时期", "政权", "帝号", "帝名", "年号")
+
+
+class ColumnStore:
+    """
+    按行序（rowid 升序）保存的列式快照，行号 i 即各列数组下标。
+    构建后只读，可在线程间共享。
+    """
+
+    def __init__(
+        self,
+        rowids: Sequence[int],
+        years: Sequence[int],
+        regnal_years: Sequence[Optional[float]],
+        text: Dict[str, List[Optional[str]]],
+    ) -> None:
+        self.rowids = array("q", rowids)
+        self.years = array("i", years)
+        self.regnal_years: List[Optional[float]] = list(regnal_years)
+        self.text: Dict[str, List[Optional[str]]] = text
+        n = len(self.years)
+
+        # 公元索引：若行序已按公元升序（正常数据如此），直接在 years 上二分
+        if all(self.years[i] <= self.years[i + 1] for i in range(n - 1)):
+            self._year_order: Optional[array] = None
+            self._sorted_years = self.years
+        else:
+            order = sorted(range(n), key=lambda i: self.years[i])
+            self._year_order = array("i", order)
+            self._sorted_years = array("i", (self.years[i] for i in order))
+
+        self._postings: Dict[str, Dict[str, array]] = {}
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[sqlite3.Row]) -> "ColumnStore":
+        """由包含 row_id 列的数据库行构建"""
+        rowids: List[int] = []
+        years: List[int] = []
+        regnal: List[Optional[float]] = []
+        text: Dict[str, List[Optional[str]]] = {c: [] for c in STORE_TEXT_COLUMNS}
+        for row in rows:
+            rowids.append(row["row_id"])
+            years.append(row["公元"])
+            regnal.append(row["年份"])
+            for c in STORE_TEXT_COLUMNS:
+                text[c].append(row[c])
+        return cls(rowids, years, regnal, text)
+
+    def __len__(self) -> int:
+        return len(self.years)
+
+    # ---------- 索引 ----------
+    def year_range(self, lo: Optional[int], hi: Optional[int]) -> List[int]:
+        """公元在 [lo, hi] 内的行号（升序），O(log n + k)"""
+        start = 0 if lo is None else bisect.bisect_left(self._sorted_years, lo)
+        end = len(self._sorted_years) if hi is None else bisect.bisect_right(self._sorted_years, hi)
+        if start >= end:
+            return []
+        if self._year_order is None:
+            return list(range(start, end))
+        return sorted(self._year_order[start:end])
+
+    def count_year_range(self, lo: Optional[int], hi: Optional[int]) -> int:
+        start = 0 if lo is None else bisect.bisect_left(self._sorted_years, lo)
+        end = len(self._sorted_years) if hi is None else bisect.bisect_right(self._sorted_years, hi)
+        return max(0, end - start)
+
+    def postings(self, column: str) -> Dict[str, array]:
+        """文本列倒排表：取值 -> 行号数组（空值不入表），首次访问时构建"""
+        table = self._postings.get(column)
+        if table is None:
+            lists: Dict[str, List[int]] = {}
+            for i, v in enumerate(self.text[column]):
+                if v:
+                    lists.setdefault(v, []).append(i)
+            table = {v: array("i", idx) for v, idx in lists.items()}
+            self._postings[column] = table
+        return table
+
+    # ---------- 行访问 ----------
+    def value(self, column: str, i: int) -> Optional[str]:
+        return self.text[column][i]
+
+    def entry(self, i: int) -> HistoryEntry:
+        return HistoryEntry(
+            year_ad=self.years[i],
+            ganzhi=self.text["干支"][i],
+            period=self.text["时期"][i],
+            regime=self.text["政权"][i],
+            emperor_title=self.text["帝号"][i],
+            emperor_name=self.text["帝名"][i],
+            reign_title=self.text["年号"][i],
+            regnal_year=self.regnal_years[i],
+        )
+
+    def entries(self, rows: Iterable[int]) -> List[HistoryEntry]:
+        with PERF.phase(PHASE_MATERIALIZE):
+            return [self.entry(i) for i in rows]
+
+    def order_by_year(self, rows: Iterable[int]) -> List[int]:
+        """按 公元, 年份 排序（与 SQL 中 ORDER BY 公元, 年份 一致，空序年在前）"""
+        regnal = self.regnal_years
+        return sorted(
+            rows,
+            key=lambda i: (self.years[i], regnal[i] is not None, regnal[i] or 0.0, i),
+        )
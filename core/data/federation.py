@@ -0,0 +1,206 @@
+# core/data/federation.py
+# -*- coding: utf-8 -*-
+"""
+多数据集联合查询：在 history_chronology 之外登记其它纪年数据库（日本、朝鲜年号表等），
+按年份或关键字查询时同时查询全部数据集，合并结果并标注来源。
+
+- 主数据集（界面使用的年表库）在调用线程中直接查询，与未登记其它数据集时完全相同；
+- 其它每个数据集各有一个专用工作线程，连接在该线程中打开（SQLite 连接不可跨线程），
+  与主数据集并行查询；
+- 结果按公元排序合并（稳定排序：同一年内先主数据集，再按登记顺序）；
+- 某个附加数据集查询失败（文件缺失、表或列不符、公元列不是整数等）时不影响其它数据集，
+  其结果照常返回，失败的数据集与错误信息另行列出；主数据集出错时照常抛出异常。
+
+数据集清单可写在 JSON 文件中：
+    [{"name": "日本年号", "db": "jp.db", "table": "nengo",
+      "columns": {"公元": "seireki", "年号": "gengo", "帝号": "tenno", "年份": "nen"},
+      "constants": {"政权": "日本"}}]
+相对路径相对于清单文件所在目录。
+
+    python -m core.data.federation --datasets datasets.json (--year 645 | --keyword 大化)
+"""
+from __future__ import annotations
+
+import json
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from core.data.repository import ChronologyRepository
+from core.data.schema_mapping import STANDARD_TABLE, SchemaMapping
+from core.models.history_entry import HistoryEntry
+
+# 主数据集的来源名
+PRIMARY_DATASET = "中华甲子历史年表"
+
+
+@dataclass
+class DatasetSpec:
+    """一个附加数据集：来源名、数据库路径与到标准列的映射"""
+    name: str
+    db_path: Path
+    schema: SchemaMapping = field(default_factory=SchemaMapping)
+
+
+class SourcedEntry(NamedTuple):
+    """带来源标注的条目"""
+    source: str
+    entry: HistoryEntry
+
+
+class FederatedResult(NamedTuple):
+    """联合查询结果：按公元合并的条目，以及查询失败的附加数据集（来源名 -> 错误信息）"""
+    entries: List[SourcedEntry]
+    failed: Dict[str, str]
+
+
+class _Dataset:
+    """附加数据集的专用工作线程；仓库在该线程中首次查询时打开"""
+
+    def __init__(self, spec: DatasetSpec) -> None:
+        self.spec = spec
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"dataset-{spec.name}")
+        self._repo: Optional[ChronologyRepository] = None
+
+    def submit(self, query: Callable[[ChronologyRepository], List[HistoryEntry]]) -> "Future[List[HistoryEntry]]":
+        return self._executor.submit(self._run, query)
+
+    def close(self) -> None:
+        # 连接须在打开它的线程中关闭
+        self._executor.submit(self._close)
+        self._executor.shutdown(wait=True)
+
+    def _run(self, query: Callable[[ChronologyRepository], List[HistoryEntry]]) -> List[HistoryEntry]:
+        if self._repo is None:
+            self._repo = ChronologyRepository(self.spec.db_path, self.spec.schema)
+        entries = query(self._repo)
+        # 映射到公元的源列可能是文本：能转成整数的就地转换，否则整个数据集视为失败，不进入合并排序
+        for e in entries:
+            if not isinstance(e.year_ad, int):
+                try:
+                    e.year_ad = int(e.year_ad)
+                except (TypeError, ValueError):
+                    raise ValueError(f"公元列不是整数：{e.year_ad!r}") from None
+        return entries
+
+    def _close(self) -> None:
+        if self._repo is not None:
+            self._repo.close()
+            self._repo = None
+
+
+class FederatedRepository:
+    """主数据集仓库 + 若干附加数据集；未登记附加数据集时查询只访问主数据集"""
+
+    def __init__(self, primary: ChronologyRepository, primary_name: str = PRIMARY_DATASET) -> None:
+        self._primary = primary
+        self._primary_name = primary_name
+        self._datasets: Dict[str, _Dataset] = {}
+
+    @property
+    def names(self) -> List[str]:
+        return [self._primary_name, *self._datasets]
+
+    def register(self, spec: DatasetSpec) -> None:
+        if spec.name == self._primary_name or spec.name in self._datasets:
+            raise ValueError(f"数据集名称重复：{spec.name}")
+        self._datasets[spec.name] = _Dataset(spec)
+
+    def unregister(self, name: str) -> None:
+        dataset = self._datasets.pop(name, None)
+        if dataset is not None:
+            dataset.close()
+
+    def close(self) -> None:
+        """关闭附加数据集（主数据集仓库由其创建者关闭）"""
+        for name in list(self._datasets):
+            self.unregister(name)
+
+    # ---------- 查询 ----------
+    def get_entries_by_year(self, year: int) -> FederatedResult:
+        return self._fan_out(lambda repo: repo.get_entries_by_year(year))
+
+    def search_entries(self, keyword: str) -> FederatedResult:
+        return self._fan_out(lambda repo: repo.search_entries(keyword))
+
+    def _fan_out(self, query: Callable[[ChronologyRepository], List[HistoryEntry]]) -> FederatedResult:
+        """附加数据集先提交到各自线程，主数据集随即在当前线程查询，最后按公元合并"""
+        pending: List[Tuple[str, Future]] = [(name, d.submit(query)) for name, d in self._datasets.items()]
+        merged = [SourcedEntry(self._primary_name, e) for e in query(self._primary)]
+        failed: Dict[str, str] = {}
+        if not pending:
+            return FederatedResult(merged, failed)
+        for name, future in pending:
+            try:
+                entries = future.result()
+            except Exception as exc:
+                # 附加数据集的任何错误都只记入 failed，不影响主数据集与其它数据集
+                failed[name] = str(exc)
+                continue
+            merged.extend(SourcedEntry(name, e) for e in entries)
+        merged.sort(key=lambda s: s.entry.year_ad)
+        return FederatedResult(merged, failed)
+
+
+def load_datasets(path: str | Path) -> List[DatasetSpec]:
+    """读取 JSON 数据集清单；格式错误时抛出 ValueError"""
+    path = Path(path)
+    try:
+        items = json.loads(path.read_text(encoding="utf-8"))
+        specs = []
+        for item in items:
+            db_path = Path(item["db"])
+            specs.append(DatasetSpec(
+                name=item["name"],
+                db_path=db_path if db_path.is_absolute() else path.parent / db_path,
+                schema=SchemaMapping(
+                    table=item.get("table", STANDARD_TABLE),
+                    columns=item.get("columns", {}),
+                    constants=item.get("constants", {}),
+                ),
+            ))
+    except (KeyError, TypeError, json.JSONDecodeError) as exc:
+        raise ValueError(f"数据集清单格式错误：{path}（{exc}）") from exc
+    return specs
+
+
+def _main(argv: Optional[Sequence[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="在年表与附加纪年数据集中联合查询")
+    parser.add_argument("--datasets", required=True, help="JSON 数据集清单")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--year", type=int, help="公元年份")
+    group.add_argument("--keyword", help="关键字")
+    parser.add_argument("--db", help="年表数据库路径，缺省使用 config.DB_PATH")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        db_path = Path(args.db)
+    else:
+        import config
+        db_path = config.DB_PATH
+
+    repo = ChronologyRepository(db_path)
+    federation = FederatedRepository(repo)
+    try:
+        for spec in load_datasets(args.datasets):
+            federation.register(spec)
+        if args.year is not None:
+            result = federation.get_entries_by_year(args.year)
+        else:
+            result = federation.search_entries(args.keyword)
+        for source, entry in result.entries:
+            print("\t".join((source, *entry.display_row())))
+        for name, error in result.failed.items():
+            print(f"数据集“{name}”查询失败：{error}", file=sys.stderr)
+    finally:
+        federation.close()
+        repo.close()
+    return 1 if result.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main())
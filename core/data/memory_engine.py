@@ -0,0 +1,106 @@
+# core/data/memory_engine.py
+# -*- coding: utf-8 -*-
+"""
+内存查询引擎：在 ColumnStore 上实现与 ChronologyRepository 相同的
+按年份、关键字、高级搜索三种查询，结果（含顺序）应与 SQLite 路径完全一致：
+
+- 文本条件对每列的去重取值做子串匹配，再经倒排表展开为行号，
+  不逐行比较字符串；
+- 关键字检索按 (命中部分序号, 公元, 年份, rowid) 排序并按 (公元, 干支, 帝号, 年号) 去重，
+  与 iter_search_rows 的语句一致；
+- 简繁变体与组合关键字拆分沿用仓库的实现，保证检索词相同。
+
+是否真正等价由 core.diagnostics.equivalence 随机对比验证。
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from core.data.column_store import STORE_TEXT_COLUMNS, ColumnStore
+from core.data.repository import ChronologyRepository
+from core.models.history_entry import HistoryEntry
+
+# 高级搜索参数名 -> 列名
+ADVANCED_COLUMNS: Dict[str, str] = {
+    "ganzhi": "干支",
+    "period": "时期",
+    "regime": "政权",
+    "emperor_title": "帝号",
+    "emperor_name": "帝名",
+    "reign_title": "年号",
+}
+
+
+class MemoryEngine:
+    """ColumnStore 上的查询实现，接口与 ChronologyRepository 的同名方法一致"""
+
+    def __init__(self, store: ColumnStore, repo: ChronologyRepository) -> None:
+        self._store = store
+        # 只用于关键字拆分与简繁变体，不再访问数据库
+        self._repo = repo
+
+    @classmethod
+    def from_repository(cls, repo: ChronologyRepository) -> "MemoryEngine":
+        return cls(ColumnStore.from_rows(repo.iter_all_rows()), repo)
+
+    # ---------- 查询 ----------
+    def get_entries_by_year(self, year: int) -> List[HistoryEntry]:
+        store = self._store
+        return store.entries(store.order_by_year(store.year_range(year, year)))
+
+    def search_entries(self, keyword: str) -> List[HistoryEntry]:
+        store = self._store
+        # 行号 -> 首次命中的部分序号
+        part_rank: Dict[int, int] = {}
+        for rank, part in enumerate(self._repo.keyword_parts(keyword)):
+            variants = self._repo.text_variants(part)
+            for column in STORE_TEXT_COLUMNS:
+                for i in self._matching_rows(column, variants):
+                    part_rank.setdefault(i, rank)
+        regnal = store.regnal_years
+        ordered = sorted(
+            part_rank,
+            key=lambda i: (part_rank[i], store.years[i], regnal[i] is not None, regnal[i] or 0.0, i),
+        )
+        seen: Set[Tuple[int, Optional[str], Optional[str], Optional[str]]] = set()
+        rows: List[int] = []
+        for i in ordered:
+            key = (store.years[i], store.text["干支"][i], store.text["帝号"][i], store.text["年号"][i])
+            if key not in seen:
+                seen.add(key)
+                rows.append(i)
+        return store.entries(rows)
+
+    def advanced_query(
+        self,
+        *,
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+        **criteria: Optional[str],
+    ) -> List[HistoryEntry]:
+        store = self._store
+        rows: Optional[Set[int]] = None
+        if year_from is not None or year_to is not None:
+            rows = set(store.year_range(year_from, year_to))
+        for name, column in ADVANCED_COLUMNS.items():
+            value = criteria.get(name)
+            if not value or rows == set():
+                continue
+            variants: Set[str] = set()
+            for part in self._repo.keyword_parts(value):
+                variants |= self._repo.text_variants(part)
+            matched = set(self._matching_rows(column, variants))
+            rows = matched if rows is None else rows & matched
+        if rows is None:
+            rows = set(range(len(store)))
+        return store.entries(store.order_by_year(rows))
+
+    # ---------- 内部 ----------
+    def _matching_rows(self, column: str, variants: Iterable[str]) -> List[int]:
+        """取值包含任一变体（子串）的行号；与 LIKE '%变体%' 一致，空值不命中"""
+        variants = [v for v in variants if v]
+        out: List[int] = []
+        for value, rows in self._store.postings(column).items():
+            if any(v in value for v in variants):
+                out.extend(rows)
+        return out
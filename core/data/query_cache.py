@@ -0,0 +1,375 @@
+# core/data/query_cache.py
+# -*- coding: utf-8 -*-
+"""
+跨会话的查询结果缓存：内存 LRU + 本地 SQLite 旁路库（不写入只读的年表库）。
+
+- 缓存键为 查询类型 + 规范化参数 + 年表库内容哈希，年表库内容变化后旧结果自然失效，
+  打开旁路库时发现库哈希不同会整体清空；
+- 每次读取时比对年表库文件的大小与修改时间，变化时重新计算哈希并清空缓存；
+- 旁路库按总字节数上限淘汰最久未使用的结果；命中时的最近使用时间批量写回，读取不逐次提交；
+- warm_up() 在后台线程计算哈希、打开旁路库，并把最近使用的结果预先载入内存；
+  预热完成前只使用内存层，不阻塞界面。
+
+缓存只是加速手段：旁路库损坏或无法写入时自动重建或停用磁盘层，不影响查询本身。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.models.history_entry import HistoryEntry
+
+# 旁路库默认总大小上限
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+# 内存层保留的结果数
+DEFAULT_MEMORY_ITEMS = 64
+# 预热时载入内存的最近结果数
+WARM_LOAD_ITEMS = 32
+# 命中时的最近使用时间先记在内存里，攒够该条数（或写入结果、关闭时）再一次写回旁路库
+TOUCH_FLUSH_ITEMS = 32
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    key       TEXT PRIMARY KEY,
+    payload   BLOB NOT NULL,
+    size      INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_last_used ON results(last_used);
+"""
+
+
+def file_sha256(path: str | Path) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _encode(entries: List[HistoryEntry]) -> bytes:
+    rows = [
+        [e.year_ad, e.ganzhi, e.period, e.regime, e.emperor_title,
+         e.emperor_name, e.reign_title, e.regnal_year]
+        for e in entries
+    ]
+    return zlib.compress(json.dumps(rows, ensure_ascii=False).encode("utf-8"))
+
+
+def _decode(payload: bytes) -> List[HistoryEntry]:
+    return [HistoryEntry(*row) for row in json.loads(zlib.decompress(payload).decode("utf-8"))]
+
+
+class QueryCache:
+    """
+    查询结果缓存。db_path 为年表库路径（用于计算内容哈希），cache_path 为旁路库路径。
+    可在线程间共享：旁路库连接与内存层都由同一把锁保护。
+    """
+
+    def __init__(
+        self,
+        db_path: str | Path,
+        cache_path: str | Path,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        memory_items: int = DEFAULT_MEMORY_ITEMS,
+    ) -> None:
+        self._db_path = Path(db_path)
+        self._cache_path = Path(cache_path)
+        self._max_bytes = max_bytes
+        self._memory_items = memory_items
+        self._lock = threading.RLock()
+        self._memory: "OrderedDict[str, List[HistoryEntry]]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_hash: Optional[str] = None
+        self._db_stat: Optional[Tuple[int, int]] = None
+        # 待写回的最近使用时间：旁路库键 -> 时间
+        self._pending_touch: Dict[str, float] = {}
+        self._ready = threading.Event()
+        self._warmer: Optional[threading.Thread] = None
+        self.hits = 0
+        self.misses = 0
+
+    # ---------- 生命周期 ----------
+    def warm_up(self) -> None:
+        """后台打开旁路库并预载最近结果；重复调用无副作用"""
+        if self._warmer is not None or self._ready.is_set():
+            return
+        self._warmer = threading.Thread(target=self.open, name="query-cache-warm-up", daemon=True)
+        self._warmer.start()
+
+    def open(self) -> None:
+        """同步打开旁路库（warm_up 的后台线程即调用此方法）"""
+        if self._ready.is_set():
+            return
+        # 哈希计算不持锁，期间界面线程仍可使用内存层
+        try:
+            stat, db_hash = self._stat(), file_sha256(self._db_path)
+        except OSError:
+            self._ready.set()
+            return
+        with self._lock:
+            if self._ready.is_set():
+                return
+            self._db_stat, self._db_hash = stat, db_hash
+            try:
+                self._open_side_db()
+                self._warm_load()
+            except (OSError, sqlite3.Error):
+                # 磁盘层不可用时只保留内存层
+                self._close_side_db()
+            finally:
+                self._ready.set()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._flush_touches()
+                    self._conn.commit()
+                except sqlite3.Error:
+                    pass
+            self._close_side_db()
+            self._memory.clear()
+
+    @property
+    def persistent(self) -> bool:
+        """磁盘层是否可用"""
+        return self._conn is not None
+
+    # ---------- 读写 ----------
+    @staticmethod
+    def make_key(kind: str, params: Optional[Dict[str, Any]]) -> str:
+        """查询类型 + 规范化参数（键排序、去掉空值）"""
+        clean = {k: v for k, v in (params or {}).items() if v not in (None, "")}
+        return f"{kind}:{json.dumps(clean, ensure_ascii=False, sort_keys=True)}"
+
+    def get(self, kind: str, params: Optional[Dict[str, Any]] = None) -> Optional[List[HistoryEntry]]:
+        key = self.make_key(kind, params)
+        with self._lock:
+            self._check_db_changed()
+            entries = self._memory.get(key)
+            if entries is not None:
+                self._memory.move_to_end(key)
+                self._touch(key)
+            elif self._conn is not None:
+                entries = self._load(key)
+                if entries is not None:
+                    self._remember(key, entries)
+            if entries is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return list(entries)
+
+    def put(self, kind: str, params: Optional[Dict[str, Any]], entries: List[HistoryEntry]) -> None:
+        key = self.make_key(kind, params)
+        with self._lock:
+            self._remember(key, list(entries))
+            if self._conn is None:
+                return
+            payload = _encode(entries)
+            if len(payload) > self._max_bytes // 4:
+                return  # 单个结果过大（如整表）时不落盘
+            try:
+                self._flush_touches()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO results(key, payload, size, last_used) VALUES (?, ?, ?, ?)",
+                    (self._disk_key(key), payload, len(payload), time.time()),
+                )
+                self._evict()
+                self._conn.commit()
+            except sqlite3.Error:
+                self._close_side_db()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                try:
+                    self._conn.execute("DELETE FROM results")
+                    self._conn.commit()
+                except sqlite3.Error:
+                    self._close_side_db()
+
+    def trim_memory(self) -> None:
+        """只丢弃内存层（内存紧张时），旁路库中的结果保留，下次命中时再读回"""
+        with self._lock:
+            self._memory.clear()
+
+    def disk_usage(self) -> Tuple[int, int]:
+        """(旁路库中的结果数, 总字节数)"""
+        with self._lock:
+            if self._conn is None:
+                return 0, 0
+            count, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+            return int(count), int(size)
+
+    def stats(self) -> Dict[str, int]:
+        """命中 / 未命中次数、内存层结果数与旁路库占用，供诊断面板显示"""
+        disk_items, disk_bytes = self.disk_usage()
+        with self._lock:
+            memory_items = len(self._memory)
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "memory_items": memory_items,
+            "disk_items": disk_items,
+            "disk_bytes": disk_bytes,
+        }
+
+    # ---------- 内部 ----------
+    def _disk_key(self, key: str) -> str:
+        return f"{self._db_hash}:{key}"
+
+    def _remember(self, key: str, entries: List[HistoryEntry]) -> None:
+        self._memory[key] = entries
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._memory_items:
+            self._memory.popitem(last=False)
+
+    def _stat(self) -> Tuple[int, int]:
+        st = os.stat(self._db_path)
+        return st.st_size, st.st_mtime_ns
+
+    def _refresh_db_hash(self) -> None:
+        self._db_stat = self._stat()
+        self._db_hash = file_sha256(self._db_path)
+
+    def _check_db_changed(self) -> None:
+        """年表库文件变化时重新计算哈希；内容确有变化则清空缓存"""
+        if self._db_stat is None:
+            return
+        try:
+            stat = self._stat()
+        except OSError:
+            return
+        if stat == self._db_stat:
+            return
+        old_hash = self._db_hash
+        self._refresh_db_hash()
+        if self._db_hash != old_hash:
+            self._memory.clear()
+            if self._conn is not None:
+                self._reset_side_db()
+
+    def _open_side_db(self) -> None:
+        self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            self._conn = self._connect()
+        except sqlite3.DatabaseError:
+            # 旁路库损坏：删除后重建
+            self._cache_path.unlink()
+            self._conn = self._connect()
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'db_hash'").fetchone()
+        if row is None or row[0] != self._db_hash:
+            self._reset_side_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self._cache_path), check_same_thread=False)
+        try:
+            # 缓存可随时重建，不必为持久性付出同步写盘的代价
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.executescript(_SCHEMA)
+        except sqlite3.Error:
+            # 先关闭连接，否则 Windows 上文件仍被占用，无法删除重建
+            conn.close()
+            raise
+        return conn
+
+    def _reset_side_db(self) -> None:
+        assert self._conn is not None
+        self._pending_touch.clear()
+        self._conn.execute("DELETE FROM results")
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta(key, value) VALUES ('db_hash', ?)", (self._db_hash,)
+        )
+        self._conn.commit()
+
+    def _close_side_db(self) -> None:
+        self._pending_touch.clear()
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+            self._conn = None
+
+    def _load(self, key: str) -> Optional[List[HistoryEntry]]:
+        assert self._conn is not None
+        try:
+            row = self._conn.execute(
+                "SELECT payload FROM results WHERE key = ?", (self._disk_key(key),)
+            ).fetchone()
+            if row is None:
+                return None
+            self._touch(key)
+            return _decode(row[0])
+        except (sqlite3.Error, ValueError, zlib.error):
+            return None
+
+    def _touch(self, key: str) -> None:
+        """记下最近使用时间，攒够 TOUCH_FLUSH_ITEMS 条才写回旁路库"""
+        if self._conn is None:
+            return
+        self._pending_touch[self._disk_key(key)] = time.time()
+        if len(self._pending_touch) < TOUCH_FLUSH_ITEMS:
+            return
+        try:
+            self._flush_touches()
+            self._conn.commit()
+        except sqlite3.Error:
+            self._close_side_db()
+
+    def _flush_touches(self) -> None:
+        """把待写回的最近使用时间批量写入（由调用方提交）"""
+        if self._pending_touch and self._conn is not None:
+            self._conn.executemany(
+                "UPDATE results SET last_used = ? WHERE key = ?",
+                [(t, k) for k, t in self._pending_touch.items()],
+            )
+            self._pending_touch.clear()
+
+    def _evict(self) -> None:
+        """超出总大小上限时，按最近使用时间从旧到新删除"""
+        assert self._conn is not None
+        (total,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()
+        if total <= self._max_bytes:
+            return
+        doomed: List[str] = []
+        for key, size in self._conn.execute("SELECT key, size FROM results ORDER BY last_used"):
+            doomed.append(key)
+            total -= size
+            if total <= self._max_bytes:
+                break
+        self._conn.executemany("DELETE FROM results WHERE key = ?", [(k,) for k in doomed])
+
+    def _warm_load(self) -> None:
+        """把最近使用的若干结果载入内存层（旧的在前，保持 LRU 顺序）"""
+        assert self._conn is not None
+        prefix = f"{self._db_hash}:"
+        rows = self._conn.execute(
+            "SELECT key, payload FROM results ORDER BY last_used DESC LIMIT ?",
+            (min(WARM_LOAD_ITEMS, self._memory_items),),
+        ).fetchall()
+        for disk_key, payload in reversed(rows):
+            key = disk_key[len(prefix):]
+            if key not in self._memory:
+                try:
+                    self._memory[key] = _decode(payload)
+                except (ValueError, zlib.error):
+                    continue
+        while len(self._memory) > self._memory_items:
+            self._memory.popitem(last=False)
@@ -1,103 +1,278 @@
 # core/data/repository.py
 # -*- coding: utf-8 -*-
 """
-数据访问层：封装 SQLite 查询，支持简繁体混合检索（基于 OpenCC 纯 Python 实现）
+数据访问层：封装 SQLite 查询，支持简繁体混合检索（基于 OpenCC 纯 Python 实现）。
+OpenCC 在首次做简繁转换时才导入，按年份查询等路径不受其加载耗时影响。
 """
 from __future__ import annotations
 
 import sqlite3
+import time
 from pathlib import Path
-from typing import Iterable, List, Optional, Set, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
-from opencc import OpenCC
+from core.data.schema_mapping import SchemaMapping
+from core.diagnostics.perf_recorder import PERF, PHASE_MATERIALIZE
 from core.models.history_entry import HistoryEntry
 
 
+# 旧版 SQLite（Win7 / Python 3.8 自带）单条语句最多 999 个参数
+_MAX_SQL_PARAMS = 900
+
+# 可做文本检索的列
+TEXT_COLUMNS: Tuple[str, ...] = ("干支", "帝号", "帝名", "年号", "时期", "政权")
+
+# 内置的组合关键字别名：别名 -> 依次检索的各部分（查找时会做简繁转换）
+DEFAULT_KEYWORD_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "東周（春秋）": ("東周", "春秋"),
+    "東周（戰國）": ("東周", "戰國"),
+}
+
+
 class ChronologyRepository:
     """负责所有数据库读取操作，支持简繁体互转查询"""
 
-    def __init__(self, db_path: str | Path) -> None:
+    def __init__(self, db_path: str | Path, schema: Optional[SchemaMapping] = None) -> None:
+        self.db_path = Path(db_path)
         self._conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
         self._conn.row_factory = sqlite3.Row
-        # 预创建 OpenCC 转换器，避免在热路径频繁构造
-        self._cc_s2t = OpenCC("s2t")  # 简 → 繁
-        self._cc_t2s = OpenCC("t2s")  # 繁 → 简
+        # 非标准结构的数据集：映射为同名临时视图
+        if schema is not None:
+            schema.install(self._conn)
+        # OpenCC 转换器（简 → 繁，繁 → 简），首次使用时创建一次，避免在热路径频繁构造
+        self._converters: Optional[Tuple[Any, Any]] = None
+        # 组合关键字别名表，首次检索时加载
+        self._keyword_aliases: Optional[Dict[str, List[str]]] = None
+        # 预先算好的简繁变体（如来自索引旁路文件），命中时不必导入 OpenCC
+        self._known_variants: Dict[str, Set[str]] = {}
 
     @staticmethod
-    def _rows_to_entries(rows: Iterable[sqlite3.Row]) -> List[HistoryEntry]:
-        out: List[HistoryEntry] = []
-        for row in rows:
-            period = row["时期"] if "时期" in row.keys() else ""
-            regime = row["政权"] if "政权" in row.keys() else ""
-            out.append(HistoryEntry(
-                year_ad=row["公元"],
-                ganzhi=row["干支"],
-                period=period,
-                regime=regime,
-                emperor_title=row["帝号"],
-                emperor_name=row["帝名"],
-                reign_title=row["年号"],
-                regnal_year=row["年份"],
-            ))
-        return out
+    def _row_to_entry(row: sqlite3.Row) -> HistoryEntry:
+        period = row["时期"] if "时期" in row.keys() else ""
+        regime = row["政权"] if "政权" in row.keys() else ""
+        return HistoryEntry(
+            year_ad=row["公元"],
+            ganzhi=row["干支"],
+            period=period,
+            regime=regime,
+            emperor_title=row["帝号"],
+            emperor_name=row["帝名"],
+            reign_title=row["年号"],
+            regnal_year=row["年份"],
+        )
+
+    @classmethod
+    def _rows_to_entries(cls, rows: Iterable[sqlite3.Row]) -> List[HistoryEntry]:
+        return list(cls._materialize(rows))
+
+    @classmethod
+    def _materialize(cls, rows: Iterable[sqlite3.Row]) -> Iterator[HistoryEntry]:
+        """
+        逐行构造 HistoryEntry；诊断面板记录中时，单独累计构造耗时（与游标读取交错，
+        只统计构造本身），否则直接映射
+        """
+        if not PERF.active:
+            yield from map(cls._row_to_entry, rows)
+            return
+        spent = 0.0
+        clock = time.perf_counter
+        try:
+            for row in rows:
+                started = clock()
+                entry = cls._row_to_entry(row)
+                spent += clock() - started
+                yield entry
+        finally:
+            PERF.add_phase_time(PHASE_MATERIALIZE, spent)
 
     def _generate_variants(self, text: str) -> Set[str]:
         """
         使用 OpenCC 生成简体/繁体变体。
         如需更激进的召回，可追加 s2tw / s2hk 的转换结果。
         """
+        known = self._known_variants.get(text)
+        if known is not None:
+            return set(known)
         variants: Set[str] = {text}
         try:
-            variants.add(self._cc_s2t.convert(text))  # 简 → 繁
-            variants.add(self._cc_t2s.convert(text))  # 繁 → 简
+            if self._converters is None:
+                from opencc import OpenCC
+                self._converters = (OpenCC("s2t"), OpenCC("t2s"))
+            s2t, t2s = self._converters
+            variants.add(s2t.convert(text))  # 简 → 繁
+            variants.add(t2s.convert(text))  # 繁 → 简
         except Exception:
             # 转换失败不影响查询流程
             pass
         return variants
 
+    def text_variants(self, text: str) -> Set[str]:
+        """对外暴露的简繁变体生成，供业务层做名称匹配"""
+        return self._generate_variants(text)
+
+    def preload_variants(self, variants: Dict[str, Set[str]]) -> None:
+        """登记预先算好的简繁变体（原文 -> 含原文的变体集合）"""
+        self._known_variants.update(variants)
+
+    def _load_keyword_aliases(self) -> Dict[str, List[str]]:
+        """
+        组合关键字别名表：内置默认值，库中存在 keyword_alias(alias, part, ord) 表时以其内容补充 / 覆盖。
+        别名按原文登记，查找时再做简繁转换，因此每个别名只需登记一种写法。
+        """
+        aliases: Dict[str, List[str]] = {k: list(v) for k, v in DEFAULT_KEYWORD_ALIASES.items()}
+        try:
+            rows = self._conn.execute(
+                "SELECT alias, part FROM keyword_alias ORDER BY alias, ord"
+            ).fetchall()
+        except sqlite3.OperationalError:
+            # 旧版数据库无此表
+            return aliases
+        loaded: Dict[str, List[str]] = {}
+        for alias, part in rows:
+            loaded.setdefault(alias, []).append(part)
+        aliases.update(loaded)
+        return aliases
+
     def _split_keyword(self, keyword: str) -> List[str]:
-        mapping = {
-            "東周（春秋）": ["東周", "春秋"], "东周（春秋）": ["东周", "春秋"],
-            "東周（戰國）": ["東周", "戰國"], "东周（战国）": ["东周", "战国"],
-        }
-        return mapping.get(keyword, [keyword])
+        """按别名表拆分组合关键字（如“东周（春秋）”），非别名原样返回"""
+        if self._keyword_aliases is None:
+            self._keyword_aliases = self._load_keyword_aliases()
+        parts = self._keyword_aliases.get(keyword)
+        if parts is None and keyword:
+            for variant in self._generate_variants(keyword):
+                parts = self._keyword_aliases.get(variant)
+                if parts is not None:
+                    break
+        return list(parts) if parts is not None else [keyword]
 
     def get_entries_by_year(self, year: int) -> List[HistoryEntry]:
+        return list(self.iter_entries_by_year(year))
+
+    def iter_entries_by_year(self, year: int) -> Iterator[HistoryEntry]:
         cur = self._conn.execute(
             "SELECT * FROM history_chronology WHERE 公元 = ? ORDER BY 年份",
             (year,),
         )
-        return self._rows_to_entries(cur.fetchall())
+        yield from self._materialize(cur)
+
+    def iter_entries_by_year_range(self, year_from: int, year_to: int) -> Iterator[HistoryEntry]:
+        """
+        公元在 [year_from, year_to] 内的条目，按 公元, 年份 排序；
+        同一年内的顺序与 iter_entries_by_year 一致，供一次取回若干相邻年份
+        """
+        cur = self._conn.execute(
+            "SELECT * FROM history_chronology WHERE 公元 BETWEEN ? AND ? ORDER BY 公元, 年份, rowid",
+            (year_from, year_to),
+        )
+        yield from self._materialize(cur)
+
+    def iter_all_entries(self) -> Iterator[HistoryEntry]:
+        """按行序流式遍历全表（行序即公元升序），不一次性载入内存"""
+        yield from self._materialize(self.iter_all_rows())
+
+    def iter_all_rows(self) -> Iterator[sqlite3.Row]:
+        """按行序流式读取全表原始行（含 row_id 列）"""
+        yield from self._conn.execute(
+            "SELECT rowid AS row_id, * FROM history_chronology ORDER BY rowid"
+        )
+
+    def count_all(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM history_chronology").fetchone()[0]
+
+    def distinct_values(self, column: str) -> List[str]:
+        """某文本列的全部非空去重取值"""
+        if column not in TEXT_COLUMNS:
+            raise ValueError(f"不支持的列：{column}")
+        cur = self._conn.execute(
+            f"SELECT DISTINCT {column} FROM history_chronology "
+            f"WHERE {column} IS NOT NULL AND {column} != ''"
+        )
+        return [row[0] for row in cur]
+
+    def get_entries_by_values(self, values_by_column: Dict[str, Iterable[str]]) -> List[HistoryEntry]:
+        """按列精确匹配若干取值（各列之间为“或”关系）"""
+        conditions: List[str] = []
+        params: List[str] = []
+        for column, values in values_by_column.items():
+            if column not in TEXT_COLUMNS:
+                raise ValueError(f"不支持的列：{column}")
+            values = list(values)
+            if values:
+                conditions.append(f"{column} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+        if not conditions:
+            return []
+        sql = f"SELECT * FROM history_chronology WHERE {' OR '.join(conditions)} ORDER BY 公元, 年份"
+        return self._rows_to_entries(self._conn.execute(sql, tuple(params)))
 
     def search_entries(self, keyword: str) -> List[HistoryEntry]:
-        keywords = self._split_keyword(keyword)
-        all_results: List[HistoryEntry] = []
+        return list(self.iter_search_entries(keyword))
+
+    def iter_search_entries(self, keyword: str) -> Iterator[HistoryEntry]:
+        """
+        关键字检索的流式版本：逐行读取游标，按 (公元, 干支, 帝号, 年号) 去重
+        """
+        yield from self._materialize(self.iter_search_rows(keyword))
+
+    def keyword_parts(self, keyword: str) -> List[str]:
+        """组合关键字拆分后的各部分（按检索顺序），非别名时即关键字本身"""
+        return list(self._split_keyword(keyword))
+
+    def keyword_variants(self, keyword: str) -> Set[str]:
+        """关键字拆分（如“东周（春秋）”）并做简繁扩展后的全部检索词"""
+        out: Set[str] = set()
+        for key in self._split_keyword(keyword):
+            out |= self._generate_variants(key)
+        return out
+
+    def iter_search_rows(self, keyword: str) -> Iterator[sqlite3.Row]:
+        """
+        关键字检索的原始行（含 row_id 列），去重规则同 search_entries；
+        供需要在构造 HistoryEntry 之前处理结果的调用方使用。
+
+        组合关键字的各部分 × 简繁变体编译为一条语句，每行只返回一次：
+        part_rank 为行首次命中的部分序号，结果按 part_rank, 公元, 年份 排序，
+        与逐部分检索再拼接的顺序一致。读取游标时按 (公元, 干支, 帝号, 年号) 去重，
+        被丢弃的行不会构造 HistoryEntry。
+        （库内用窗口函数去重实测比在游标上去重更慢，故不采用。）
+        """
+        part_conditions: List[str] = []
+        params: List[str] = []
+        for part in self._split_keyword(keyword):
+            likes: List[str] = []
+            for var in sorted(self._generate_variants(part)):
+                for col in TEXT_COLUMNS:
+                    likes.append(f"{col} LIKE ?")
+                    params.append(f"%{var}%")
+            part_conditions.append(f"({' OR '.join(likes)})")
+
+        rank_sql = " ".join(f"WHEN {cond} THEN {i}" for i, cond in enumerate(part_conditions))
+        sql = (
+            f"SELECT * FROM ("
+            f"SELECT rowid AS row_id, *, CASE {rank_sql} END AS part_rank FROM history_chronology"
+            f") WHERE part_rank IS NOT NULL ORDER BY part_rank, 公元, 年份, row_id"
+        )
         seen_keys: Set[Tuple[int, str, str, str]] = set()
+        for row in self._conn.execute(sql, tuple(params)):
+            unique_key = (row["公元"], row["干支"], row["帝号"], row["年号"])
+            if unique_key not in seen_keys:
+                seen_keys.add(unique_key)
+                yield row
 
-        for key in keywords:
-            variants = self._generate_variants(key)
-            text_cols = ["干支", "帝号", "帝名", "年号", "时期", "政权"]
-            conditions: List[str] = []
-            params: List[str] = []
-            for var in variants:
-                like = f"%{var}%"
-                for col in text_cols:
-                    conditions.append(f"{col} LIKE ?")
-                    params.append(like)
-            where_sql = " OR ".join(conditions)
-            sql = f"SELECT * FROM history_chronology WHERE {where_sql} ORDER BY 公元, 年份"
-            cur = self._conn.execute(sql, tuple(params))
-            results = self._rows_to_entries(cur.fetchall())
-
-            for entry in results:
-                unique_key = (entry.year_ad, entry.ganzhi, entry.emperor_title, entry.reign_title)
-                if unique_key not in seen_keys:
-                    seen_keys.add(unique_key)
-                    all_results.append(entry)
-
-        return all_results
+    def get_entries_by_rowids(self, rowids: List[int]) -> List[HistoryEntry]:
+        """按 rowid 取条目，结果顺序与 rowids 一致"""
+        rows: Dict[int, sqlite3.Row] = {}
+        for i in range(0, len(rowids), _MAX_SQL_PARAMS):
+            chunk = rowids[i:i + _MAX_SQL_PARAMS]
+            sql = (
+                f"SELECT rowid AS row_id, * FROM history_chronology "
+                f"WHERE rowid IN ({', '.join('?' * len(chunk))})"
+            )
+            for row in self._conn.execute(sql, tuple(chunk)):
+                rows[row["row_id"]] = row
+        return self._rows_to_entries(rows[rid] for rid in rowids if rid in rows)
 
-    def advanced_query(
+    def _advanced_where(
         self,
         *,
         year_from: Optional[int] = None,
@@ -108,7 +283,8 @@ class ChronologyRepository:
         emperor_title: str | None = None,
         emperor_name: str | None = None,
         reign_title: str | None = None,
-    ) -> List[HistoryEntry]:
+    ) -> Tuple[str, Tuple[object, ...]]:
+        """把高级搜索条件编译为 WHERE 子句与参数"""
         conditions: List[str] = []
         params: List[object] = []
 
@@ -143,9 +319,41 @@ class ChronologyRepository:
             add_text_condition("年号", reign_title)
 
         where_sql = " AND ".join(conditions) if conditions else "1"
+        return where_sql, tuple(params)
+
+    def advanced_query(
+        self,
+        *,
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+        ganzhi: str | None = None,
+        period: str | None = None,
+        regime: str | None = None,
+        emperor_title: str | None = None,
+        emperor_name: str | None = None,
+        reign_title: str | None = None,
+    ) -> List[HistoryEntry]:
+        return list(self.iter_advanced_query(
+            year_from=year_from,
+            year_to=year_to,
+            ganzhi=ganzhi,
+            period=period,
+            regime=regime,
+            emperor_title=emperor_title,
+            emperor_name=emperor_name,
+            reign_title=reign_title,
+        ))
+
+    def iter_advanced_query(self, **criteria: object) -> Iterator[HistoryEntry]:
+        """高级搜索的流式版本，参数同 advanced_query"""
+        where_sql, params = self._advanced_where(**criteria)
         sql = f"SELECT * FROM history_chronology WHERE {where_sql} ORDER BY 公元, 年份"
-        cur = self._conn.execute(sql, tuple(params))
-        return self._rows_to_entries(cur.fetchall())
+        yield from self._materialize(self._conn.execute(sql, params))
+
+    def count_advanced_query(self, **criteria: object) -> int:
+        where_sql, params = self._advanced_where(**criteria)
+        sql = f"SELECT COUNT(*) FROM history_chronology WHERE {where_sql}"
+        return self._conn.execute(sql, params).fetchone()[0]
 
     def close(self) -> None:
         self._conn.close()
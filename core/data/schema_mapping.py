@@ -0,0 +1,73 @@
+# core/data/schema_mapping.py
+# -*- coding: utf-8 -*-
+"""
+其它纪年数据库（日本、朝鲜年号表或另一版中国年表）到 history_chronology 标准列的映射。
+在该库的只读连接上建一个同名临时视图，仓库中的全部查询语句无需修改即可使用。
+"""
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+# 标准表名与列名（与 history_chronology 一致）
+STANDARD_TABLE = "history_chronology"
+STANDARD_COLUMNS = ("公元", "干支", "时期", "政权", "帝号", "帝名", "年号", "年份")
+
+
+def _quote_ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _quote_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+@dataclass
+class SchemaMapping:
+    """
+    table：源表名；columns：标准列名 -> 源列名（None 表示该列为空）；
+    constants：标准列名 -> 固定取值（如 政权 = "日本"）。
+    未提及的标准列若源表中有同名列则直接使用，否则为空
+    """
+    table: str = STANDARD_TABLE
+    columns: Dict[str, Optional[str]] = field(default_factory=dict)
+    constants: Dict[str, str] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        unknown = (set(self.columns) | set(self.constants)) - set(STANDARD_COLUMNS)
+        if unknown:
+            raise ValueError(f"未知的标准列：{'、'.join(sorted(unknown))}")
+
+    @property
+    def is_identity(self) -> bool:
+        return self.table == STANDARD_TABLE and not self.columns and not self.constants
+
+    def select_list(self, source_columns: List[str]) -> List[str]:
+        """视图的列表达式：rowid 沿用源表行号，使按行序读取与按 rowid 取条目照常工作"""
+        present = set(source_columns)
+        exprs = ["rowid AS rowid"]
+        for col in STANDARD_COLUMNS:
+            if col in self.constants:
+                expr = _quote_literal(self.constants[col])
+            elif col in self.columns:
+                src = self.columns[col]
+                if src is not None and src not in present:
+                    raise ValueError(f"源表 {self.table} 中没有列 {src}")
+                expr = _quote_ident(src) if src is not None else "NULL"
+            else:
+                expr = _quote_ident(col) if col in present else "NULL"
+            exprs.append(f"{expr} AS {col}")
+        return exprs
+
+    def install(self, conn: sqlite3.Connection) -> None:
+        """在连接上建立标准名临时视图（临时库中的同名对象优先于主库）"""
+        if self.is_identity:
+            return
+        source_columns = [row[1] for row in conn.execute(f"PRAGMA main.table_info({_quote_ident(self.table)})")]
+        if not source_columns:
+            raise ValueError(f"数据库中没有表 {self.table}")
+        conn.execute(
+            f"CREATE TEMP VIEW {STANDARD_TABLE} AS "
+            f"SELECT {', '.join(self.select_list(source_columns))} FROM main.{_quote_ident(self.table)}"
+        )
@@ -0,0 +1,314 @@
+# core/diagnostics/equivalence.py
+# -*- coding: utf-8 -*-
+"""
+查询引擎等价性对比：随机生成年份、关键字与高级搜索组合，
+分别交给参照实现（ChronologyRepository 的 SQLite 路径）与候选引擎执行，
+逐条比较有序结果，并报告各类查询的吞吐比。
+
+任何替代后端（内存、索引、全文检索、快照等）上线前都应在此通过对比：
+    python -m core.diagnostics.equivalence --engine memory -n 2000 --seed 7
+
+关键字取自库中各列的真实取值（含简繁两种写法）、取值的子串、
+组合关键字别名（如“东周（春秋）”）以及拼接出的不存在的词；
+高级搜索随机组合公元区间与一至三个文本条件。
+候选引擎只需提供与仓库同名的 get_entries_by_year / search_entries / advanced_query。
+"""
+from __future__ import annotations
+
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from core.data.column_store import STORE_TEXT_COLUMNS, ColumnStore
+from core.data.memory_engine import ADVANCED_COLUMNS
+from core.data.repository import DEFAULT_KEYWORD_ALIASES, ChronologyRepository
+from core.models.history_entry import HistoryEntry
+
+KIND_YEAR = "year"
+KIND_KEYWORD = "keyword"
+KIND_ADVANCED = "advanced"
+KIND_LABELS: Dict[str, str] = {KIND_YEAR: "按年份", KIND_KEYWORD: "关键字", KIND_ADVANCED: "高级搜索"}
+
+# 各类查询的生成比例
+DEFAULT_MIX: Dict[str, float] = {KIND_YEAR: 0.3, KIND_KEYWORD: 0.45, KIND_ADVANCED: 0.25}
+
+
+@dataclass
+class GeneratedQuery:
+    kind: str
+    params: Dict[str, Any]
+
+    def describe(self) -> str:
+        args = "，".join(f"{k}={v!r}" for k, v in self.params.items())
+        return f"{KIND_LABELS[self.kind]}({args})"
+
+
+def run_query(engine: Any, query: GeneratedQuery) -> List[HistoryEntry]:
+    """在任一引擎上执行生成的查询"""
+    if query.kind == KIND_YEAR:
+        return engine.get_entries_by_year(query.params["year"])
+    if query.kind == KIND_KEYWORD:
+        return engine.search_entries(query.params["keyword"])
+    return engine.advanced_query(**query.params)
+
+
+class QueryGenerator:
+    """按给定种子可复现地生成随机查询；取值来自列式快照"""
+
+    def __init__(self, store: ColumnStore, repo: ChronologyRepository, seed: Optional[int] = None) -> None:
+        self._store = store
+        self._repo = repo
+        self._rng = random.Random(seed)
+        self._years = (min(store.years), max(store.years)) if len(store) else (0, 0)
+        # 各列的去重取值，排序后抽样以保证可复现
+        self._values: Dict[str, List[str]] = {
+            c: sorted(store.postings(c)) for c in STORE_TEXT_COLUMNS
+        }
+        self._aliases: List[str] = sorted(DEFAULT_KEYWORD_ALIASES)
+
+    def generate(self, count: int, mix: Optional[Dict[str, float]] = None) -> List[GeneratedQuery]:
+        mix = mix or DEFAULT_MIX
+        kinds = list(mix)
+        weights = [mix[k] for k in kinds]
+        makers: Dict[str, Callable[[], GeneratedQuery]] = {
+            KIND_YEAR: self.year_query,
+            KIND_KEYWORD: self.keyword_query,
+            KIND_ADVANCED: self.advanced_query,
+        }
+        return [makers[k]() for k in self._rng.choices(kinds, weights, k=count)]
+
+    # ---------- 各类查询 ----------
+    def year_query(self) -> GeneratedQuery:
+        lo, hi = self._years
+        # 偶尔取范围外的年份与不存在的 0 年
+        year = self._rng.choice((0, lo - 1, hi + 1)) if self._rng.random() < 0.05 else self._rng.randint(lo, hi)
+        return GeneratedQuery(KIND_YEAR, {"year": year})
+
+    def keyword_query(self) -> GeneratedQuery:
+        return GeneratedQuery(KIND_KEYWORD, {"keyword": self._keyword(self._rng.choice(STORE_TEXT_COLUMNS))})
+
+    def advanced_query(self) -> GeneratedQuery:
+        rng = self._rng
+        params: Dict[str, Any] = {}
+        if rng.random() < 0.6:
+            lo, hi = self._years
+            a, b = sorted((rng.randint(lo, hi), rng.randint(lo, hi)))
+            if rng.random() < 0.5:
+                params["year_from"] = a
+            if rng.random() < 0.8 or not params:
+                params["year_to"] = b
+        for name in rng.sample(sorted(ADVANCED_COLUMNS), rng.randint(1, 3)):
+            params[name] = self._keyword(ADVANCED_COLUMNS[name], aliases=False)
+        return GeneratedQuery(KIND_ADVANCED, params)
+
+    # ---------- 取词 ----------
+    def _keyword(self, column: str, aliases: bool = True) -> str:
+        rng = self._rng
+        roll = rng.random()
+        if aliases and roll < 0.08:
+            word = rng.choice(self._aliases)
+        elif roll < 0.15:
+            # 两个取值的片段拼接，通常不存在
+            word = self._fragment(column) + self._fragment(rng.choice(STORE_TEXT_COLUMNS))
+        elif roll < 0.55:
+            word = self._fragment(column)
+        else:
+            word = self._value(column)
+        # 按一半概率换成另一种写法（简 / 繁）
+        variants = sorted(self._repo.text_variants(word))
+        return rng.choice(variants) if rng.random() < 0.5 else word
+
+    def _value(self, column: str) -> str:
+        values = self._values[column]
+        return self._rng.choice(values) if values else "甲子"
+
+    def _fragment(self, column: str) -> str:
+        value = self._value(column)
+        n = self._rng.randint(1, min(3, len(value)))
+        start = self._rng.randint(0, len(value) - n)
+        return value[start:start + n]
+
+
+@dataclass
+class Mismatch:
+    query: GeneratedQuery
+    reference_rows: int
+    candidate_rows: int
+    first_diff: int           # 第一处不同的下标
+    order_only: bool          # 条目集合相同、仅顺序不同
+
+    def describe(self) -> str:
+        what = "仅顺序不同" if self.order_only else "结果不同"
+        return (
+            f"{self.query.describe()}：{what}，参照 {self.reference_rows} 条 / "
+            f"候选 {self.candidate_rows} 条，首个差异位于第 {self.first_diff} 条"
+        )
+
+
+@dataclass
+class KindTiming:
+    queries: int = 0
+    reference_seconds: float = 0.0
+    candidate_seconds: float = 0.0
+
+    @property
+    def speedup(self) -> float:
+        """候选相对参照的吞吐倍数（>1 表示候选更快）"""
+        return self.reference_seconds / self.candidate_seconds if self.candidate_seconds else float("inf")
+
+
+@dataclass
+class EquivalenceReport:
+    engine: str
+    queries: int = 0
+    mismatches: List[Mismatch] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    timings: Dict[str, KindTiming] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not self.mismatches and not self.errors
+
+    def lines(self, show: int = 10) -> List[str]:
+        out = [f"候选引擎：{self.engine}，共 {self.queries} 条查询"]
+        out.append(f"{'类别':<8}{'条数':>6}{'参照 q/s':>12}{'候选 q/s':>12}{'倍数':>8}")
+        for kind, t in self.timings.items():
+            ref_qps = t.queries / t.reference_seconds if t.reference_seconds else float("inf")
+            cand_qps = t.queries / t.candidate_seconds if t.candidate_seconds else float("inf")
+            out.append(f"{KIND_LABELS[kind]:<8}{t.queries:>6}{ref_qps:>12.1f}{cand_qps:>12.1f}{t.speedup:>8.2f}")
+        if self.ok:
+            out.append("结果完全一致")
+            return out
+        out.append(f"不一致 {len(self.mismatches)} 条，出错 {len(self.errors)} 条：")
+        out.extend("  " + m.describe() for m in self.mismatches[:show])
+        out.extend("  " + e for e in self.errors[:show])
+        return out
+
+
+def _compare(query: GeneratedQuery, expected: List[HistoryEntry], actual: List[HistoryEntry]) -> Optional[Mismatch]:
+    if expected == actual:
+        return None
+    first = next(
+        (i for i, (a, b) in enumerate(zip(expected, actual)) if a != b),
+        min(len(expected), len(actual)),
+    )
+    order_only = len(expected) == len(actual) and sorted(expected, key=repr) == sorted(actual, key=repr)
+    return Mismatch(query, len(expected), len(actual), first, order_only)
+
+
+def compare_engines(
+    reference: Any,
+    candidate: Any,
+    queries: Sequence[GeneratedQuery],
+    *,
+    engine_name: str = "candidate",
+    repeat: int = 1,
+) -> EquivalenceReport:
+    """
+    先逐条比较结果（同时作为预热），再对每条查询交替计时两个引擎 repeat 次
+    """
+    report = EquivalenceReport(engine_name, len(queries))
+    for q in queries:
+        try:
+            expected = run_query(reference, q)
+            actual = run_query(candidate, q)
+        except Exception as exc:  # 候选引擎出错同样记为不一致，不中断对比
+            report.errors.append(f"{q.describe()}：{type(exc).__name__}: {exc}")
+            continue
+        mismatch = _compare(q, expected, actual)
+        if mismatch is not None:
+            report.mismatches.append(mismatch)
+
+    clock = time.perf_counter
+    for q in queries:
+        t = report.timings.setdefault(q.kind, KindTiming())
+        for _ in range(repeat):
+            try:
+                started = clock()
+                run_query(reference, q)
+                middle = clock()
+                run_query(candidate, q)
+                t.candidate_seconds += clock() - middle
+                t.reference_seconds += middle - started
+            except Exception:
+                break
+        t.queries += 1
+    # 各类别按固定顺序输出
+    report.timings = {k: report.timings[k] for k in KIND_LABELS if k in report.timings}
+    return report
+
+
+class CachedServiceEngine:
+    """把带查询缓存的 ChronologyService 包装为引擎接口，用于验证缓存往返（编码 / 解码）无损"""
+
+    def __init__(self, service: Any) -> None:
+        self._svc = service
+
+    def get_entries_by_year(self, year: int) -> List[HistoryEntry]:
+        return self._svc.get_chronology_by_year(year)
+
+    def search_entries(self, keyword: str) -> List[HistoryEntry]:
+        return self._svc.find_entries(keyword)
+
+    def advanced_query(self, **criteria: Any) -> List[HistoryEntry]:
+        return self._svc.advanced_search(**criteria)
+
+
+def _main(argv: Optional[Sequence[str]] = None) -> int:
+    import argparse
+    import tempfile
+    from pathlib import Path
+
+    parser = argparse.ArgumentParser(description="对比候选查询引擎与 SQLite 参照实现的结果与吞吐")
+    parser.add_argument("--engine", choices=("memory", "cache"), default="memory",
+                        help="memory：ColumnStore 内存引擎；cache：经查询缓存往返的服务层")
+    parser.add_argument("-n", "--count", type=int, default=1000, help="随机查询条数")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子，缺省随机")
+    parser.add_argument("--repeat", type=int, default=3, help="计时时每条查询的重复次数")
+    parser.add_argument("--show", type=int, default=10, help="最多列出的不一致条数")
+    parser.add_argument("--db", help="年表数据库路径，缺省使用 config.DB_PATH")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        db_path = args.db
+    else:
+        import config
+        db_path = config.DB_PATH
+    seed = args.seed if args.seed is not None else random.randrange(1 << 30)
+
+    reference = ChronologyRepository(db_path)
+    # 候选引擎使用独立连接，避免与参照共享游标状态
+    repo = ChronologyRepository(db_path)
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.engine == "memory":
+            from core.data.memory_engine import MemoryEngine
+            candidate: Any = MemoryEngine.from_repository(repo)
+        else:
+            from core.data.query_cache import QueryCache
+            from core.services.chronology_service import ChronologyService
+            # 不保留内存层，对比时的结果都从旁路库读出并解码
+            cache = QueryCache(db_path, Path(tmp) / "query_cache.db", memory_items=0)
+            cache.open()
+            candidate = CachedServiceEngine(ChronologyService(repo, cache))
+        try:
+            store = ColumnStore.from_rows(reference.iter_all_rows())
+            queries = QueryGenerator(store, reference, seed).generate(args.count)
+            if args.engine == "cache":
+                for q in queries:
+                    run_query(candidate, q)
+            report = compare_engines(reference, candidate, queries, engine_name=args.engine, repeat=args.repeat)
+        finally:
+            if args.engine == "cache":
+                cache.close()
+            repo.close()
+            reference.close()
+    print(f"随机种子：{seed}")
+    for line in report.lines(args.show):
+        print(line)
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(_main())
@@ -0,0 +1,136 @@
+# core/diagnostics/import_timer.py
+# -*- coding: utf-8 -*-
+"""
+导入耗时统计：效果类似 python -X importtime，但可在程序内按调试开关启用，
+并把结果整理为按累计耗时排序的报告，用于排查启动变慢的原因。
+
+原理：在 sys.meta_path 最前面插入一个查找器，只负责包装其它查找器返回的 loader，
+统计每个模块 exec_module 的耗时；嵌套导入的耗时计入父模块的累计值。
+"""
+from __future__ import annotations
+
+import importlib.abc
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+
+@dataclass
+class ImportRecord:
+    module: str
+    self_ms: float = 0.0
+    cumulative_ms: float = 0.0
+    depth: int = 0
+
+
+class _TimedLoader(importlib.abc.Loader):
+    """包装原 loader，计时 exec_module"""
+
+    def __init__(self, timer: "ImportTimer", loader: importlib.abc.Loader) -> None:
+        self._timer = timer
+        self._loader = loader
+
+    def create_module(self, spec):  # type: ignore[no-untyped-def]
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module) -> None:  # type: ignore[no-untyped-def]
+        if threading.get_ident() != self._timer._thread:
+            # 只统计安装计时器的线程（通常是主线程），后台线程的导入直接放行
+            self._loader.exec_module(module)
+            return
+        self._timer._enter(module.__name__)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._timer._leave(module.__name__)
+
+    def __getattr__(self, name: str):  # type: ignore[no-untyped-def]
+        # get_resource_reader / get_filename 等转交给原 loader
+        return getattr(self._loader, name)
+
+
+class ImportTimer(importlib.abc.MetaPathFinder):
+    """
+    导入计时器：install() 后新导入的模块都会被计时，uninstall() 停止计时。
+    已导入（在 sys.modules 中）的模块不会重复计时。
+    """
+
+    def __init__(self) -> None:
+        self.records: Dict[str, ImportRecord] = {}
+        self._stack: List[List[float]] = []   # 每层：[开始时间, 子模块累计耗时]
+        self._finding = False
+        self._thread: Optional[int] = None
+
+    # ---------- 安装 ----------
+    def install(self) -> "ImportTimer":
+        self._thread = threading.get_ident()
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+        return self
+
+    def uninstall(self) -> None:
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path=None, target=None):  # type: ignore[no-untyped-def]
+        if self._finding or threading.get_ident() != self._thread:
+            return None
+        self._finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                        spec.loader = _TimedLoader(self, spec.loader)
+                    return spec
+            return None
+        finally:
+            self._finding = False
+
+    # ---------- 计时 ----------
+    def _enter(self, name: str) -> None:
+        self.records.setdefault(name, ImportRecord(name, depth=len(self._stack)))
+        self._stack.append([time.perf_counter(), 0.0])
+
+    def _leave(self, name: str) -> None:
+        started, children = self._stack.pop()
+        elapsed = (time.perf_counter() - started) * 1000
+        rec = self.records[name]
+        rec.cumulative_ms += elapsed
+        rec.self_ms += elapsed - children
+        if self._stack:
+            self._stack[-1][1] += elapsed
+
+    # ---------- 报告 ----------
+    def top(self, n: int = 30) -> List[ImportRecord]:
+        """累计耗时最多的 n 个模块"""
+        return sorted(self.records.values(), key=lambda r: -r.cumulative_ms)[:n]
+
+    def total_ms(self) -> float:
+        """顶层导入的总耗时"""
+        return sum(r.cumulative_ms for r in self.records.values() if r.depth == 0)
+
+    def report(self, n: int = 30) -> List[str]:
+        lines = [f"{'累计(ms)':>10} {'自身(ms)':>10}  模块"]
+        for rec in self.top(n):
+            lines.append(f"{rec.cumulative_ms:10.1f} {rec.self_ms:10.1f}  {'  ' * rec.depth}{rec.module}")
+        lines.append(f"导入总耗时：{self.total_ms():.1f} ms，共 {len(self.records)} 个模块")
+        return lines
+
+
+def format_startup_report(
+    timer: Optional[ImportTimer], first_window_ms: float, budget_ms: Optional[float] = None,
+    n: int = 30,
+) -> Sequence[str]:
+    """启动报告：首个窗口显示耗时、预算判断及导入耗时排行"""
+    lines = [f"首个窗口显示耗时：{first_window_ms:.1f} ms"]
+    if budget_ms is not None:
+        verdict = "未超出" if first_window_ms <= budget_ms else "超出"
+        lines.append(f"启动预算：{budget_ms:.0f} ms（{verdict}）")
+    if timer is not None:
+        lines.extend(timer.report(n))
+    return lines
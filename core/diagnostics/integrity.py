@@ -0,0 +1,455 @@
+# core/diagnostics/integrity.py
+# -*- coding: utf-8 -*-
+"""
+年表数据完整性校验：整表读入列式数组（文本列按取值编码为整数），
+每条规则对整列做一遍向量运算；安装了 NumPy 时用 NumPy，否则在 array 上逐行扫描，
+两种实现的结果完全一致。
+
+规则与严重程度：
+    error   —— 公元为 0、行序未按公元排列、干支与公元不符或无法识别、
+               必填列（干支 / 时期 / 政权）为空、在位序年不是正整数；
+    warning —— 同一年号（帝号）下序年跳号、中间缺行、同年重复行、
+               帝号 / 帝名 / 年号全空、同一政权连续多年并存多位君主；
+    info    —— 序年重新起算（复辟、再次即位）、各可空列的空值数。
+
+新版数据库下载后只要没有 error 级问题即可接受。发布流程（.github/workflows/release.yml）
+不加 --strict 运行，同样只有 error 会阻止发布——现有数据库仍有 warning 级问题
+（序年跳号、并存君主等，多为史实如此）；--strict 时 warning 也视为失败，供人工检查使用。
+
+    python -m core.diagnostics.integrity [--db 路径] [--json] [--strict] [--no-numpy]
+"""
+from __future__ import annotations
+
+import json
+import sys
+import time
+from array import array
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from core.data.column_store import ColumnStore
+
+SEVERITY_ERROR = "error"
+SEVERITY_WARNING = "warning"
+SEVERITY_INFO = "info"
+
+# 规则名 -> (严重程度, 说明)，报告按此顺序输出
+CHECKS: Dict[str, Tuple[str, str]] = {
+    "year_zero": (SEVERITY_ERROR, "公元为 0（历史纪年没有公元 0 年）"),
+    "year_order": (SEVERITY_ERROR, "行序未按公元升序排列"),
+    "required_null": (SEVERITY_ERROR, "干支 / 时期 / 政权 为空"),
+    "ganzhi_invalid": (SEVERITY_ERROR, "干支不是六十甲子之一"),
+    "ganzhi_mismatch": (SEVERITY_ERROR, "干支与公元年份不符"),
+    "regnal_invalid": (SEVERITY_ERROR, "在位序年不是正整数"),
+    "regnal_break": (SEVERITY_WARNING, "相邻两年的在位序年不连续"),
+    "regnal_gap": (SEVERITY_WARNING, "序年连续但中间缺少年份的行"),
+    "duplicate_row": (SEVERITY_WARNING, "同一政权、君主、年号在同一年重复出现"),
+    "ruler_missing": (SEVERITY_WARNING, "帝号、帝名、年号全部为空"),
+    "reign_overlap": (SEVERITY_WARNING, "同一政权连续多年并存多位君主"),
+    "regnal_restart": (SEVERITY_INFO, "隔年后在位序年重新起算（复辟或再次即位）"),
+    "regnal_null": (SEVERITY_INFO, "在位序年为空"),
+    "emperor_title_null": (SEVERITY_INFO, "帝号为空"),
+    "emperor_name_null": (SEVERITY_INFO, "帝名为空"),
+    "reign_title_null": (SEVERITY_INFO, "年号为空"),
+}
+
+DEFAULT_SAMPLES = 20
+
+_STEMS = "甲乙丙丁戊己庚辛壬癸"
+_BRANCHES = "子丑寅卯辰巳午未申酉戌亥"
+# 干支 -> 六十甲子序号（甲子为 0）
+SEXAGENARY: Dict[str, int] = {_STEMS[i % 10] + _BRANCHES[i % 12]: i for i in range(60)}
+
+# 区间合并键（与 build_reign_spans 一致）
+_SPAN_COLUMNS = ("政权", "时期", "帝号", "帝名", "年号")
+
+# 只报告数量、不列样例的规则
+_COUNT_ONLY = frozenset({"regnal_null", "emperor_title_null", "emperor_name_null", "reign_title_null"})
+
+_UNLOADED: Any = object()
+_np: Any = _UNLOADED
+
+
+def _numpy() -> Any:
+    """首次调用时导入 NumPy，未安装时返回 None"""
+    global _np
+    if _np is _UNLOADED:
+        try:
+            import numpy
+        except ImportError:  # 可选依赖
+            numpy = None
+        _np = numpy
+    return _np
+
+
+@dataclass
+class Finding:
+    """一条规则的校验结果；rowids 与 details 只保留前若干个样例"""
+    check: str
+    severity: str
+    description: str
+    count: int
+    rowids: List[int] = field(default_factory=list)
+    details: List[str] = field(default_factory=list)
+
+
+@dataclass
+class IntegrityReport:
+    db_path: str
+    db_sha256: Optional[str]
+    rows: int
+    backend: str
+    seconds: float
+    findings: List[Finding]
+
+    def count(self, severity: str) -> int:
+        return sum(f.count for f in self.findings if f.severity == severity)
+
+    @property
+    def ok(self) -> bool:
+        """没有 error 级问题"""
+        return self.count(SEVERITY_ERROR) == 0
+
+    def passes(self, strict: bool = False) -> bool:
+        return self.ok and not (strict and self.count(SEVERITY_WARNING))
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["summary"] = {s: self.count(s) for s in (SEVERITY_ERROR, SEVERITY_WARNING, SEVERITY_INFO)}
+        return data
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+    def lines(self) -> List[str]:
+        out = [
+            f"{self.db_path}：{self.rows} 行，{self.backend}，用时 {self.seconds * 1000:.0f} ms",
+        ]
+        for f in self.findings:
+            if not f.count:
+                continue
+            sample = f"（{'、'.join(f.details)}）" if f.details else ""
+            out.append(f"  [{f.severity}] {f.check}：{f.description}，{f.count} 行{sample}")
+        out.append(
+            f"error {self.count(SEVERITY_ERROR)}，warning {self.count(SEVERITY_WARNING)}，"
+            f"info {self.count(SEVERITY_INFO)}"
+        )
+        return out
+
+
+def _encode(values: Sequence[Optional[str]]) -> Tuple[array, List[str]]:
+    """字典编码：空值（None 或空串）编码为 -1"""
+    codes = array("i", bytes(4 * len(values)))
+    table: Dict[str, int] = {}
+    for i, v in enumerate(values):
+        codes[i] = table.setdefault(v, len(table)) if v else -1
+    return codes, list(table)
+
+
+class IntegrityChecker:
+    """
+    在 ColumnStore 上执行全部规则。use_numpy 为 None 时自动检测 NumPy。
+    各规则返回违规的行号（列数组下标，升序）。
+    """
+
+    def __init__(self, store: ColumnStore, use_numpy: Optional[bool] = None) -> None:
+        self._store = store
+        self._np = _numpy() if use_numpy is not False else None
+        self.n = len(store)
+        self._codes: Dict[str, array] = {}
+        self._values: Dict[str, List[str]] = {}
+        for column, values in store.text.items():
+            self._codes[column], self._values[column] = _encode(values)
+        # 天文纪年（公元前 1 年为 0），相邻年份之差即间隔年数
+        self._astro = array("i", (y + 1 if y < 0 else y for y in store.years))
+        if self._np is not None:
+            np = self._np
+            self._v_years = np.frombuffer(store.years, dtype=np.int32).astype(np.int64)
+            self._v_astro = np.frombuffer(self._astro, dtype=np.int32).astype(np.int64)
+            self._v_regnal = np.array(
+                [np.nan if v is None else v for v in store.regnal_years], dtype=np.float64
+            )
+            self._v_codes = {c: np.frombuffer(a, dtype=np.int32) for c, a in self._codes.items()}
+
+    @property
+    def backend(self) -> str:
+        return "NumPy" if self._np is not None else "array"
+
+    # ---------- 单列规则 ----------
+    def year_zero(self) -> List[int]:
+        if self._np is not None:
+            return self._np.flatnonzero(self._v_years == 0).tolist()
+        return [i for i, y in enumerate(self._store.years) if y == 0]
+
+    def year_order(self) -> List[int]:
+        if self._np is not None:
+            return (self._np.flatnonzero(self._v_years[1:] < self._v_years[:-1]) + 1).tolist()
+        years = self._store.years
+        return [i for i in range(1, self.n) if years[i] < years[i - 1]]
+
+    def required_null(self) -> List[int]:
+        columns = ("干支", "时期", "政权")
+        if self._np is not None:
+            mask = self._np.zeros(self.n, dtype=bool)
+            for c in columns:
+                mask |= self._v_codes[c] < 0
+            return self._np.flatnonzero(mask).tolist()
+        return [i for i in range(self.n) if any(self._codes[c][i] < 0 for c in columns)]
+
+    def _ganzhi_index(self) -> array:
+        """每行干支的六十甲子序号；空值为 -1，无法识别为 -2"""
+        lookup = [SEXAGENARY.get(v, -2) for v in self._values["干支"]]
+        codes = self._codes["干支"]
+        if self._np is not None:
+            table = self._np.array(lookup + [-1], dtype=self._np.int64)
+            # 空值编码 -1 恰好取到表尾的 -1
+            return table[self._np.frombuffer(codes, dtype=self._np.int32)]
+        return array("i", (lookup[c] if c >= 0 else -1 for c in codes))
+
+    def ganzhi_invalid(self) -> List[int]:
+        index = self._ganzhi_index()
+        if self._np is not None:
+            return self._np.flatnonzero(index == -2).tolist()
+        return [i for i, g in enumerate(index) if g == -2]
+
+    def ganzhi_mismatch(self) -> List[int]:
+        # 公元 4 年为甲子年
+        index = self._ganzhi_index()
+        if self._np is not None:
+            expected = (self._v_astro - 4) % 60
+            return self._np.flatnonzero((index >= 0) & (index != expected)).tolist()
+        astro = self._astro
+        return [i for i, g in enumerate(index) if g >= 0 and g != (astro[i] - 4) % 60]
+
+    def regnal_invalid(self) -> List[int]:
+        if self._np is not None:
+            g = self._v_regnal
+            known = ~self._np.isnan(g)
+            bad = self._np.zeros(self.n, dtype=bool)
+            bad[known] = (g[known] < 1) | (g[known] != self._np.floor(g[known]))
+            return self._np.flatnonzero(bad).tolist()
+        return [
+            i for i, g in enumerate(self._store.regnal_years)
+            if g is not None and (g < 1 or g != int(g))
+        ]
+
+    def regnal_null(self) -> List[int]:
+        if self._np is not None:
+            return self._np.flatnonzero(self._np.isnan(self._v_regnal)).tolist()
+        return [i for i, g in enumerate(self._store.regnal_years) if g is None]
+
+    def column_null(self, column: str) -> List[int]:
+        if self._np is not None:
+            return self._np.flatnonzero(self._v_codes[column] < 0).tolist()
+        return [i for i, c in enumerate(self._codes[column]) if c < 0]
+
+    def ruler_missing(self) -> List[int]:
+        columns = ("帝号", "帝名", "年号")
+        if self._np is not None:
+            mask = self._np.ones(self.n, dtype=bool)
+            for c in columns:
+                mask &= self._v_codes[c] < 0
+            return self._np.flatnonzero(mask).tolist()
+        return [i for i in range(self.n) if all(self._codes[c][i] < 0 for c in columns)]
+
+    # ---------- 序年连续性 ----------
+    def regnal_sequences(self) -> Dict[str, List[int]]:
+        """
+        按区间合并键、公元排序后比较相邻两行（后一行记为违规）：
+        同年 -> duplicate_row；隔一年而序年不加一 -> regnal_break；
+        隔多年而序年差等于年差 -> regnal_gap（中间缺行）；否则 -> regnal_restart
+        """
+        if self._np is not None:
+            np = self._np
+            key = self._composite_key(_SPAN_COLUMNS)
+            order = np.lexsort((np.arange(self.n), self._v_astro, key))
+            k, y, g = key[order], self._v_astro[order], self._v_regnal[order]
+            same = k[1:] == k[:-1]
+            dy = y[1:] - y[:-1]
+            dg = g[1:] - g[:-1]
+            known = ~np.isnan(dg)
+            later = order[1:]
+            masks = {
+                "duplicate_row": same & (dy == 0),
+                "regnal_break": same & (dy == 1) & known & (dg != 1),
+                "regnal_gap": same & (dy > 1) & known & (dg == dy),
+                "regnal_restart": same & (dy > 1) & known & (dg != dy),
+            }
+            return {name: np.sort(later[m]).tolist() for name, m in masks.items()}
+
+        key = self._composite_key(_SPAN_COLUMNS)
+        astro, regnal = self._astro, self._store.regnal_years
+        order = sorted(range(self.n), key=lambda i: (key[i], astro[i], i))
+        out: Dict[str, List[int]] = {
+            "duplicate_row": [], "regnal_break": [], "regnal_gap": [], "regnal_restart": [],
+        }
+        for prev, cur in zip(order, order[1:]):
+            if key[prev] != key[cur]:
+                continue
+            dy = astro[cur] - astro[prev]
+            if dy == 0:
+                out["duplicate_row"].append(cur)
+                continue
+            if regnal[cur] is None or regnal[prev] is None:
+                continue
+            dg = regnal[cur] - regnal[prev]
+            if dy == 1 and dg != 1:
+                out["regnal_break"].append(cur)
+            elif dy > 1:
+                out["regnal_gap" if dg == dy else "regnal_restart"].append(cur)
+        return {name: sorted(rows) for name, rows in out.items()}
+
+    # ---------- 政权内君主并存 ----------
+    def reign_overlap(self) -> List[int]:
+        """
+        同一政权某年有多位君主（帝号、帝名组合）且相邻年份同样如此的全部行；
+        只在单独一年出现的视为正常的新旧君主交替
+        """
+        regime = self._codes["政权"]
+        if self._np is not None:
+            np = self._np
+            ruler = self._composite_key(("帝号", "帝名"))
+            reg = np.frombuffer(regime, dtype=np.int32).astype(np.int64)
+            span = int(self._v_astro.max() - self._v_astro.min()) + 3
+            # (政权, 年) 编为一个整数，相邻年份相差 1
+            pair = reg * span + (self._v_astro - self._v_astro.min() + 1)
+            triples = np.unique(np.stack([pair, ruler]), axis=1)
+            pairs, counts = np.unique(triples[0], return_counts=True)
+            multi = pairs[counts > 1]
+            persistent = multi[np.isin(multi + 1, multi) | np.isin(multi - 1, multi)]
+            return np.flatnonzero(np.isin(pair, persistent)).tolist()
+
+        ruler = self._composite_key(("帝号", "帝名"))
+        astro = self._astro
+        rulers: Dict[Tuple[int, int], set] = {}
+        for i in range(self.n):
+            rulers.setdefault((regime[i], astro[i]), set()).add(ruler[i])
+        multi = {p for p, s in rulers.items() if len(s) > 1}
+        persistent = {(r, y) for r, y in multi if (r, y + 1) in multi or (r, y - 1) in multi}
+        return [i for i in range(self.n) if (regime[i], astro[i]) in persistent]
+
+    def _composite_key(self, columns: Sequence[str]) -> Any:
+        """多列组合编码为一个整数键（相同组合相同键）"""
+        if self._np is not None:
+            np = self._np
+            stacked = np.stack([self._v_codes[c] for c in columns])
+            return np.unique(stacked, axis=1, return_inverse=True)[1].reshape(-1)
+        table: Dict[Tuple[int, ...], int] = {}
+        cols = [self._codes[c] for c in columns]
+        return array("i", (table.setdefault(t, len(table)) for t in zip(*cols)))
+
+    # ---------- 汇总 ----------
+    def run(self) -> Dict[str, List[int]]:
+        """执行全部规则，返回 规则名 -> 违规行号"""
+        results = {
+            "year_zero": self.year_zero(),
+            "year_order": self.year_order(),
+            "required_null": self.required_null(),
+            "ganzhi_invalid": self.ganzhi_invalid(),
+            "ganzhi_mismatch": self.ganzhi_mismatch(),
+            "regnal_invalid": self.regnal_invalid(),
+            "ruler_missing": self.ruler_missing(),
+            "reign_overlap": self.reign_overlap(),
+            "regnal_null": self.regnal_null(),
+            "emperor_title_null": self.column_null("帝号"),
+            "emperor_name_null": self.column_null("帝名"),
+            "reign_title_null": self.column_null("年号"),
+        }
+        results.update(self.regnal_sequences())
+        return results
+
+    def describe_row(self, i: int) -> str:
+        """样例行的简短描述：公元 政权 帝号/帝名 年号 序年"""
+        store = self._store
+        names = [store.text[c][i] for c in ("政权", "帝号", "帝名", "年号") if store.text[c][i]]
+        regnal = store.regnal_years[i]
+        suffix = f" {regnal:g}" if regnal is not None else ""
+        return f"#{store.rowids[i]} {store.years[i]} {' '.join(names)}{suffix}"
+
+
+def check_store(
+    store: ColumnStore,
+    *,
+    db_path: str = "",
+    db_sha256: Optional[str] = None,
+    use_numpy: Optional[bool] = None,
+    samples: int = DEFAULT_SAMPLES,
+) -> IntegrityReport:
+    started = time.perf_counter()
+    checker = IntegrityChecker(store, use_numpy)
+    results = checker.run()
+    seconds = time.perf_counter() - started
+    findings: List[Finding] = []
+    for name, (severity, description) in CHECKS.items():
+        rows = results[name]
+        findings.append(Finding(
+            check=name,
+            severity=severity,
+            description=description,
+            count=len(rows),
+            rowids=[store.rowids[i] for i in rows[:samples]],
+            details=[checker.describe_row(i) for i in rows[:samples]] if name not in _COUNT_ONLY else [],
+        ))
+    return IntegrityReport(
+        db_path=db_path,
+        db_sha256=db_sha256,
+        rows=len(store),
+        backend=checker.backend,
+        seconds=seconds,
+        findings=findings,
+    )
+
+
+def check_database(
+    db_path: str | Path,
+    *,
+    use_numpy: Optional[bool] = None,
+    samples: int = DEFAULT_SAMPLES,
+) -> IntegrityReport:
+    """读入整表并校验；表结构不符时由 sqlite3 抛出异常"""
+    from core.data.query_cache import file_sha256
+    from core.data.repository import ChronologyRepository
+
+    repo = ChronologyRepository(db_path)
+    try:
+        store = ColumnStore.from_rows(repo.iter_all_rows())
+    finally:
+        repo.close()
+    return check_store(
+        store,
+        db_path=str(db_path),
+        db_sha256=file_sha256(db_path),
+        use_numpy=use_numpy,
+        samples=samples,
+    )
+
+
+def _main(argv: Optional[Sequence[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="校验年表数据库的数据完整性")
+    parser.add_argument("--db", help="年表数据库路径，缺省使用 config.DB_PATH")
+    parser.add_argument("--json", action="store_true", help="输出 JSON 报告")
+    parser.add_argument("--strict", action="store_true", help="warning 同样视为失败")
+    parser.add_argument("--no-numpy", action="store_true", help="不使用 NumPy")
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES, help="每条规则保留的样例行数")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        db_path = Path(args.db)
+    else:
+        import config
+        db_path = config.DB_PATH
+
+    report = check_database(db_path, use_numpy=False if args.no_numpy else None, samples=args.samples)
+    if args.json:
+        print(report.to_json())
+    else:
+        for line in report.lines():
+            print(line)
+    return 0 if report.passes(args.strict) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(_main())
@@ -0,0 +1,154 @@
+# core/diagnostics/memory_monitor.py
+# -*- coding: utf-8 -*-
+"""
+进程内存监控与低内存模式支持：
+
+- current_rss() / peak_rss()：当前与峰值常驻内存（Windows 用 GetProcessMemoryInfo，
+  Linux 读 /proc/self/status，其它平台退回 getrusage，只有峰值）；
+- MemoryGuard：常驻内存超过预算的一定比例时依次调用已登记的释放回调（丢弃可重建的缓存），
+  两次释放之间有冷却时间，避免内存无法再降时反复重建。
+
+32 位进程（Win7 版本）地址空间只有 2 GB，默认启用低内存模式。
+"""
+from __future__ import annotations
+
+import gc
+import sys
+import time
+from typing import Callable, List, Optional
+
+# 触发释放的比例与两次释放的最小间隔（秒）
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_COOLDOWN = 30.0
+
+
+def is_32bit_process() -> bool:
+    return sys.maxsize <= 2 ** 32
+
+
+def resolve_low_memory(setting: Optional[bool]) -> bool:
+    """配置为 None 时自动判断：32 位进程启用低内存模式"""
+    return is_32bit_process() if setting is None else setting
+
+
+def _windows_counters() -> Optional[tuple]:
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    process = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+        return None
+    return counters.WorkingSetSize, counters.PeakWorkingSetSize
+
+
+def _proc_status(field: str) -> Optional[int]:
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) * 1024  # kB
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def current_rss() -> Optional[int]:
+    """当前常驻内存（字节），无法取得时为 None"""
+    if sys.platform == "win32":
+        try:
+            counters = _windows_counters()
+        except (OSError, AttributeError):
+            return None
+        return counters[0] if counters else None
+    return _proc_status("VmRSS")
+
+
+def peak_rss() -> Optional[int]:
+    """进程启动以来的峰值常驻内存（字节），无法取得时为 None"""
+    if sys.platform == "win32":
+        try:
+            counters = _windows_counters()
+        except (OSError, AttributeError):
+            return None
+        return counters[1] if counters else None
+    peak = _proc_status("VmHWM")
+    if peak is not None:
+        return peak
+    try:
+        import resource
+    except ImportError:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 以字节计，其它 Unix 以 KB 计
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+class MemoryGuard:
+    """常驻内存超过 budget_bytes × threshold 时释放已登记的缓存"""
+
+    def __init__(
+        self,
+        budget_bytes: int,
+        threshold: float = DEFAULT_THRESHOLD,
+        cooldown: float = DEFAULT_COOLDOWN,
+    ) -> None:
+        self.budget_bytes = budget_bytes
+        self._threshold = threshold
+        self._cooldown = cooldown
+        self._releasers: List[Callable[[], None]] = []
+        self._last_release = float("-inf")
+        self.releases = 0
+
+    def register(self, releaser: Callable[[], None]) -> None:
+        self._releasers.append(releaser)
+
+    @property
+    def limit_bytes(self) -> int:
+        return int(self.budget_bytes * self._threshold)
+
+    def check(self) -> bool:
+        """超出阈值且不在冷却期时释放缓存，返回是否执行了释放"""
+        rss = current_rss()
+        if rss is None or rss <= self.limit_bytes:
+            return False
+        now = time.monotonic()
+        if now - self._last_release < self._cooldown:
+            return False
+        self.release()
+        self._last_release = now
+        return True
+
+    def release(self) -> None:
+        for releaser in self._releasers:
+            releaser()
+        gc.collect()
+        self.releases += 1
+
+    def describe(self) -> str:
+        """当前 / 峰值常驻内存与预算，供诊断面板与状态栏显示"""
+        mb = 1024 * 1024
+        rss, peak = current_rss(), peak_rss()
+        parts = [
+            f"当前 {rss / mb:.0f} MB" if rss is not None else "当前未知",
+            f"峰值 {peak / mb:.0f} MB" if peak is not None else "峰值未知",
+            f"预算 {self.budget_bytes / mb:.0f} MB",
+        ]
+        if self.releases:
+            parts.append(f"已释放缓存 {self.releases} 次")
+        return "，".join(parts)
@@ -0,0 +1,214 @@
+# core/diagnostics/perf_recorder.py
+# -*- coding: utf-8 -*-
+"""
+界面操作的耗时与内存记录，供诊断面板使用。
+
+- 一次“操作”（如一次关键字检索）由 operation() 包围，内部用 phase() 记录
+  query / materialize / render / resize 等阶段耗时，保留最近若干次操作；
+- 可选用 tracemalloc 比较当前内存快照与基线的差异；
+- 可选对每次操作做 cProfile 采集，dump_profile() 把最近 N 次合并写成 .prof 文件。
+
+未启用时 operation() / phase() 直接返回共享的空上下文，数据层的 active 判断
+也只是一次属性读取，不产生额外开销。记录只针对发起操作的线程，
+导出等后台线程中的查询不会计入界面操作。
+"""
+from __future__ import annotations
+
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, ContextManager, Deque, Dict, Iterator, List, Optional, Tuple
+
+# 各阶段名称及显示文字
+PHASE_QUERY = "query"
+PHASE_MATERIALIZE = "materialize"
+PHASE_RENDER = "render"
+PHASE_RESIZE = "resize"
+PHASE_LABELS: Dict[str, str] = {
+    PHASE_QUERY: "查询",
+    PHASE_MATERIALIZE: "构造条目",
+    PHASE_RENDER: "渲染",
+    PHASE_RESIZE: "调整列宽",
+}
+
+# 默认保留的操作记录数
+DEFAULT_HISTORY = 50
+
+_NULL_CONTEXT = nullcontext()
+
+
+@dataclass
+class OperationRecord:
+    label: str
+    started_at: float                                   # time.time()
+    total_ms: float = 0.0
+    phases: Dict[str, float] = field(default_factory=dict)  # 阶段 -> 累计毫秒
+    rows: Optional[int] = None
+    memory_kb: Optional[float] = None                   # tracemalloc 跟踪的内存增量
+    profiled: bool = False
+
+    def phase_ms(self, phase: str) -> float:
+        return self.phases.get(phase, 0.0)
+
+
+class PerfRecorder:
+    """操作耗时记录器；进程内共用模块级实例 PERF"""
+
+    def __init__(self, history: int = DEFAULT_HISTORY) -> None:
+        self.enabled = False
+        self.profiling = False
+        self._records: Deque[OperationRecord] = deque(maxlen=history)
+        self._profiles: Deque[Any] = deque(maxlen=history)
+        self._current: Optional[OperationRecord] = None
+        self._thread: Optional[int] = None
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+
+    # ---------- 操作与阶段 ----------
+    @property
+    def active(self) -> bool:
+        """当前线程是否处于一次被记录的操作中"""
+        return self._current is not None and threading.get_ident() == self._thread
+
+    def operation(self, label: str) -> ContextManager[Any]:
+        """包围一次界面操作；未启用或已在操作中（嵌套）时为空上下文"""
+        if not self.enabled or self._current is not None:
+            return _NULL_CONTEXT
+        return self._operation(label)
+
+    def phase(self, name: str) -> ContextManager[Any]:
+        """在当前操作内计时一个阶段，同名阶段累加"""
+        if not self.active:
+            return _NULL_CONTEXT
+        return self._phase(name)
+
+    def add_phase_time(self, name: str, seconds: float) -> None:
+        """直接累加阶段耗时（用于与其它工作交错执行、无法用上下文包围的阶段）"""
+        if self.active:
+            assert self._current is not None
+            phases = self._current.phases
+            phases[name] = phases.get(name, 0.0) + seconds * 1000
+
+    def set_rows(self, rows: int) -> None:
+        if self.active:
+            assert self._current is not None
+            self._current.rows = rows
+
+    @contextmanager
+    def _operation(self, label: str) -> Iterator[OperationRecord]:
+        record = OperationRecord(label, time.time())
+        self._current, self._thread = record, threading.get_ident()
+        profiler = self._start_profiler() if self.profiling else None
+        mem_before = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.total_ms = (time.perf_counter() - started) * 1000
+            if profiler is not None:
+                profiler.disable()
+                self._profiles.append(profiler)
+                record.profiled = True
+            if mem_before is not None and tracemalloc.is_tracing():
+                record.memory_kb = (tracemalloc.get_traced_memory()[0] - mem_before) / 1024
+            self._current, self._thread = None, None
+            self._records.append(record)
+
+    @contextmanager
+    def _phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase_time(name, time.perf_counter() - started)
+
+    @staticmethod
+    def _start_profiler() -> Optional[Any]:
+        import cProfile
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # 已有其它性能分析器在运行（如外部调试器），本次不采集
+            return None
+        return profiler
+
+    # ---------- 记录 ----------
+    def records(self) -> List[OperationRecord]:
+        """最近的操作记录，旧的在前"""
+        return list(self._records)
+
+    def clear(self) -> None:
+        self._records.clear()
+        self._profiles.clear()
+
+    @property
+    def profile_count(self) -> int:
+        return len(self._profiles)
+
+    def dump_profile(self, path: str | Path, last: Optional[int] = None) -> int:
+        """
+        把最近 last 次（默认全部）cProfile 采集合并写入 path（pstats 格式，
+        可用 snakeviz / python -m pstats 查看），返回合并的次数
+        """
+        profiles = list(self._profiles)
+        if last is not None:
+            profiles = profiles[-last:] if last > 0 else []
+        if not profiles:
+            raise ValueError("没有可导出的性能分析数据")
+        import pstats
+        stats = pstats.Stats(profiles[0])
+        for profiler in profiles[1:]:
+            stats.add(profiler)
+        stats.dump_stats(str(path))
+        return len(profiles)
+
+    # ---------- 内存 ----------
+    @property
+    def memory_tracking(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start_memory_tracking(self, frames: int = 1) -> None:
+        """开始 tracemalloc 跟踪并以当前快照为基线（跟踪期间内存分配会变慢）"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self.reset_memory_baseline()
+
+    def stop_memory_tracking(self) -> None:
+        self._baseline = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def reset_memory_baseline(self) -> None:
+        self._baseline = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+
+    def memory_delta(self, limit: int = 10) -> Tuple[float, List[str]]:
+        """
+        当前快照相对基线的差异：(总增量 KB, 增量最大的 limit 处代码位置说明)
+        """
+        if self._baseline is None or not tracemalloc.is_tracing():
+            return 0.0, []
+        snapshot = tracemalloc.take_snapshot()
+        filters = (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        )
+        diffs = snapshot.filter_traces(filters).compare_to(
+            self._baseline.filter_traces(filters), "lineno"
+        )
+        total_kb = sum(d.size_diff for d in diffs) / 1024
+        lines: List[str] = []
+        for d in diffs[:limit]:
+            frame = d.traceback[0]
+            lines.append(
+                f"{d.size_diff / 1024:+10.1f} KB {d.count_diff:+7d} 块  "
+                f"{Path(frame.filename).name}:{frame.lineno}"
+            )
+        return total_kb, lines
+
+
+# 进程内共用的记录器，默认关闭
+PERF = PerfRecorder()
@@ -0,0 +1,84 @@
+# core/index/aho_corasick.py
+# -*- coding: utf-8 -*-
+"""
+Aho–Corasick 多模式匹配自动机：一次扫描找出文本中全部模式串的出现位置，
+复杂度 O(文本长度 + 命中数)，与模式串数量无关。
+"""
+from __future__ import annotations
+
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+class AhoCorasick:
+    """
+    静态自动机，构建后只读（可被 pickle 传给子进程）。
+    构建时把失败转移预先并入各状态的转移表（回到根状态的转移除外，扫描时统一查根表），
+    扫描时每个字符至多两次字典查找，无需沿失败链回退。
+    """
+
+    __slots__ = ("_delta", "_out")
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        children: List[Dict[str, int]] = [{}]
+        out: List[Tuple[str, ...]] = [()]
+
+        # —— 字典树 ——
+        for pat in patterns:
+            if not pat:
+                continue
+            state = 0
+            for ch in pat:
+                nxt = children[state].get(ch)
+                if nxt is None:
+                    nxt = len(children)
+                    children[state][ch] = nxt
+                    children.append({})
+                    out.append(())
+                state = nxt
+            if pat not in out[state]:
+                out[state] += (pat,)
+
+        # —— 失败指针（BFS 序），并把非根的失败转移并入转移表 ——
+        fail = [0] * len(children)
+        delta: List[Dict[str, int]] = [{} for _ in children]
+        delta[0] = children[0]
+        queue = deque(children[0].values())
+        for s in queue:
+            delta[s] = dict(children[s])
+        while queue:
+            state = queue.popleft()
+            for ch, child in children[state].items():
+                f = delta[fail[state]].get(ch) if state else None
+                if f is None and state:
+                    f = children[0].get(ch, 0)
+                fail[child] = f or 0
+                out[child] += out[fail[child]]
+                inherited = delta[fail[child]] if fail[child] else {}
+                delta[child] = {**inherited, **children[child]}
+                queue.append(child)
+
+        self._delta = delta
+        self._out = out
+
+    def __len__(self) -> int:
+        return sum(1 for o in self._out if o)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """逐个产出 (起始下标, 结束下标（不含）, 模式串)，按结束位置升序，可能重叠"""
+        delta = self._delta
+        root = delta[0]
+        out = self._out
+        state = 0
+        for i, ch in enumerate(text):
+            nxt = delta[state].get(ch)
+            if nxt is None:
+                nxt = root.get(ch, 0)
+            state = nxt
+            if out[state]:
+                end = i + 1
+                for pat in out[state]:
+                    yield end - len(pat), end, pat
+
+    def find_all(self, text: str) -> List[Tuple[int, int, str]]:
+        return list(self.iter_matches(text))
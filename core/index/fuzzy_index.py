@@ -0,0 +1,229 @@
+# core/index/fuzzy_index.py
+# -*- coding: utf-8 -*-
+"""
+模糊检索索引：覆盖 帝名 / 帝号 / 年号 / 政权 的去重取值，
+支持全拼、拼音首字母、拼音前缀以及编辑距离候选（q-gram 倒排过滤 + 校验），
+每次查询受时间预算约束，超时即返回已找到的结果。
+
+拼音功能依赖可选包 pypinyin，未安装时仅提供汉字编辑距离匹配。
+pypinyin 导入较慢（加载词典约数百毫秒），推迟到首次构建索引时再导入。
+"""
+from __future__ import annotations
+
+import bisect
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+_UNLOADED: Any = object()
+_lazy_pinyin: Any = _UNLOADED
+
+# 参与模糊检索的列
+FUZZY_COLUMNS: Tuple[str, ...] = ("帝名", "帝号", "年号", "政权")
+
+# 匹配方式 -> 基础得分（越小越靠前）
+_RANK_EXACT = 0
+_RANK_PINYIN = 1
+_RANK_INITIALS = 2
+_RANK_PINYIN_PREFIX = 3
+_RANK_EDIT = 4
+
+# 查询过程中每处理多少个节点检查一次时间预算
+_BUDGET_CHECK_EVERY = 64
+
+
+def levenshtein(a: str, b: str) -> int:
+    """经典编辑距离（两行滚动数组）"""
+    if a == b:
+        return 0
+    if len(a) < len(b):
+        a, b = b, a
+    if not b:
+        return len(a)
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        prev = cur
+    return prev[-1]
+
+
+class QGramIndex:
+    """
+    q-gram 倒排索引：按共享 q-gram 数量做计数过滤，再用编辑距离校验候选。
+    编辑距离 ≤ d 的两串（首尾各补 q-1 个哨兵字符后）至少共享
+    max(|a|, |b|) + q - 1 - d*q 个 q-gram。
+    """
+
+    _PAD = "\x00"
+
+    def __init__(self, words: Iterable[str], q: int = 2) -> None:
+        self._q = q
+        # q-gram -> [(词, 该 q-gram 在词中出现次数)]
+        self._postings: Dict[str, List[Tuple[str, int]]] = {}
+        for w in dict.fromkeys(words):
+            for g, n in Counter(self._grams(w)).items():
+                self._postings.setdefault(g, []).append((w, n))
+
+    def _grams(self, word: str) -> List[str]:
+        pad = self._PAD * (self._q - 1)
+        padded = f"{pad}{word}{pad}"
+        return [padded[i:i + self._q] for i in range(len(padded) - self._q + 1)]
+
+    def search(self, word: str, max_dist: int, deadline: Optional[float] = None) -> List[Tuple[int, str]]:
+        """返回 (距离, 词) 列表；到达 deadline 时提前结束，返回已找到的部分"""
+        shared: Dict[str, int] = {}
+        for g, qn in Counter(self._grams(word)).items():
+            for w, wn in self._postings.get(g, ()):
+                shared[w] = shared.get(w, 0) + min(qn, wn)
+
+        found: List[Tuple[int, str]] = []
+        for checked, (w, count) in enumerate(shared.items(), 1):
+            if deadline is not None and checked % _BUDGET_CHECK_EVERY == 0 and time.perf_counter() > deadline:
+                break
+            if abs(len(w) - len(word)) > max_dist:
+                continue
+            if count < max(len(w), len(word)) + self._q - 1 - max_dist * self._q:
+                continue
+            d = levenshtein(word, w)
+            if d <= max_dist:
+                found.append((d, w))
+        found.sort()
+        return found
+
+
+@dataclass
+class FuzzyMatch:
+    """一条模糊匹配结果：命中的原始取值、所在列与排序得分"""
+    term: str
+    columns: Set[str] = field(default_factory=set)
+    score: Tuple[int, int, int] = (0, 0, 0)
+    reason: str = ""
+
+
+def _pinyin_func() -> Optional[Callable[..., List[str]]]:
+    """首次调用时导入 pypinyin.lazy_pinyin，未安装时返回 None"""
+    global _lazy_pinyin
+    if _lazy_pinyin is _UNLOADED:
+        try:
+            from pypinyin import lazy_pinyin
+        except ImportError:  # 可选依赖
+            lazy_pinyin = None
+        _lazy_pinyin = lazy_pinyin
+    return _lazy_pinyin
+
+
+def pinyin_available() -> bool:
+    return _pinyin_func() is not None
+
+
+class FuzzyIndex:
+    """
+    一次构建、常驻内存的模糊检索索引。
+    terms: 原始取值 -> 所在列集合
+    variants: 原始取值 -> 额外的检索写法（如简体），同样参与编辑距离匹配
+    pinyin: 原始取值 -> 拼音音节，已预先算好时（如来自索引旁路文件）不再调用 pypinyin
+    """
+
+    def __init__(
+        self,
+        terms: Dict[str, Set[str]],
+        variants: Optional[Dict[str, Iterable[str]]] = None,
+        pinyin: Optional[Dict[str, List[str]]] = None,
+    ) -> None:
+        self._terms = terms
+        # 检索写法 -> 原始取值
+        self._surface: Dict[str, Set[str]] = {}
+        for term in terms:
+            self._surface.setdefault(term, set()).add(term)
+            for v in (variants or {}).get(term, ()):
+                self._surface.setdefault(v, set()).add(term)
+        self._char_grams = QGramIndex(self._surface, q=1)
+
+        self._full: Dict[str, Set[str]] = {}
+        self._initials: Dict[str, Set[str]] = {}
+        self._term_pinyin: Dict[str, str] = {}
+        if pinyin is None:
+            lazy_pinyin = _pinyin_func()
+            if lazy_pinyin is not None:
+                pinyin = {term: lazy_pinyin(term, errors="ignore") for term in terms}
+        if pinyin is not None:
+            for term in terms:
+                syllables = pinyin.get(term)
+                if not syllables:
+                    continue
+                full = "".join(syllables)
+                self._term_pinyin[term] = full
+                self._full.setdefault(full, set()).add(term)
+                self._initials.setdefault("".join(s[0] for s in syllables), set()).add(term)
+        self._full_keys = sorted(self._full)
+        self._pinyin_grams = QGramIndex(self._full_keys, q=2)
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def search(self, query: str, limit: int = 20, time_budget: float = 0.05) -> List[FuzzyMatch]:
+        """
+        按得分返回至多 limit 个匹配取值；time_budget 为单次查询的最长耗时（秒）
+        """
+        query = query.strip()
+        if not query:
+            return []
+        deadline = time.perf_counter() + time_budget
+        best: Dict[str, FuzzyMatch] = {}
+
+        lazy_pinyin = _pinyin_func()
+        if query.isascii():
+            key = "".join(query.lower().split())
+        elif lazy_pinyin is not None:
+            key = "".join(lazy_pinyin(query, errors="ignore"))
+        else:
+            key = ""
+
+        def offer(term: str, rank: int, dist: int, reason: str) -> None:
+            # 同分时以读音相近程度排序，无拼音时退回长度差
+            term_pinyin = self._term_pinyin.get(term)
+            tie = levenshtein(key, term_pinyin) if key and term_pinyin else abs(len(term) - len(query))
+            score = (rank, dist, tie)
+            cur = best.get(term)
+            if cur is None or score < cur.score:
+                best[term] = FuzzyMatch(term, set(self._terms[term]), score, reason)
+
+        if not query.isascii():
+            for term in self._surface.get(query, ()):
+                offer(term, _RANK_EXACT, 0, "精确")
+            max_dist = 1 if len(query) <= 4 else 2
+            for dist, surface in self._char_grams.search(query, max_dist, deadline):
+                for term in self._surface[surface]:
+                    offer(term, _RANK_EDIT, dist, "近似字")
+        if key:
+            # 汉字输入同样按读音检索，可找回同音错字
+            self._search_pinyin(key, offer, deadline)
+
+        ranked = sorted(best.values(), key=lambda m: (m.score, m.term))
+        return ranked[:limit]
+
+    def _search_pinyin(self, key: str, offer: Callable[[str, int, int, str], None], deadline: float) -> None:
+        if not self._full or not key.isalpha():
+            return
+        for term in self._full.get(key, ()):
+            offer(term, _RANK_PINYIN, 0, "全拼")
+        for term in self._initials.get(key, ()):
+            offer(term, _RANK_INITIALS, 0, "首字母")
+
+        # 全拼前缀：有序键上二分定位
+        i = bisect.bisect_left(self._full_keys, key)
+        while i < len(self._full_keys) and self._full_keys[i].startswith(key):
+            if time.perf_counter() > deadline:
+                return
+            for term in self._full[self._full_keys[i]]:
+                offer(term, _RANK_PINYIN_PREFIX, len(self._full_keys[i]) - len(key), "拼音前缀")
+            i += 1
+
+        # 拼写错误：拼音串上的编辑距离
+        max_dist = max(1, len(key) // 4)
+        for dist, pinyin in self._pinyin_grams.search(key, max_dist, deadline):
+            for term in self._full[pinyin]:
+                offer(term, _RANK_EDIT, dist, "拼音近似")
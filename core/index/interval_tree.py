@@ -0,0 +1,129 @@
+# core/index/interval_tree.py
+# -*- coding: utf-8 -*-
+"""
+静态中心区间树：一次构建，支持点查询（stabbing）与区间重叠查询，
+复杂度均为 O(log n + k)，k 为命中的区间数。
+"""
+from __future__ import annotations
+
+from typing import Generic, Iterable, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# (start, end, seq, payload)：seq 为插入序号，保证结果顺序稳定
+_Interval = Tuple[int, int, int, T]
+
+
+class _Node(Generic[T]):
+    """树节点：保存所有跨越 center 的区间，分别按起点升序、终点降序排列"""
+
+    __slots__ = ("center", "by_start", "by_end", "left", "right")
+
+    def __init__(self, center: int, intervals: List[_Interval]) -> None:
+        self.center = center
+        self.by_start: List[_Interval] = sorted(intervals, key=lambda iv: (iv[0], iv[2]))
+        self.by_end: List[_Interval] = sorted(intervals, key=lambda iv: (-iv[1], iv[2]))
+        self.left: Optional[_Node[T]] = None
+        self.right: Optional[_Node[T]] = None
+
+
+class IntervalTree(Generic[T]):
+    """
+    闭区间 [start, end] 的静态区间树。
+    构建后不可修改；查询结果按 (start, 插入顺序) 排序返回。
+    """
+
+    def __init__(self, intervals: Iterable[Tuple[int, int, T]]) -> None:
+        items: List[_Interval] = [
+            (start, end, seq, payload)
+            for seq, (start, end, payload) in enumerate(intervals)
+        ]
+        for start, end, _, _ in items:
+            if start > end:
+                raise ValueError(f"非法区间：[{start}, {end}]")
+        self._size = len(items)
+        self._root = self._build(items)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @classmethod
+    def _build(cls, items: List[_Interval]) -> Optional[_Node[T]]:
+        if not items:
+            return None
+        # 以端点中位数为中心，保证树高为 O(log n)
+        points = sorted(p for iv in items for p in (iv[0], iv[1]))
+        center = points[len(points) // 2]
+
+        left_items: List[_Interval] = []
+        right_items: List[_Interval] = []
+        here: List[_Interval] = []
+        for iv in items:
+            if iv[1] < center:
+                left_items.append(iv)
+            elif iv[0] > center:
+                right_items.append(iv)
+            else:
+                here.append(iv)
+
+        node: _Node[T] = _Node(center, here)
+        node.left = cls._build(left_items)
+        node.right = cls._build(right_items)
+        return node
+
+    # ---------- 查询 ----------
+    def stab(self, point: int) -> List[T]:
+        """返回所有包含 point 的区间负载"""
+        hits: List[_Interval] = []
+        node = self._root
+        while node is not None:
+            if point < node.center:
+                for iv in node.by_start:
+                    if iv[0] > point:
+                        break
+                    hits.append(iv)
+                node = node.left
+            elif point > node.center:
+                for iv in node.by_end:
+                    if iv[1] < point:
+                        break
+                    hits.append(iv)
+                node = node.right
+            else:
+                hits.extend(node.by_start)
+                break
+        return self._payloads(hits)
+
+    def overlap(self, lo: int, hi: int) -> List[T]:
+        """返回所有与闭区间 [lo, hi] 有交集的区间负载"""
+        if lo > hi:
+            lo, hi = hi, lo
+        hits: List[_Interval] = []
+        stack: List[Optional[_Node[T]]] = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            if hi < node.center:
+                for iv in node.by_start:
+                    if iv[0] > hi:
+                        break
+                    hits.append(iv)
+                stack.append(node.left)
+            elif lo > node.center:
+                for iv in node.by_end:
+                    if iv[1] < lo:
+                        break
+                    hits.append(iv)
+                stack.append(node.right)
+            else:
+                # 查询区间覆盖 center：本节点全部命中，两侧子树都可能有交集
+                hits.extend(node.by_start)
+                stack.append(node.left)
+                stack.append(node.right)
+        return self._payloads(hits)
+
+    @staticmethod
+    def _payloads(hits: List[_Interval]) -> List[T]:
+        hits.sort(key=lambda iv: (iv[0], iv[2]))
+        return [iv[3] for iv in hits]
@@ -0,0 +1,300 @@
+# core/index/reign_graph.py
+# -*- coding: utf-8 -*-
+"""
+政权 / 君主 / 年号 交叉引用图：由在位区间一次性构建，节点与邻接表常驻内存，
+“某帝的全部年号”“某政权的君主与并立政权”“两者之间的关联路径”等查询
+只做字典与列表访问，不再反复 LIKE 扫描全表。
+
+节点：
+- 政权（按 RegimeSplit 划分：同名而不相干的政权，如西汉的“漢”与刘渊的“漢”，各为一个节点）
+- 君主（政权 + 帝号 + 帝名；二者皆空的行不建君主节点，如西周“共和”）
+- 年号（政权 + 君主 + 年号）
+边（均为双向，反向边使用对应的反向关系名）：
+- 政权 — 君主、政权 — 年号、君主 — 年号：隶属
+- 同一政权内按起始年份相邻的君主、年号：继承（前任 / 继任）
+- 存续年份有交集的政权：并立
+"""
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from core.index.reign_index import RegimeKey, RegimeSplit, intersect_year_ranges
+from core.models.reign_span import ReignSpan
+
+NODE_REGIME = "regime"
+NODE_RULER = "ruler"
+NODE_REIGN = "reign"
+
+# 关系名：A -rel-> B
+REL_RULER = "ruler"              # 政权 -> 君主
+REL_REGIME = "regime"            # 君主 / 年号 -> 政权
+REL_REIGN = "reign"              # 政权 / 君主 -> 年号
+REL_EMPEROR = "emperor"          # 年号 -> 君主
+REL_SUCCESSOR = "successor"      # 君主 / 年号 -> 继任
+REL_PREDECESSOR = "predecessor"  # 君主 / 年号 -> 前任
+REL_CONCURRENT = "concurrent"    # 政权 <-> 并立政权
+
+REL_LABELS: Dict[str, str] = {
+    REL_RULER: "君主",
+    REL_REGIME: "政权",
+    REL_REIGN: "年号",
+    REL_EMPEROR: "君主",
+    REL_SUCCESSOR: "继任",
+    REL_PREDECESSOR: "前任",
+    REL_CONCURRENT: "并立",
+}
+
+_RulerKey = Tuple[RegimeKey, Optional[str], Optional[str]]
+_ReignKey = Tuple[RegimeKey, Optional[str], Optional[str], str]
+
+
+@dataclass
+class GraphNode:
+    id: int
+    kind: str                      # NODE_REGIME / NODE_RULER / NODE_REIGN
+    regime: str
+    emperor_title: Optional[str] = None
+    emperor_name: Optional[str] = None
+    reign_title: Optional[str] = None
+    start_year: int = 0
+    end_year: int = 0
+
+    @property
+    def label(self) -> str:
+        if self.kind == NODE_REGIME:
+            return self.regime
+        ruler = f"{self.emperor_title or ''}{self.emperor_name or ''}"
+        if self.kind == NODE_RULER:
+            return f"{self.regime}{ruler}"
+        return f"{self.regime}{ruler}·{self.reign_title}"
+
+
+class ReignGraph:
+    """静态交叉引用图，构建后只读"""
+
+    def __init__(self, spans: Iterable[ReignSpan], split: Optional[RegimeSplit] = None) -> None:
+        self._nodes: List[GraphNode] = []
+        # 每个节点：关系 -> 邻居节点 id（按邻居起始年份排序）
+        self._adj: List[Dict[str, List[int]]] = []
+        self._regimes: Dict[RegimeKey, int] = {}
+        self._rulers: Dict[_RulerKey, int] = {}
+        self._reigns: Dict[_ReignKey, int] = {}
+        # 名称 -> 节点 id：政权名、帝号、帝名、年号各自入表
+        self._by_name: Dict[str, List[int]] = {}
+        spans = list(spans)
+        # 同名而不相干的政权各为一个节点；各政权的存续区间也用于计算并立关系
+        if split is None:
+            split = RegimeSplit(spans)
+
+        for s in spans:
+            regime = split.key(s)
+            self._node(self._regimes, regime, NODE_REGIME, s, regime=s.regime)
+            if s.emperor_title or s.emperor_name:
+                self._node(
+                    self._rulers, (regime, s.emperor_title, s.emperor_name), NODE_RULER, s,
+                    regime=s.regime, emperor_title=s.emperor_title, emperor_name=s.emperor_name,
+                )
+            if s.reign_title:
+                self._node(
+                    self._reigns, (regime, s.emperor_title, s.emperor_name, s.reign_title),
+                    NODE_REIGN, s,
+                    regime=s.regime, emperor_title=s.emperor_title,
+                    emperor_name=s.emperor_name, reign_title=s.reign_title,
+                )
+
+        self._link_membership()
+        self._link_succession()
+        self._link_concurrency({k: split.ranges(k) for k in split.keys()})
+        for adj in self._adj:
+            for rel, ids in adj.items():
+                ids.sort(key=lambda i: (self._nodes[i].start_year, i))
+
+    # ---------- 构建 ----------
+    def _node(self, table: Dict, key: object, kind: str, span: ReignSpan, **fields: object) -> int:
+        """取得或创建节点，并用区间扩展其起止年份"""
+        nid = table.get(key)
+        if nid is None:
+            nid = len(self._nodes)
+            node = GraphNode(nid, kind, start_year=span.start_year, end_year=span.end_year, **fields)  # type: ignore[arg-type]
+            self._nodes.append(node)
+            self._adj.append({})
+            table[key] = nid
+            if kind == NODE_REGIME:
+                names: Tuple[Optional[str], ...] = (node.regime,)
+            elif kind == NODE_RULER:
+                names = (node.emperor_title, node.emperor_name)
+            else:
+                names = (node.reign_title,)
+            for name in names:
+                if name:
+                    self._by_name.setdefault(name, []).append(nid)
+        else:
+            node = self._nodes[nid]
+            node.start_year = min(node.start_year, span.start_year)
+            node.end_year = max(node.end_year, span.end_year)
+        return nid
+
+    def _edge(self, a: int, rel: str, b: int, reverse: str) -> None:
+        out = self._adj[a].setdefault(rel, [])
+        if b not in out:
+            out.append(b)
+            self._adj[b].setdefault(reverse, []).append(a)
+
+    def _link_membership(self) -> None:
+        for (regime, _t, _n), ruler in self._rulers.items():
+            self._edge(self._regimes[regime], REL_RULER, ruler, REL_REGIME)
+        for (regime, title, name, _r), reign in self._reigns.items():
+            self._edge(self._regimes[regime], REL_REIGN, reign, REL_REGIME)
+            ruler = self._rulers.get((regime, title, name))
+            if ruler is not None:
+                self._edge(ruler, REL_REIGN, reign, REL_EMPEROR)
+
+    def _link_succession(self) -> None:
+        """同一政权内按起始年份排序，相邻者互为前任 / 继任"""
+        for table in (self._rulers, self._reigns):
+            by_regime: Dict[RegimeKey, List[int]] = {}
+            for key, nid in table.items():
+                by_regime.setdefault(key[0], []).append(nid)
+            for ids in by_regime.values():
+                ids.sort(key=lambda i: (self._nodes[i].start_year, self._nodes[i].end_year, i))
+                for a, b in zip(ids, ids[1:]):
+                    self._edge(a, REL_SUCCESSOR, b, REL_PREDECESSOR)
+
+    def _link_concurrency(self, ranges: Dict[RegimeKey, List[Tuple[int, int]]]) -> None:
+        """存续区间有交集的政权互为并立（按起始年份扫描，只比较可能相交的政权）"""
+        regimes = sorted(ranges, key=lambda r: ranges[r][0][0])
+        for i, a in enumerate(regimes):
+            a_end = ranges[a][-1][1]
+            for b in regimes[i + 1:]:
+                if ranges[b][0][0] > a_end:
+                    break
+                if intersect_year_ranges(ranges[a], ranges[b]):
+                    self._edge(self._regimes[a], REL_CONCURRENT, self._regimes[b], REL_CONCURRENT)
+
+    # ---------- 查询 ----------
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def node(self, node_id: int) -> GraphNode:
+        return self._nodes[node_id]
+
+    def edge_count(self) -> int:
+        return sum(len(ids) for adj in self._adj for ids in adj.values()) // 2
+
+    def find(self, names: Iterable[str], kind: Optional[str] = None) -> List[GraphNode]:
+        """按名称（政权名、帝号、帝名或年号，精确匹配）查找节点，可限定节点类型"""
+        seen: Dict[int, None] = {}
+        for name in names:
+            for nid in self._by_name.get(name, ()):
+                if kind is None or self._nodes[nid].kind == kind:
+                    seen.setdefault(nid, None)
+        return sorted((self._nodes[i] for i in seen), key=lambda n: (n.start_year, n.id))
+
+    def neighbors(self, node_id: int, relation: Optional[str] = None) -> List[Tuple[str, GraphNode]]:
+        """邻居节点 [(关系, 节点)]；relation 为 None 时返回全部关系"""
+        adj = self._adj[node_id]
+        rels: Sequence[str] = (relation,) if relation is not None else tuple(adj)
+        return [(rel, self._nodes[i]) for rel in rels for i in adj.get(rel, ())]
+
+    def related(self, node_id: int, relation: str) -> List[GraphNode]:
+        """单一关系的邻居节点"""
+        return [self._nodes[i] for i in self._adj[node_id].get(relation, ())]
+
+    def shortest_path(
+        self, source: int, target: int,
+        relations: Optional[Sequence[str]] = None, max_depth: int = 8,
+    ) -> Optional[List[Tuple[Optional[str], GraphNode]]]:
+        """
+        两节点间的最短关联路径：[(到达该节点所经关系, 节点)]，首项关系为 None；
+        不可达或超过 max_depth 时返回 None。
+        不限关系时从两端同时做 BFS（每条边都有反向边），每次扩展较小的一侧，
+        访问的节点数远少于单向搜索；限定关系时只能单向搜索。
+        """
+        if source == target:
+            return [(None, self._nodes[source])]
+        if relations is not None:
+            return self._path_one_way(source, target, relations, max_depth)
+
+        # 两侧的 节点 -> (父节点, 关系, 深度)；反向一侧的关系不使用，拼接时重新查找
+        fwd: Dict[int, Tuple[int, str, int]] = {source: (-1, "", 0)}
+        bwd: Dict[int, Tuple[int, str, int]] = {target: (-1, "", 0)}
+        fwd_level, bwd_level = [source], [target]
+        for _ in range(max_depth):
+            if not fwd_level or not bwd_level:
+                break
+            forward = len(fwd_level) <= len(bwd_level)
+            seen, other = (fwd, bwd) if forward else (bwd, fwd)
+            nxt_level: List[int] = []
+            # 扩展完整一层后取总长度最短的相遇点，保证结果最短
+            best: Optional[Tuple[int, int]] = None
+            for nid in (fwd_level if forward else bwd_level):
+                depth = seen[nid][2] + 1
+                for rel, ids in self._adj[nid].items():
+                    for nxt in ids:
+                        if nxt in seen:
+                            continue
+                        seen[nxt] = (nid, rel, depth)
+                        nxt_level.append(nxt)
+                        hit = other.get(nxt)
+                        if hit is not None and (best is None or depth + hit[2] < best[0]):
+                            best = (depth + hit[2], nxt)
+            if best is not None:
+                return self._join_paths(fwd, bwd, best[1])
+            if forward:
+                fwd_level = nxt_level
+            else:
+                bwd_level = nxt_level
+        return None
+
+    def _join_paths(
+        self, fwd: Dict[int, Tuple[int, str, int]], bwd: Dict[int, Tuple[int, str, int]], meet: int
+    ) -> List[Tuple[Optional[str], GraphNode]]:
+        """拼接双向 BFS 在 meet 处相遇的两段路径"""
+        head: List[Tuple[Optional[str], GraphNode]] = []
+        cur = meet
+        while True:
+            prev, rel, _ = fwd[cur]
+            head.append((rel or None, self._nodes[cur]))
+            if prev < 0:
+                break
+            cur = prev
+        head.reverse()
+        # 反向一侧：沿父指针走回目标，关系取“当前节点 -> 父节点”的那条边
+        cur = meet
+        prev = bwd[cur][0]
+        while prev >= 0:
+            rel = next(r for r, ids in self._adj[cur].items() if prev in ids)
+            head.append((rel, self._nodes[prev]))
+            cur = prev
+            prev = bwd[cur][0]
+        return head
+
+    def _path_one_way(
+        self, source: int, target: int, relations: Sequence[str], max_depth: int
+    ) -> Optional[List[Tuple[Optional[str], GraphNode]]]:
+        parent: Dict[int, Tuple[int, str]] = {source: (-1, "")}
+        frontier = deque([(source, 0)])
+        while frontier:
+            nid, depth = frontier.popleft()
+            if depth >= max_depth:
+                continue
+            adj = self._adj[nid]
+            for rel in relations:
+                for nxt in adj.get(rel, ()):
+                    if nxt in parent:
+                        continue
+                    parent[nxt] = (nid, rel)
+                    if nxt == target:
+                        path: List[Tuple[Optional[str], GraphNode]] = []
+                        cur = target
+                        while cur != source:
+                            prev, via = parent[cur]
+                            path.append((via, self._nodes[cur]))
+                            cur = prev
+                        path.append((None, self._nodes[source]))
+                        path.reverse()
+                        return path
+                    frontier.append((nxt, depth + 1))
+        return None
@@ -0,0 +1,239 @@
+# core/index/reign_index.py
+# -*- coding: utf-8 -*-
+"""
+在位区间索引：把 history_chronology 中连续的行合并为 ReignSpan，
+并用区间树回答“某年有哪些政权并立”“两政权何时并存”等查询。
+"""
+from __future__ import annotations
+
+from bisect import bisect_right
+from typing import Collection, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from core.index.interval_tree import IntervalTree
+from core.models.history_entry import HistoryEntry
+from core.models.reign_span import ReignSpan
+
+# 合并键：(政权, 时期, 帝号, 帝名, 年号)；帝号为空的君主需用帝名区分
+_SpanKey = Tuple[str, str, Optional[str], Optional[str], Optional[str]]
+
+# 同名政权的存续年份间断超过该年数时视为不同的政权
+REGIME_SPLIT_GAP = 50
+
+# 政权身份：(政权名, 同名政权中按时间先后的序号)
+RegimeKey = Tuple[str, int]
+
+
+class RegimeOverlap(NamedTuple):
+    """两个政权及其同时存在的年份区间"""
+    regime_a: RegimeKey
+    regime_b: RegimeKey
+    ranges: List[Tuple[int, int]]
+
+
+def next_year(year: int) -> int:
+    """公元纪年的下一年（无公元 0 年）"""
+    return 1 if year == -1 else year + 1
+
+
+def year_to_offset(year: int, first_year: int) -> int:
+    """公元年份 -> 自 first_year 起的连续下标（跳过不存在的公元 0 年）"""
+    offset = year - first_year
+    if first_year < 0 < year:
+        offset -= 1
+    return offset
+
+
+def offset_to_year(offset: int, first_year: int) -> int:
+    """year_to_offset 的逆运算"""
+    year = first_year + offset
+    if first_year < 0 and year >= 0:
+        year += 1
+    return year
+
+
+def build_reign_spans(entries: Iterable[HistoryEntry]) -> List[ReignSpan]:
+    """
+    按行序（即公元升序）扫描条目，把同一合并键下年份连续、序年递增的行合并为一个区间。
+    返回结果按区间起始行的顺序排列。
+    """
+    spans: List[ReignSpan] = []
+    # key -> (spans 中的下标, 最近一行的序年)
+    open_spans: Dict[_SpanKey, Tuple[int, Optional[float]]] = {}
+
+    for e in entries:
+        key: _SpanKey = (e.regime, e.period, e.emperor_title, e.emperor_name, e.reign_title)
+        current = open_spans.get(key)
+        if current is not None:
+            idx, last_regnal = current
+            span = spans[idx]
+            if e.year_ad == span.end_year:
+                # 同年重复行，不影响区间
+                continue
+            regnal_ok = (
+                e.regnal_year is None
+                or last_regnal is None
+                or e.regnal_year == last_regnal + 1
+            )
+            if e.year_ad == next_year(span.end_year) and regnal_ok:
+                span.end_year = e.year_ad
+                open_spans[key] = (idx, e.regnal_year)
+                continue
+
+        spans.append(ReignSpan(
+            regime=e.regime,
+            period=e.period,
+            emperor_title=e.emperor_title,
+            emperor_name=e.emperor_name,
+            reign_title=e.reign_title,
+            start_year=e.year_ad,
+            end_year=e.year_ad,
+            first_regnal_year=e.regnal_year,
+        ))
+        open_spans[key] = (len(spans) - 1, e.regnal_year)
+
+    return spans
+
+
+def merge_year_ranges(ranges: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """合并相交或首尾相接的年份区间"""
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= next_year(merged[-1][1]):
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def intersect_year_ranges(
+    a: List[Tuple[int, int]], b: List[Tuple[int, int]]
+) -> List[Tuple[int, int]]:
+    """求两组已合并区间的交集（双指针）"""
+    out: List[Tuple[int, int]] = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        lo = max(a[i][0], b[j][0])
+        hi = min(a[i][1], b[j][1])
+        if lo <= hi:
+            out.append((lo, hi))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return out
+
+
+def split_regime_ranges(ranges: Iterable[Tuple[int, int]]) -> List[List[Tuple[int, int]]]:
+    """把同名政权的存续区间按超过 REGIME_SPLIT_GAP 年的间断分组，每组为一个政权的已合并区间"""
+    groups: List[List[Tuple[int, int]]] = []
+    for start, end in merge_year_ranges(ranges):
+        if groups and start - groups[-1][-1][1] <= REGIME_SPLIT_GAP:
+            groups[-1].append((start, end))
+        else:
+            groups.append([(start, end)])
+    return groups
+
+
+class RegimeSplit:
+    """
+    政权身份：同名的政权按存续年份的间断拆开（西汉的“漢”与刘渊的“漢”，春秋的“宋”、
+    南朝的“宋”与元末的“宋”），较短的间断（唐与武周、大理诸段之间）仍为同一政权。
+    在位区间索引、关系图、统计表与存续总览共用这一划分。
+    """
+
+    def __init__(self, spans: Iterable[ReignSpan]) -> None:
+        by_name: Dict[str, List[ReignSpan]] = {}
+        for s in spans:
+            by_name.setdefault(s.regime, []).append(s)
+        self._starts: Dict[str, List[int]] = {}
+        self._ranges: Dict[RegimeKey, List[Tuple[int, int]]] = {}
+        # 政权 -> 时期 -> 在位区间年数，取最多者为该政权的时期（如南朝宋跨东晋末一年，仍属南北朝）
+        period_years: Dict[RegimeKey, Dict[str, int]] = {}
+        for name, group in by_name.items():
+            splits = split_regime_ranges((s.start_year, s.end_year) for s in group)
+            self._starts[name] = [g[0][0] for g in splits]
+            for i, ranges in enumerate(splits):
+                self._ranges[(name, i)] = ranges
+            for s in group:
+                years = period_years.setdefault(self.key(s), {})
+                years[s.period] = years.get(s.period, 0) + s.end_year - s.start_year + 1
+        self._periods: Dict[RegimeKey, str] = {
+            k: max(years, key=years.__getitem__) for k, years in period_years.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self._ranges)
+
+    def key(self, span: ReignSpan) -> RegimeKey:
+        """区间所属的政权"""
+        return span.regime, bisect_right(self._starts[span.regime], span.start_year) - 1
+
+    def keys(self, names: Optional[Collection[str]] = None) -> List[RegimeKey]:
+        """全部政权（或名称在 names 中的政权），按始年排序"""
+        keys = self._ranges if names is None else [k for k in self._ranges if k[0] in names]
+        return sorted(keys, key=lambda k: self._ranges[k][0][0])
+
+    def ranges(self, key: RegimeKey) -> List[Tuple[int, int]]:
+        """政权存续的合并年份区间"""
+        return self._ranges[key]
+
+    def period(self, key: RegimeKey) -> str:
+        """政权所属的时期（在位区间年数最多的时期）"""
+        return self._periods[key]
+
+
+class ReignIndex:
+    """基于区间树的在位区间索引，构建后只读"""
+
+    def __init__(self, spans: List[ReignSpan]) -> None:
+        self._spans = spans
+        self._tree: IntervalTree[ReignSpan] = IntervalTree(
+            (s.start_year, s.end_year, s) for s in spans
+        )
+        self._by_regime: Dict[str, List[ReignSpan]] = {}
+        for s in spans:
+            self._by_regime.setdefault(s.regime, []).append(s)
+        # 同名政权的划分，关系图、统计表与存续总览共用
+        self.regime_split = RegimeSplit(spans)
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[HistoryEntry]) -> "ReignIndex":
+        return cls(build_reign_spans(entries))
+
+    @property
+    def spans(self) -> List[ReignSpan]:
+        return self._spans
+
+    def regimes(self) -> List[str]:
+        """全部政权名（按首次出现顺序）"""
+        return list(self._by_regime)
+
+    def active_in(self, year: int) -> List[ReignSpan]:
+        """某一年仍在使用的全部在位区间"""
+        return self._tree.stab(year)
+
+    def overlapping(self, year_from: int, year_to: int) -> List[ReignSpan]:
+        """与 [year_from, year_to] 有交集的全部在位区间"""
+        return self._tree.overlap(year_from, year_to)
+
+    def regime_ranges(self, regimes: Collection[str]) -> Dict[RegimeKey, List[Tuple[int, int]]]:
+        """
+        名称在 regimes 中（通常为同一政权名的简繁变体）的各个政权及其存续的合并年份区间，
+        按始年排序；同名而不相干的政权（见 RegimeSplit）分别列出
+        """
+        split = self.regime_split
+        return {k: split.ranges(k) for k in split.keys(regimes)}
+
+    def regime_overlap(
+        self, regimes_a: Collection[str], regimes_b: Collection[str]
+    ) -> List[RegimeOverlap]:
+        """两组名称下的政权两两比较，列出确有同时存在年份的配对及其年份区间"""
+        ranges_b = self.regime_ranges(regimes_b)
+        out: List[RegimeOverlap] = []
+        for a, ra in self.regime_ranges(regimes_a).items():
+            for b, rb in ranges_b.items():
+                common = intersect_year_ranges(ra, rb) if a != b else []
+                if common:
+                    out.append(RegimeOverlap(a, b, common))
+        return out
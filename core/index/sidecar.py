@@ -0,0 +1,370 @@
+# core/index/sidecar.py
+# -*- coding: utf-8 -*-
+"""
+索引旁路文件：把每次启动都要由 1.2 万行重新推导的数据一次性写入带版本号的二进制文件，
+之后启动时经 mmap 读入，不再扫描全表、不再导入 OpenCC / pypinyin：
+
+- 列式快照（rowid、公元、序年、各文本列按字符串表编码）；
+- 在位区间（区间索引、统计、交叉引用图、纪年标注表均由它构建）；
+- 各取值的简繁变体（OpenCC 结果）；
+- 模糊检索取值的拼音音节（pypinyin 结果，未安装 pypinyin 时不含此节）。
+
+文件以年表库的 SHA256 为键：库内容变化、版本号升级、字节序不同或任一节校验和不符时
+视为失效，由 SidecarManager 在后台线程重建（先写临时文件再替换），期间照常从数据库构建。
+载入时数据全部复制出 mmap 后即关闭映射，Windows 下后台重建才能替换该文件。
+
+打包时可预先生成，随程序分发：
+    python -m core.index.sidecar --db resources/History_Chronology.db
+"""
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from core.data.column_store import STORE_TEXT_COLUMNS, ColumnStore
+from core.data.query_cache import file_sha256
+from core.data.repository import ChronologyRepository
+from core.index.fuzzy_index import FUZZY_COLUMNS, _pinyin_func
+from core.index.reign_index import build_reign_spans
+from core.models.reign_span import ReignSpan
+
+# 格式或内容有变化时递增，旧文件随之失效
+SIDECAR_VERSION = 1
+SIDECAR_SUFFIX = ".idx"
+
+_MAGIC = b"SJIDX\x00\x00\x00"
+_PREAMBLE = struct.Struct("<II")   # 版本号, 头部长度
+_ALIGN = 8
+
+# 在位区间中编码为字符串表下标的字段
+_SPAN_TEXT_FIELDS: Tuple[str, ...] = ("regime", "period", "emperor_title", "emperor_name", "reign_title")
+
+
+class SidecarError(Exception):
+    """旁路文件不存在、已失效或已损坏"""
+
+
+def default_sidecar_path(db_path: str | Path) -> Path:
+    """年表库同目录下的旁路文件路径，如 History_Chronology.db.idx"""
+    db_path = Path(db_path)
+    return db_path.with_name(db_path.name + SIDECAR_SUFFIX)
+
+
+# ---------- 写入 ----------
+class _StringTable:
+    """字符串表：取值 -> 下标，None 编码为 -1"""
+
+    def __init__(self) -> None:
+        self.codes: Dict[str, int] = {}
+
+    def code(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.codes)
+        return code
+
+    def encode(self) -> bytes:
+        # 取值中不会出现 NUL，用作分隔符
+        return "\x00".join(self.codes).encode("utf-8")
+
+
+def build_sidecar(repo: ChronologyRepository, path: str | Path, db_hash: Optional[str] = None) -> Path:
+    """由数据库生成旁路文件（原子替换），返回写入的路径"""
+    path = Path(path)
+    if db_hash is None:
+        db_hash = file_sha256(repo.db_path)
+    store = ColumnStore.from_rows(repo.iter_all_rows())
+    spans = build_reign_spans(store.entries(range(len(store))))
+
+    strings = _StringTable()
+    sections: List[Tuple[str, str, bytes]] = [
+        ("rowids", "q", store.rowids.tobytes()),
+        ("years", "i", store.years.tobytes()),
+        ("regnal", "d", array("d", (float("nan") if v is None else v for v in store.regnal_years)).tobytes()),
+    ]
+    for column in STORE_TEXT_COLUMNS:
+        codes = array("i", (strings.code(v) for v in store.text[column]))
+        sections.append((f"text.{column}", "i", codes.tobytes()))
+    span_codes = array("i", (strings.code(getattr(s, f)) for s in spans for f in _SPAN_TEXT_FIELDS))
+    span_years = array("i", (y for s in spans for y in (s.start_year, s.end_year)))
+    span_regnal = array("d", (float("nan") if s.first_regnal_year is None else s.first_regnal_year for s in spans))
+    sections += [
+        ("spans.text", "i", span_codes.tobytes()),
+        ("spans.years", "i", span_years.tobytes()),
+        ("spans.regnal", "d", span_regnal.tobytes()),
+    ]
+
+    # 简繁变体：只记录与原文不同的部分；OpenCC 不可用时不写入，运行时照常现算
+    if _opencc_available():
+        variants = {
+            str(code): sorted(repo.text_variants(value) - {value})
+            for value, code in strings.codes.items()
+        }
+        sections.append(("variants", "json", _json_bytes({k: v for k, v in variants.items() if v})))
+    lazy_pinyin = _pinyin_func()
+    if lazy_pinyin is not None:
+        terms = {v for c in FUZZY_COLUMNS for v in store.postings(c)}
+        sections.append(("pinyin", "json", _json_bytes({t: lazy_pinyin(t, errors="ignore") for t in sorted(terms)})))
+    sections.append(("strings", "utf8", strings.encode()))
+
+    _write(path, db_hash, len(store), len(strings.codes), sections)
+    return path
+
+
+def _opencc_available() -> bool:
+    try:
+        import opencc  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _json_bytes(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _write(path: Path, db_hash: str, rows: int, strings: int, sections: Sequence[Tuple[str, str, bytes]]) -> None:
+    table: Dict[str, List[Any]] = {}
+    body = bytearray()
+    for name, kind, data in sections:
+        body.extend(b"\x00" * (-len(body) % _ALIGN))
+        table[name] = [len(body), len(data), kind, zlib.crc32(data)]
+        body.extend(data)
+    header = _json_bytes({
+        "db_sha256": db_hash,
+        "byteorder": sys.byteorder,
+        "rows": rows,
+        "strings": strings,
+        "sections": table,
+    })
+    header += b" " * (-(len(_MAGIC) + _PREAMBLE.size + len(header)) % _ALIGN)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(_MAGIC)
+            f.write(_PREAMBLE.pack(SIDECAR_VERSION, len(header)))
+            f.write(header)
+            f.write(body)
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+# ---------- 读取 ----------
+class SidecarIndex:
+    """已载入的旁路数据；各取用方法每次返回新对象，调用方可自由修改"""
+
+    def __init__(
+        self,
+        strings: List[str],
+        arrays: Dict[str, array],
+        variants: Optional[Dict[str, Set[str]]],
+        pinyin: Optional[Dict[str, List[str]]],
+    ) -> None:
+        self._strings = strings
+        self._arrays = arrays
+        # 原文 -> 简繁变体（含原文），None 表示生成时 OpenCC 不可用
+        self.variants = variants
+        # 模糊检索取值 -> 拼音音节，None 表示生成时 pypinyin 不可用
+        self.pinyin = pinyin
+
+    @classmethod
+    def load(cls, path: str | Path, db_hash: str) -> "SidecarIndex":
+        """载入并校验旁路文件；不存在、失效或损坏时抛出 SidecarError"""
+        try:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return cls._parse(mm, db_hash)
+        except SidecarError:
+            raise
+        except (OSError, ValueError, KeyError, TypeError, IndexError, struct.error) as exc:
+            raise SidecarError(f"索引旁路文件无法读取：{exc}") from exc
+
+    @classmethod
+    def _parse(cls, mm: mmap.mmap, db_hash: str) -> "SidecarIndex":
+        if mm[:len(_MAGIC)] != _MAGIC:
+            raise SidecarError("不是索引旁路文件")
+        version, header_len = _PREAMBLE.unpack_from(mm, len(_MAGIC))
+        if version != SIDECAR_VERSION:
+            raise SidecarError(f"版本 {version} 已过期")
+        start = len(_MAGIC) + _PREAMBLE.size
+        header = json.loads(bytes(mm[start:start + header_len]).decode("utf-8"))
+        if header["db_sha256"] != db_hash:
+            raise SidecarError("年表库内容已变化")
+        if header["byteorder"] != sys.byteorder:
+            raise SidecarError("字节序不同")
+        body = start + header_len
+
+        view = memoryview(mm)
+        try:
+            raw: Dict[str, Tuple[str, bytes]] = {}
+            for name, (offset, length, kind, crc) in header["sections"].items():
+                data = bytes(view[body + offset:body + offset + length])
+                if len(data) != length or zlib.crc32(data) != crc:
+                    raise SidecarError(f"节 {name} 校验失败")
+                raw[name] = (kind, data)
+        finally:
+            view.release()
+
+        strings = raw["strings"][1].decode("utf-8").split("\x00") if header["strings"] else []
+        if len(strings) != header["strings"]:
+            raise SidecarError("字符串表不完整")
+        arrays: Dict[str, array] = {}
+        for name, (kind, data) in raw.items():
+            if kind in ("q", "i", "d"):
+                arr = array(kind)
+                arr.frombytes(data)
+                arrays[name] = arr
+        if len(arrays["years"]) != header["rows"]:
+            raise SidecarError("行数不符")
+
+        variants: Optional[Dict[str, Set[str]]] = None
+        if "variants" in raw:
+            variants = {s: {s} for s in strings}
+            for code, extra in json.loads(raw["variants"][1].decode("utf-8")).items():
+                variants[strings[int(code)]].update(extra)
+        pinyin = json.loads(raw["pinyin"][1].decode("utf-8")) if "pinyin" in raw else None
+        return cls(strings, arrays, variants, pinyin)
+
+    def _decode(self, codes: Iterable[int]) -> List[Optional[str]]:
+        strings = self._strings
+        return [strings[c] if c >= 0 else None for c in codes]
+
+    def column_store(self) -> ColumnStore:
+        a = self._arrays
+        regnal = [None if v != v else v for v in a["regnal"]]  # NaN 即空值
+        text = {c: self._decode(a[f"text.{c}"]) for c in STORE_TEXT_COLUMNS}
+        return ColumnStore(a["rowids"], a["years"], regnal, text)
+
+    def reign_spans(self) -> List[ReignSpan]:
+        a = self._arrays
+        texts = self._decode(a["spans.text"])
+        years = a["spans.years"]
+        width = len(_SPAN_TEXT_FIELDS)
+        spans: List[ReignSpan] = []
+        for i, regnal in enumerate(a["spans.regnal"]):
+            fields = texts[i * width:(i + 1) * width]
+            spans.append(ReignSpan(
+                *fields,  # type: ignore[arg-type]
+                start_year=years[2 * i],
+                end_year=years[2 * i + 1],
+                first_regnal_year=None if regnal != regnal else regnal,
+            ))
+        return spans
+
+
+class SidecarManager:
+    """
+    负责查找、载入与后台重建旁路文件。paths 为候选位置，依次尝试载入；
+    重建时写入第一个可写的位置（打包后程序目录可能只读，可追加用户缓存目录）。
+    """
+
+    def __init__(self, db_path: str | Path, paths: Optional[Sequence[str | Path]] = None) -> None:
+        self._db_path = Path(db_path)
+        self._paths = [Path(p) for p in (paths or [default_sidecar_path(db_path)])]
+        self.index: Optional[SidecarIndex] = None
+        self.error: Optional[str] = None
+        self._db_hash: Optional[str] = None
+        self._builder: Optional[threading.Thread] = None
+        self._opened = False
+
+    def open(self) -> Optional[SidecarIndex]:
+        """载入旁路文件；全部失效或损坏时在后台重建，本次返回 None"""
+        if self._opened:
+            return self.index
+        self._opened = True
+        try:
+            self._db_hash = file_sha256(self._db_path)
+        except OSError as exc:
+            self.error = str(exc)
+            return None
+        for path in self._paths:
+            try:
+                self.index = SidecarIndex.load(path, self._db_hash)
+                return self.index
+            except SidecarError as exc:
+                self.error = f"{path.name}：{exc}"
+        self.rebuild_in_background()
+        return None
+
+    def rebuild_in_background(self) -> None:
+        if self._builder is not None and self._builder.is_alive():
+            return
+        self._builder = threading.Thread(target=self._rebuild, name="index-sidecar", daemon=True)
+        self._builder.start()
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """等待后台重建结束（命令行与测试用）"""
+        if self._builder is not None:
+            self._builder.join(timeout)
+
+    def close(self) -> None:
+        """退出前等待进行中的重建写完（守护线程被中途终止会留下临时文件）"""
+        self.wait()
+        self._builder = None
+
+    def _rebuild(self) -> None:
+        # 连接不可跨线程，重建使用独立的只读连接
+        repo = ChronologyRepository(self._db_path)
+        try:
+            for path in self._paths:
+                try:
+                    build_sidecar(repo, path, self._db_hash)
+                    self.index = SidecarIndex.load(path, self._db_hash or "")
+                    self.error = None
+                    return
+                except (OSError, SidecarError) as exc:
+                    self.error = f"{path}：{exc}"
+        finally:
+            repo.close()
+
+
+def _main(argv: Optional[Sequence[str]] = None) -> int:
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="生成或校验年表库的索引旁路文件")
+    parser.add_argument("--db", help="年表数据库路径，缺省使用 config.DB_PATH")
+    parser.add_argument("-o", "--output", help="旁路文件路径，缺省为数据库同目录的 .idx 文件")
+    parser.add_argument("--check", action="store_true", help="只校验现有文件，不重新生成")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        db_path = Path(args.db)
+    else:
+        import config
+        db_path = config.DB_PATH
+    path = Path(args.output) if args.output else default_sidecar_path(db_path)
+    db_hash = file_sha256(db_path)
+    if args.check:
+        try:
+            SidecarIndex.load(path, db_hash)
+        except SidecarError as exc:
+            print(f"{path}：{exc}", file=sys.stderr)
+            return 1
+        print(f"{path}：有效")
+        return 0
+    started = time.perf_counter()
+    repo = ChronologyRepository(db_path)
+    try:
+        build_sidecar(repo, path, db_hash)
+    finally:
+        repo.close()
+    print(f"已生成 {path}（{path.stat().st_size / 1024:.0f} KB，用时 {time.perf_counter() - started:.2f} 秒）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main())
@@ -4,7 +4,10 @@
 """
 
 from dataclasses import dataclass
-from typing import ClassVar, Tuple
+from typing import ClassVar, Optional, Tuple
+
+# 界面表格与导出文件共用的列标题
+DISPLAY_HEADERS: Tuple[str, ...] = ("公元", "干支", "时期", "政权", "帝号", "帝名", "年号", "在位年")
 
 
 @dataclass
@@ -40,3 +43,21 @@ class HistoryEntry:
     emperor_name: str          # 皇帝姓名，如李世民
     reign_title: str           # 年号，如贞观
     regnal_year: float         # 在位序年，例如1.0, 2.0
+
+    def dedup_key(self) -> Tuple[int, str, Optional[str], Optional[str]]:
+        """去重键 (公元, 干支, 帝号, 年号)，与关键字检索的去重规则一致"""
+        return (self.year_ad, self.ganzhi, self.emperor_title, self.reign_title)
+
+    def display_row(self) -> Tuple[str, ...]:
+        """按 DISPLAY_HEADERS 顺序格式化为展示用字符串"""
+        regnal_year_str = str(int(self.regnal_year)) if self.regnal_year is not None else ""
+        return (
+            str(self.year_ad),
+            self.ganzhi or "",
+            self.period or "",
+            self.regime or "",
+            self.emperor_title or "",
+            self.emperor_name or "",
+            self.reign_title or "",
+            regnal_year_str,
+        )
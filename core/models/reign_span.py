@@ -0,0 +1,49 @@
+# core/models/reign_span.py
+"""
+数据模型：在位区间，表示同一政权下某一帝号/年号连续使用的年份范围
+"""
+
+from dataclasses import dataclass
+from typing import ClassVar, Optional, Tuple
+
+
+@dataclass
+class ReignSpan:
+    """
+    表示一段连续的在位区间（由 history_chronology 中连续的行合并而来）：
+    regime: 政权
+    period: 朝代时期
+    emperor_title: 帝号
+    emperor_name: 皇帝姓名
+    reign_title: 年号
+    start_year: 起始公元年份（含）
+    end_year: 结束公元年份（含）
+    first_regnal_year: 区间首年的在位序年
+    """
+    __slots__: ClassVar[Tuple[str, ...]] = (
+        'regime',
+        'period',
+        'emperor_title',
+        'emperor_name',
+        'reign_title',
+        'start_year',
+        'end_year',
+        'first_regnal_year',
+    )
+
+    regime: str                          # 政权
+    period: str                          # 朝代时期
+    emperor_title: Optional[str]         # 帝号，可能为空
+    emperor_name: Optional[str]          # 帝名，可能为空
+    reign_title: Optional[str]           # 年号，可能为空
+    start_year: int                      # 起始公元年份
+    end_year: int                        # 结束公元年份
+    first_regnal_year: Optional[float]   # 起始年的在位序年
+
+    @property
+    def length(self) -> int:
+        """区间覆盖的年数（公元无 0 年，跨越公元前后时需减一）"""
+        years = self.end_year - self.start_year + 1
+        if self.start_year < 0 < self.end_year:
+            years -= 1
+        return years
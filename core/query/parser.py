@@ -0,0 +1,245 @@
+# core/query/parser.py
+# -*- coding: utf-8 -*-
+"""
+检索语句解析：把形如
+    年号:贞观 公元:600..700 -政权:唐 OR 帝名:李*
+的语句解析为语法树，并规范化为析取范式（若干“与”子句的“或”）。
+
+语法：
+- 字段:值        文本字段做子串匹配；值中含 * 时按通配符整体匹配（李* 即以“李”开头）
+- 公元:a..b      数值区间，两端可省略（..700 / 600..），也可写单个年份；年份/在位年 同理
+- 不带字段的词   在全部文本列中做子串匹配，等同关键字搜索
+- -条件          取反；-( ... ) 对整组取反
+- 空格           “与”；OR 或 | 表示“或”，优先级低于“与”；括号用于分组
+- 值可用双引号包裹以包含空格
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple, Union
+
+# 字段名（含别名） -> 数据库列名
+FIELD_ALIASES = {
+    "公元": "公元",
+    "干支": "干支",
+    "时期": "时期",
+    "朝代": "时期",
+    "政权": "政权",
+    "帝号": "帝号",
+    "帝名": "帝名",
+    "年号": "年号",
+    "年份": "年份",
+    "在位年": "年份",
+}
+NUMERIC_COLUMNS = ("公元", "年份")
+
+# 规范化后允许的最大子句数，防止取反、嵌套导致析取范式爆炸
+MAX_CLAUSES = 64
+
+_RANGE_RE = re.compile(r"^(-?\d+)?\.\.(-?\d+)?$")
+_INT_RE = re.compile(r"^-?\d+$")
+
+
+class QuerySyntaxError(ValueError):
+    """检索语句语法错误"""
+
+
+# ---------- 语法树 ----------
+@dataclass(frozen=True)
+class RangePredicate:
+    column: str
+    lo: Optional[int]
+    hi: Optional[int]
+
+    def __str__(self) -> str:
+        lo = "" if self.lo is None else self.lo
+        hi = "" if self.hi is None else self.hi
+        return f"{self.column}:{lo}..{hi}"
+
+
+@dataclass(frozen=True)
+class TextPredicate:
+    column: Optional[str]   # None 表示任意文本列
+    value: str
+
+    @property
+    def is_wildcard(self) -> bool:
+        return "*" in self.value
+
+    def __str__(self) -> str:
+        return self.value if self.column is None else f"{self.column}:{self.value}"
+
+
+Predicate = Union[RangePredicate, TextPredicate]
+
+
+@dataclass(frozen=True)
+class Not:
+    child: "Node"
+
+
+@dataclass(frozen=True)
+class And:
+    children: Tuple["Node", ...]
+
+
+@dataclass(frozen=True)
+class Or:
+    children: Tuple["Node", ...]
+
+
+Node = Union[RangePredicate, TextPredicate, Not, And, Or]
+
+
+@dataclass(frozen=True)
+class Literal:
+    """析取范式中的原子条件：谓词及是否取反"""
+    predicate: Predicate
+    negated: bool = False
+
+    def __str__(self) -> str:
+        return f"-{self.predicate}" if self.negated else str(self.predicate)
+
+
+# ---------- 词法 ----------
+_LPAREN, _RPAREN, _OR, _NOT, _WORD, _EOF = "(", ")", "OR", "NOT", "WORD", "EOF"
+
+
+def _tokenize(text: str) -> List[Tuple[str, str, int]]:
+    tokens: List[Tuple[str, str, int]] = []
+    i, n = 0, len(text)
+    while i < n:
+        ch = text[i]
+        if ch.isspace():
+            i += 1
+        elif ch in "()":
+            tokens.append((ch, ch, i))
+            i += 1
+        elif ch == "-" and i + 1 < n and not text[i + 1].isspace():
+            tokens.append((_NOT, ch, i))
+            i += 1
+        else:
+            start = i
+            buf: List[str] = []
+            while i < n and not text[i].isspace() and text[i] not in "()":
+                if text[i] == '"':
+                    end = text.find('"', i + 1)
+                    if end < 0:
+                        raise QuerySyntaxError(f"第 {i + 1} 个字符处的引号未闭合")
+                    buf.append(text[i + 1:end])
+                    i = end + 1
+                else:
+                    buf.append(text[i])
+                    i += 1
+            word = "".join(buf)
+            if word in ("OR", "|"):
+                tokens.append((_OR, word, start))
+            elif word != "AND":
+                tokens.append((_WORD, word, start))
+    tokens.append((_EOF, "", n))
+    return tokens
+
+
+def _make_predicate(word: str, pos: int) -> Predicate:
+    m = re.match(r"^([^:：]+)[:：](.*)$", word)
+    if m and m.group(1) in FIELD_ALIASES:
+        column, value = FIELD_ALIASES[m.group(1)], m.group(2)
+    else:
+        column, value = None, word
+    if not value:
+        raise QuerySyntaxError(f"第 {pos + 1} 个字符处缺少条件值：{word}")
+
+    if column in NUMERIC_COLUMNS:
+        if _INT_RE.match(value):
+            return RangePredicate(column, int(value), int(value))
+        rm = _RANGE_RE.match(value)
+        if not rm or (rm.group(1) is None and rm.group(2) is None):
+            raise QuerySyntaxError(f"{column} 需为整数或区间（如 600..700）：{value}")
+        lo = int(rm.group(1)) if rm.group(1) is not None else None
+        hi = int(rm.group(2)) if rm.group(2) is not None else None
+        if lo is not None and hi is not None and lo > hi:
+            lo, hi = hi, lo
+        return RangePredicate(column, lo, hi)
+    return TextPredicate(column, value)
+
+
+# ---------- 语法 ----------
+class _Parser:
+    def __init__(self, text: str) -> None:
+        self._tokens = _tokenize(text)
+        self._i = 0
+
+    def _peek(self) -> str:
+        return self._tokens[self._i][0]
+
+    def _next(self) -> Tuple[str, str, int]:
+        tok = self._tokens[self._i]
+        self._i += 1
+        return tok
+
+    def parse(self) -> Node:
+        if self._peek() == _EOF:
+            raise QuerySyntaxError("检索语句为空")
+        node = self._parse_or()
+        kind, text, pos = self._tokens[self._i]
+        if kind != _EOF:
+            raise QuerySyntaxError(f"第 {pos + 1} 个字符处有多余的“{text}”")
+        return node
+
+    def _parse_or(self) -> Node:
+        items = [self._parse_and()]
+        while self._peek() == _OR:
+            self._next()
+            items.append(self._parse_and())
+        return items[0] if len(items) == 1 else Or(tuple(items))
+
+    def _parse_and(self) -> Node:
+        items: List[Node] = []
+        while self._peek() not in (_OR, _RPAREN, _EOF):
+            items.append(self._parse_unary())
+        if not items:
+            kind, text, pos = self._tokens[self._i]
+            raise QuerySyntaxError(f"第 {pos + 1} 个字符处缺少条件")
+        return items[0] if len(items) == 1 else And(tuple(items))
+
+    def _parse_unary(self) -> Node:
+        kind, text, pos = self._next()
+        if kind == _NOT:
+            return Not(self._parse_unary())
+        if kind == _LPAREN:
+            node = self._parse_or()
+            if self._next()[0] != _RPAREN:
+                raise QuerySyntaxError(f"第 {pos + 1} 个字符处的括号未闭合")
+            return node
+        if kind == _WORD:
+            return _make_predicate(text, pos)
+        raise QuerySyntaxError(f"第 {pos + 1} 个字符处不应出现“{text}”")
+
+
+def parse_query(text: str) -> Node:
+    """解析检索语句为语法树，出错时抛出 QuerySyntaxError"""
+    return _Parser(text).parse()
+
+
+def to_dnf(node: Node, negated: bool = False) -> List[List[Literal]]:
+    """把语法树规范化为析取范式：外层为“或”，内层为“与”"""
+    if isinstance(node, (RangePredicate, TextPredicate)):
+        return [[Literal(node, negated)]]
+    if isinstance(node, Not):
+        return to_dnf(node.child, not negated)
+
+    # 德摩根律：取反后“与”“或”互换
+    conjunctive = isinstance(node, And) != negated
+    parts = [to_dnf(child, negated) for child in node.children]
+    if not conjunctive:
+        clauses = [clause for part in parts for clause in part]
+    else:
+        clauses = [[]]
+        for part in parts:
+            clauses = [c + d for c in clauses for d in part]
+            if len(clauses) > MAX_CLAUSES:
+                break
+    if len(clauses) > MAX_CLAUSES:
+        raise QuerySyntaxError("检索语句过于复杂，请减少取反或嵌套的“或”条件")
+    return clauses
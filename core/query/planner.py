@@ -0,0 +1,241 @@
+# core/query/planner.py
+# -*- coding: utf-8 -*-
+"""
+查询优化与执行：在 ColumnStore 上执行析取范式。
+
+每个“与”子句内按代价层级与估计选择度排序：
+1. 公元区间：二分定位，选择度精确且几乎零代价，总是最先执行；
+2. 文本条件：走“取值 -> 行号”倒排表；估计值按执行时同一组简繁变体扫描去重取值，
+   命中的倒排表留给执行阶段复用，变体也只展开一次；
+3. 无索引的数值条件（在位年）；
+4. 取反条件。
+执行时若候选集已为空则立即短路，后续条件不再计算；
+候选集较小时直接逐行过滤，不再合并倒排表。
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Pattern, Set, Tuple
+
+from core.data.column_store import STORE_TEXT_COLUMNS, ColumnStore
+from core.query.parser import Literal, Node, RangePredicate, TextPredicate, parse_query, to_dnf
+
+# 候选集小于该行数时，对后续条件逐行过滤而非合并倒排表
+FILTER_THRESHOLD = 256
+
+_TIER_YEAR_INDEX = 0
+_TIER_TEXT_INDEX = 1
+_TIER_SCAN = 2
+_TIER_NEGATED = 3
+
+_TIER_NAMES = {
+    _TIER_YEAR_INDEX: "公元索引",
+    _TIER_TEXT_INDEX: "文本索引",
+    _TIER_SCAN: "逐行扫描",
+    _TIER_NEGATED: "取反过滤",
+}
+
+
+@dataclass
+class PlanStep:
+    """执行计划中的一步，explain 时展示"""
+    literal: Literal
+    tier: int
+    estimate: int
+    method: str = "未执行"
+    rows_after: Optional[int] = None
+
+    def describe(self) -> str:
+        after = "—" if self.rows_after is None else str(self.rows_after)
+        return (
+            f"{self.literal}  [{_TIER_NAMES[self.tier]}，估计 {self.estimate} 行，"
+            f"{self.method}] → {after}"
+        )
+
+
+@dataclass
+class QueryPlan:
+    clauses: List[List[PlanStep]] = field(default_factory=list)
+    result_rows: int = 0
+
+    def describe(self) -> List[str]:
+        lines: List[str] = []
+        for n, steps in enumerate(self.clauses, 1):
+            lines.append(f"子句 {n}：")
+            lines.extend(f"  {i}. {step.describe()}" for i, step in enumerate(steps, 1))
+        lines.append(f"结果：{self.result_rows} 行")
+        return lines
+
+
+class _TextMatcher:
+    """文本条件的匹配器；简繁变体在首次需要时才展开"""
+
+    def __init__(self, pred: TextPredicate, variants: Callable[[str], Set[str]]) -> None:
+        self._pred = pred
+        self._variants_fn = variants
+        self._compiled: Optional[Tuple[List[str], List[Pattern[str]]]] = None
+
+    @staticmethod
+    def _glob(value: str) -> Pattern[str]:
+        return re.compile(".*".join(re.escape(part) for part in value.split("*")), re.S)
+
+    def _compile(self) -> Tuple[List[str], List[Pattern[str]]]:
+        if self._compiled is None:
+            variants = sorted(self._variants_fn(self._pred.value))
+            if self._pred.is_wildcard:
+                self._compiled = ([], [self._glob(v) for v in variants])
+            else:
+                self._compiled = (variants, [])
+        return self._compiled
+
+    def __call__(self, value: Optional[str]) -> bool:
+        if not value:
+            return False
+        subs, globs = self._compile()
+        return any(s in value for s in subs) or any(g.fullmatch(value) for g in globs)
+
+
+class QueryPlanner:
+    """基于 ColumnStore 的检索语句执行器"""
+
+    def __init__(self, store: ColumnStore, variants: Callable[[str], Set[str]]) -> None:
+        self._store = store
+        self._variants = variants
+        # 同一文本条件共用一个匹配器（变体只展开一次），各列命中的倒排表在估计时算好、执行时复用
+        self._matchers: Dict[TextPredicate, _TextMatcher] = {}
+        self._hits: Dict[Tuple[TextPredicate, str], List[List[int]]] = {}
+
+    # ---------- 对外接口 ----------
+    def execute(self, query: str | Node) -> Tuple[List[int], QueryPlan]:
+        """执行检索，返回按 公元, 年份 排序的行号与实际执行计划"""
+        node = parse_query(query) if isinstance(query, str) else query
+        plan = QueryPlan()
+        rows: Set[int] = set()
+        for clause in to_dnf(node):
+            steps = self._plan_clause(clause)
+            plan.clauses.append(steps)
+            rows |= self._run_clause(steps)
+        ordered = self._store.order_by_year(rows)
+        plan.result_rows = len(ordered)
+        return ordered, plan
+
+    # ---------- 规划 ----------
+    def _columns(self, pred: TextPredicate) -> Tuple[str, ...]:
+        return STORE_TEXT_COLUMNS if pred.column is None else (pred.column,)
+
+    def _plan_clause(self, clause: List[Literal]) -> List[PlanStep]:
+        steps = [self._plan_literal(lit) for lit in clause]
+        steps.sort(key=lambda s: (s.tier, s.estimate))
+        return steps
+
+    def _plan_literal(self, lit: Literal) -> PlanStep:
+        store = self._store
+        pred = lit.predicate
+        if isinstance(pred, RangePredicate):
+            if pred.column == "公元":
+                estimate = store.count_year_range(pred.lo, pred.hi)
+                tier = _TIER_YEAR_INDEX
+            else:
+                estimate, tier = len(store) // 2, _TIER_SCAN
+        else:
+            estimate = self._estimate_text(pred)
+            tier = _TIER_TEXT_INDEX
+        if lit.negated:
+            tier = _TIER_NEGATED
+            estimate = len(store) - estimate
+        return PlanStep(lit, tier, estimate)
+
+    def _matcher(self, pred: TextPredicate) -> _TextMatcher:
+        matcher = self._matchers.get(pred)
+        if matcher is None:
+            matcher = self._matchers[pred] = _TextMatcher(pred, self._variants)
+        return matcher
+
+    def _column_hits(self, pred: TextPredicate, col: str) -> List[List[int]]:
+        """该列中取值满足文本条件（含简繁变体）的倒排表"""
+        key = (pred, col)
+        hits = self._hits.get(key)
+        if hits is None:
+            matcher = self._matcher(pred)
+            hits = self._hits[key] = [
+                rows for value, rows in self._store.postings(col).items() if matcher(value)
+            ]
+        return hits
+
+    def _estimate_text(self, pred: TextPredicate) -> int:
+        """按执行时同一组简繁变体扫描各列的去重取值，累计命中倒排表的长度"""
+        return sum(
+            len(rows) for col in self._columns(pred) for rows in self._column_hits(pred, col)
+        )
+
+    # ---------- 执行 ----------
+    def _select(self, lit: Literal) -> Set[int]:
+        """用索引取出满足（未取反的）谓词的全部行"""
+        pred = lit.predicate
+        store = self._store
+        if isinstance(pred, RangePredicate):
+            if pred.column == "公元":
+                return set(store.year_range(pred.lo, pred.hi))
+            return {i for i in range(len(store)) if self._range_match(pred, i)}
+        out: Set[int] = set()
+        for col in self._columns(pred):
+            for rows in self._column_hits(pred, col):
+                out.update(rows)
+        return out
+
+    def _row_filter(self, lit: Literal) -> Callable[[int], bool]:
+        """逐行判断谓词（未取反）"""
+        pred = lit.predicate
+        if isinstance(pred, RangePredicate):
+            return lambda i: self._range_match(pred, i)
+        matcher = self._matcher(pred)
+        text = self._store.text
+        cols = [text[c] for c in self._columns(pred)]
+        # 同一取值只判断一次
+        cache: Dict[Optional[str], bool] = {}
+
+        def match(v: Optional[str]) -> bool:
+            hit = cache.get(v)
+            if hit is None:
+                hit = cache[v] = matcher(v)
+            return hit
+
+        return lambda i: any(match(col[i]) for col in cols)
+
+    def _range_match(self, pred: RangePredicate, i: int) -> bool:
+        value = self._store.years[i] if pred.column == "公元" else self._store.regnal_years[i]
+        if value is None:
+            return False
+        return (pred.lo is None or value >= pred.lo) and (pred.hi is None or value <= pred.hi)
+
+    def _run_clause(self, steps: List[PlanStep]) -> Set[int]:
+        candidates: Optional[Set[int]] = None
+        for step in steps:
+            if candidates is not None and not candidates:
+                step.method = "短路跳过"
+                continue
+            lit = step.literal
+            if candidates is None:
+                if lit.negated:
+                    excluded = self._select(lit)
+                    candidates = set(range(len(self._store))) - excluded
+                else:
+                    candidates = self._select(lit)
+                step.method = "索引取行"
+            elif len(candidates) <= FILTER_THRESHOLD or step.tier >= _TIER_SCAN:
+                keep = self._row_filter(lit)
+                if lit.negated:
+                    candidates = {i for i in candidates if not keep(i)}
+                else:
+                    candidates = {i for i in candidates if keep(i)}
+                step.method = "逐行过滤"
+            else:
+                selected = self._select(lit)
+                if lit.negated:
+                    candidates -= selected
+                else:
+                    candidates &= selected
+                step.method = "索引求交" if not lit.negated else "索引求差"
+            step.rows_after = len(candidates)
+        return candidates or set()
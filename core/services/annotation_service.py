@@ -0,0 +1,349 @@
+# core/services/annotation_service.py
+# -*- coding: utf-8 -*-
+"""
+批量纪年标注：在大规模文本中找出“开元二十年”“乾隆五十七年”之类的年号纪年，
+依据年表换算为公元年份，逐条流式输出为 JSON Lines。
+
+- 用全部年号（简繁两种写法）构建 Aho–Corasick 自动机，一次扫描找出所有年号；
+- 年号后紧跟“中文数字 + 年”时解析序年，并在该年号的全部在位区间中换算公元年份；
+  同名年号（如“建元”）会给出全部候选；
+- 输入文件按行边界切分为分片，由 ProcessPoolExecutor 多进程并行处理，
+  结果按输入顺序流式写出，内存占用与文件大小无关。
+
+命令行用法（在项目根目录执行）：
+    python -m core.services.annotation_service 史料/*.txt -o out.jsonl -j 8
+    python -m core.services.annotation_service 史料/*.txt --scaling   # 测量不同进程数下的吞吐
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Deque, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, TextIO, Tuple
+
+from core.index.aho_corasick import AhoCorasick
+from core.index.reign_index import offset_to_year
+from core.models.reign_span import ReignSpan
+from core.text.numerals import FIRST_YEAR_WORDS, NUMERAL_CHARS, parse_regnal_year
+
+# 默认分片大小：足够摊薄进程间传输开销，又能让多核负载均衡
+DEFAULT_SHARD_BYTES = 4 * 1024 * 1024
+
+# 年号后的“序年 + 年”，序年最多四个字（如“一百二十”）
+_REGNAL_RE = re.compile(
+    "([%s]{1,4}|[%s])年" % (re.escape(NUMERAL_CHARS), "".join(FIRST_YEAR_WORDS))
+)
+
+
+class ReignRecord(NamedTuple):
+    """年号的一段在位区间（精简为可廉价 pickle 的元组）"""
+    reign_title: str
+    regime: str
+    emperor_title: Optional[str]
+    emperor_name: Optional[str]
+    start_year: int
+    first_regnal_year: int
+    length: int
+
+
+# 年号（含简繁变体） -> 在位区间
+ReignYearTable = Dict[str, Tuple[ReignRecord, ...]]
+
+
+class Candidate(NamedTuple):
+    year_ad: int
+    regime: str
+    emperor_title: Optional[str]
+    emperor_name: Optional[str]
+
+
+class Annotation(NamedTuple):
+    """一处纪年标注；candidates 为空表示序年超出该年号的使用范围"""
+    start: int
+    end: int
+    text: str
+    reign_title: str
+    regnal_year: int
+    candidates: Tuple[Candidate, ...]
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "text": self.text,
+            "reign_title": self.reign_title,
+            "regnal_year": self.regnal_year,
+            "candidates": [c._asdict() for c in self.candidates],
+        }
+
+
+def build_reign_year_table(
+    spans: Iterable[ReignSpan], variants: Callable[[str], Set[str]]
+) -> ReignYearTable:
+    """由在位区间构建 年号 -> 区间 表，年号的简繁写法都作为键"""
+    by_title: Dict[str, List[ReignRecord]] = {}
+    for s in spans:
+        if not s.reign_title:
+            continue
+        rec = ReignRecord(
+            reign_title=s.reign_title,
+            regime=s.regime,
+            emperor_title=s.emperor_title,
+            emperor_name=s.emperor_name,
+            start_year=s.start_year,
+            first_regnal_year=int(s.first_regnal_year) if s.first_regnal_year is not None else 1,
+            length=s.length,
+        )
+        by_title.setdefault(s.reign_title, []).append(rec)
+
+    table: Dict[str, List[ReignRecord]] = {}
+    for title, records in by_title.items():
+        for v in variants(title):
+            table.setdefault(v, []).extend(records)
+    return {k: tuple(sorted(v, key=lambda r: r.start_year)) for k, v in table.items()}
+
+
+def resolve_reign_year(records: Iterable[ReignRecord], regnal_year: int) -> Tuple[Candidate, ...]:
+    """在一个年号的各段在位区间中换算序年，返回全部落在区间内的公元年份"""
+    out: List[Candidate] = []
+    for rec in records:
+        offset = regnal_year - rec.first_regnal_year
+        if 0 <= offset < rec.length:
+            out.append(Candidate(
+                offset_to_year(offset, rec.start_year),
+                rec.regime, rec.emperor_title, rec.emperor_name,
+            ))
+    return tuple(out)
+
+
+class ReignYearAnnotator:
+    """单进程标注器：自动机 + 序年解析 + 公元换算"""
+
+    def __init__(self, table: ReignYearTable) -> None:
+        self._table = table
+        self._automaton = AhoCorasick(table)
+
+    def resolve(self, reign_title: str, regnal_year: int) -> Tuple[Candidate, ...]:
+        """年号 + 序年 -> 全部可能的公元年份"""
+        return resolve_reign_year(self._table.get(reign_title, ()), regnal_year)
+
+    def annotate(self, text: str) -> List[Annotation]:
+        """
+        标注一段文本。同一位置有多个年号重叠时取最长者（如“太平兴国”优先于“兴国”），
+        已标注的片段不再参与后续匹配。
+        """
+        out: List[Annotation] = []
+        if "年" not in text:
+            # 不含“年”字的行不可能有纪年，跳过自动机扫描（按行调用时大部分行可直接略过）
+            return out
+        last_end = 0
+        for start, end, title in self._automaton.iter_matches(text):
+            if start < last_end:
+                continue
+            m = _REGNAL_RE.match(text, end)
+            if m is None:
+                continue
+            regnal = parse_regnal_year(m.group(1))
+            if regnal is None:
+                continue
+            out.append(Annotation(
+                start, m.end(), text[start:m.end()], title, regnal, self.resolve(title, regnal),
+            ))
+            last_end = m.end()
+        return out
+
+
+# ---------- 分片与多进程流水线 ----------
+@dataclass(frozen=True)
+class Shard:
+    """输入文件中按行边界切出的一段字节区间"""
+    path: str
+    index: int
+    offset: int
+    length: int
+
+
+@dataclass
+class AnnotationStats:
+    files: int = 0
+    bytes: int = 0
+    matches: int = 0
+    seconds: float = 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.bytes / 1048576 / self.seconds if self.seconds > 0 else 0.0
+
+
+def plan_shards(paths: Iterable[str | Path], shard_bytes: int = DEFAULT_SHARD_BYTES) -> List[Shard]:
+    """把每个文件切为约 shard_bytes 大小的分片，切点对齐到换行符之后"""
+    shards: List[Shard] = []
+    for path in paths:
+        path = str(path)
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            offset, index = 0, 0
+            while offset < size or (index == 0 and size == 0):
+                end = min(size, offset + shard_bytes)
+                if end < size:
+                    f.seek(end)
+                    tail = f.readline()
+                    end += len(tail)
+                shards.append(Shard(path, index, offset, end - offset))
+                offset, index = end, index + 1
+                if size == 0:
+                    break
+    return shards
+
+
+# 子进程中的标注器，由进程池 initializer 构建一次
+_worker_annotator: Optional[ReignYearAnnotator] = None
+
+
+def _init_worker(table: ReignYearTable) -> None:
+    global _worker_annotator
+    _worker_annotator = ReignYearAnnotator(table)
+
+
+def _annotate_shard(shard: Shard, encoding: str) -> Tuple[List[Tuple[int, int, Annotation]], int]:
+    """
+    标注一个分片，返回 ([(分片内行号, 行内列号, 标注)], 分片内换行数)。
+    行号从 0 起，由主进程加上分片前的累计行数。
+    """
+    assert _worker_annotator is not None
+    with open(shard.path, "rb") as f:
+        f.seek(shard.offset)
+        data = f.read(shard.length)
+    text = data.decode(encoding, errors="replace")
+    found: List[Tuple[int, int, Annotation]] = []
+    for line_no, line in enumerate(text.split("\n")):
+        for ann in _worker_annotator.annotate(line):
+            found.append((line_no, ann.start, ann))
+    return found, data.count(b"\n")
+
+
+def annotate_files(
+    paths: Sequence[str | Path],
+    output: TextIO,
+    table: ReignYearTable,
+    *,
+    workers: Optional[int] = None,
+    shard_bytes: int = DEFAULT_SHARD_BYTES,
+    encoding: str = "utf-8",
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> AnnotationStats:
+    """
+    多进程标注多个文件，按输入顺序向 output 逐行写出 JSON：
+        {"file", "line", "column", "text", "reign_title", "regnal_year", "candidates"}
+    line、column 均从 1 起。workers 为 1 时在当前进程内执行。
+    progress(已处理字节, 总字节) 在每个分片写出后回调。
+    """
+    shards = plan_shards(paths, shard_bytes)
+    total = sum(s.length for s in shards)
+    stats = AnnotationStats(files=len({s.path for s in shards}))
+    workers = workers or os.cpu_count() or 1
+    line_base: Dict[str, int] = {}
+    started = time.perf_counter()
+
+    def emit(shard: Shard, found: List[Tuple[int, int, Annotation]], newlines: int) -> None:
+        base = line_base.get(shard.path, 0)
+        for line_no, column, ann in found:
+            record = {"file": shard.path, "line": base + line_no + 1, "column": column + 1}
+            record.update(ann.to_dict())
+            output.write(json.dumps(record, ensure_ascii=False))
+            output.write("\n")
+        line_base[shard.path] = base + newlines
+        stats.matches += len(found)
+        stats.bytes += shard.length
+        if progress is not None:
+            progress(stats.bytes, total)
+
+    if workers <= 1:
+        _init_worker(table)
+        for shard in shards:
+            emit(shard, *_annotate_shard(shard, encoding))
+    else:
+        # 进程池模块导入较慢，仅在多进程路径中导入
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(table,)) as pool:
+            # 在途分片数有上限，保证结果按序写出的同时不积压内存
+            pending: Deque[Tuple[Shard, Future]] = deque()
+            it = iter(shards)
+            for shard in it:
+                pending.append((shard, pool.submit(_annotate_shard, shard, encoding)))
+                if len(pending) >= workers * 2:
+                    break
+            while pending:
+                shard, fut = pending.popleft()
+                emit(shard, *fut.result())
+                nxt = next(it, None)
+                if nxt is not None:
+                    pending.append((nxt, pool.submit(_annotate_shard, nxt, encoding)))
+
+    stats.seconds = time.perf_counter() - started
+    return stats
+
+
+def _main(argv: Optional[Sequence[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="批量标注文本中的年号纪年并换算公元年份")
+    parser.add_argument("files", nargs="+", help="输入文本文件")
+    parser.add_argument("-o", "--output", help="输出 JSONL 文件，缺省写到标准输出")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1, help="进程数")
+    parser.add_argument("--shard-mb", type=float, default=DEFAULT_SHARD_BYTES / 1048576, help="分片大小（MB）")
+    parser.add_argument("--encoding", default="utf-8", help="输入文件编码，如 utf-8、gb18030")
+    parser.add_argument("--db", help="年表数据库路径，缺省使用 config.DB_PATH")
+    parser.add_argument("--scaling", action="store_true", help="依次用 1、2、4… 个进程运行并报告吞吐（不输出标注）")
+    args = parser.parse_args(argv)
+
+    from core.data.repository import ChronologyRepository
+    from core.services.chronology_service import ChronologyService
+
+    if args.db:
+        db_path = args.db
+    else:
+        import config
+        db_path = config.DB_PATH
+    repo = ChronologyRepository(db_path)
+    try:
+        table = ChronologyService(repo).reign_year_table()
+    finally:
+        repo.close()
+
+    shard_bytes = max(1, int(args.shard_mb * 1048576))
+    if args.scaling:
+        counts = sorted({1, args.workers} | {n for n in (2, 4, 8, 16, 32) if n < args.workers})
+        for n in counts:
+            with open(os.devnull, "w", encoding="utf-8") as sink:
+                stats = annotate_files(
+                    args.files, sink, table,
+                    workers=n, shard_bytes=shard_bytes, encoding=args.encoding,
+                )
+            print(f"{n:>3} 进程：{stats.mb_per_second:8.2f} MB/s（{stats.seconds:.2f} 秒）", file=sys.stderr)
+        return 0
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        stats = annotate_files(
+            args.files, out, table,
+            workers=args.workers, shard_bytes=shard_bytes, encoding=args.encoding,
+        )
+    finally:
+        if args.output:
+            out.close()
+    print(
+        f"{stats.files} 个文件，{stats.bytes / 1048576:.2f} MB，标注 {stats.matches} 处，"
+        f"用时 {stats.seconds:.2f} 秒，吞吐 {stats.mb_per_second:.2f} MB/s",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main())
@@ -0,0 +1,288 @@
+# core/services/async_service.py
+# -*- coding: utf-8 -*-
+"""
+ChronologyService 的 asyncio 封装，供在事件循环中嵌入年表核心的程序使用：
+
+- 查询在有界线程池中执行（sqlite3 与 OpenCC 都是同步调用），不阻塞事件循环；
+- 每个工作线程持有独立的 ChronologyRepository 连接（SQLite 连接不可跨线程），
+  关闭时在各自的线程上关闭服务与连接；
+- 相同的查询（类型 + 参数）同时在途时只执行一次，所有等待者共享结果（single-flight）；
+- 等待者被取消只影响自身；全部等待者都取消时，尚未开始执行的查询随之撤销；
+- get_many 以 asyncio.gather 的方式批量查询。
+
+    async with AsyncChronologyService(config.DB_PATH) as svc:
+        tang, song = await svc.get_many([(QUERY_YEAR, {"year": 627}), (QUERY_KEYWORD, {"keyword": "宋"})])
+
+python -m core.services.async_service 对比同步逐个查询与并发查询的吞吐。
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from core.data.query_cache import QueryCache
+from core.data.repository import ChronologyRepository
+from core.models.history_entry import HistoryEntry
+from core.services.chronology_service import (
+    QUERY_ADVANCED,
+    QUERY_ALL,
+    QUERY_DSL,
+    QUERY_FUZZY,
+    QUERY_KEYWORD,
+    QUERY_YEAR,
+    ChronologyService,
+)
+
+DEFAULT_WORKERS = 4
+
+QueryRequest = Tuple[str, Dict[str, Any]]
+
+# 查询类型 -> 在工作线程中执行的同步调用
+_SYNC_QUERIES: Dict[str, Callable[[ChronologyService, Dict[str, Any]], List[HistoryEntry]]] = {
+    QUERY_YEAR: lambda svc, p: svc.get_chronology_by_year(p["year"]),
+    QUERY_KEYWORD: lambda svc, p: svc.find_entries(p["keyword"]),
+    QUERY_ADVANCED: lambda svc, p: svc.advanced_search(**p),
+    QUERY_DSL: lambda svc, p: svc.query(p["text"]),
+    QUERY_FUZZY: lambda svc, p: svc.find_entries_fuzzy(p["keyword"])[1],
+    QUERY_ALL: lambda svc, p: list(svc.iter_query(QUERY_ALL)),
+}
+
+
+class _Flight:
+    """一次在途查询：执行器 future 与仍在等待的调用方数量"""
+
+    __slots__ = ("future", "waiters")
+
+    def __init__(self, future: "asyncio.Future[List[HistoryEntry]]") -> None:
+        self.future = future
+        self.waiters = 0
+
+
+class AsyncChronologyService:
+    """
+    异步年表查询。须在同一个事件循环中使用；查询缓存（可选）在各工作线程间共享。
+    """
+
+    def __init__(
+        self,
+        db_path: str | Path,
+        max_workers: int = DEFAULT_WORKERS,
+        cache: Optional[QueryCache] = None,
+    ) -> None:
+        self._db_path = Path(db_path)
+        self._cache = cache
+        self._local = threading.local()
+        self._max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="chronology-async")
+        # 各工作线程创建的服务，关闭时逐个释放
+        self._services: List[ChronologyService] = []
+        self._services_lock = threading.Lock()
+        self._inflight: Dict[str, _Flight] = {}
+        self._closed = False
+        # 实际执行次数与被合并的请求数，供基准测试与诊断使用
+        self.executed = 0
+        self.coalesced = 0
+
+    # ---------- 查询 ----------
+    async def get_chronology_by_year(self, year: int) -> List[HistoryEntry]:
+        return await self.run(QUERY_YEAR, {"year": year})
+
+    async def find_entries(self, keyword: str) -> List[HistoryEntry]:
+        return await self.run(QUERY_KEYWORD, {"keyword": keyword})
+
+    async def advanced_search(self, **params: Any) -> List[HistoryEntry]:
+        return await self.run(QUERY_ADVANCED, params)
+
+    async def query(self, text: str) -> List[HistoryEntry]:
+        """检索语句；语法错误时抛出 QuerySyntaxError"""
+        return await self.run(QUERY_DSL, {"text": text})
+
+    async def run(self, kind: str, params: Optional[Dict[str, Any]] = None) -> List[HistoryEntry]:
+        """
+        按查询类型执行；与在途的相同查询合并。返回的列表为调用方独有的副本
+        """
+        if self._closed:
+            raise RuntimeError("AsyncChronologyService 已关闭")
+        if kind not in _SYNC_QUERIES:
+            raise ValueError(f"未知的查询类型：{kind}")
+        params = params or {}
+        key = QueryCache.make_key(kind, params)
+        flight = self._inflight.get(key)
+        if flight is not None and flight.future.cancelled():
+            # 已撤销的查询不可再合并（正常情况下撤销时已移出在途表）
+            flight = None
+        if flight is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._executor, self._execute, kind, params)
+            flight = self._inflight[key] = _Flight(future)
+            future.add_done_callback(lambda f, k=key, fl=flight: self._land(k, fl))
+            self.executed += 1
+        else:
+            self.coalesced += 1
+        flight.waiters += 1
+        try:
+            # shield：取消当前等待者不会取消其他等待者共享的查询
+            entries = await asyncio.shield(flight.future)
+        except asyncio.CancelledError:
+            flight.waiters -= 1
+            if flight.waiters == 0:
+                # 无人等待：尚未开始执行的查询直接撤销；完成回调要到下一轮事件循环才执行，
+                # 须立即移出在途表，否则其间到达的相同查询会合并到已撤销的 future 上
+                flight.future.cancel()
+                self._land(key, flight)
+            raise
+        flight.waiters -= 1
+        return list(entries)
+
+    async def get_many(
+        self, requests: Iterable[QueryRequest], return_exceptions: bool = False
+    ) -> List[Any]:
+        """
+        批量查询，结果与 requests 顺序一致；语义同 asyncio.gather
+        """
+        return await asyncio.gather(
+            *(self.run(kind, params) for kind, params in requests),
+            return_exceptions=return_exceptions,
+        )
+
+    # ---------- 生命周期 ----------
+    def close(self) -> None:
+        """等待执行中的查询结束，关闭各工作线程的服务与连接后关闭线程池"""
+        if self._closed:
+            return
+        self._closed = True
+        self._shutdown()
+
+    async def aclose(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        await asyncio.get_running_loop().run_in_executor(None, self._shutdown)
+
+    async def __aenter__(self) -> "AsyncChronologyService":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    # ---------- 内部 ----------
+    def _land(self, key: str, flight: _Flight) -> None:
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+
+    def _service(self) -> ChronologyService:
+        """当前工作线程的服务实例（首次使用时打开连接）"""
+        svc = getattr(self._local, "service", None)
+        if svc is None:
+            repo = self._local.repo = ChronologyRepository(self._db_path)
+            svc = self._local.service = ChronologyService(repo, self._cache)
+            with self._services_lock:
+                self._services.append(svc)
+        return svc
+
+    def _release_local(self, barrier: threading.Barrier) -> None:
+        """关闭当前工作线程的服务与连接；先在栅栏处等齐，保证每个线程恰好执行一次"""
+        barrier.wait()
+        svc = getattr(self._local, "service", None)
+        if svc is None:
+            return
+        svc.close()
+        self._local.repo.close()
+        self._local.service = self._local.repo = None
+        with self._services_lock:
+            self._services.remove(svc)
+
+    def _shutdown(self) -> None:
+        # SQLite 连接只能由创建它的线程关闭：向每个工作线程各派一个关闭任务。
+        # 任务按提交顺序执行，排在前面的查询会先执行完
+        if self._services:
+            barrier = threading.Barrier(self._max_workers)
+            jobs = [self._executor.submit(self._release_local, barrier) for _ in range(self._max_workers)]
+            for job in jobs:
+                job.result()
+        self._executor.shutdown(wait=True)
+
+    def _execute(self, kind: str, params: Dict[str, Any]) -> List[HistoryEntry]:
+        return _SYNC_QUERIES[kind](self._service(), params)
+
+
+# ---------- 基准测试 ----------
+def _workload(repo: ChronologyRepository, n: int, distinct: int) -> List[QueryRequest]:
+    """n 个请求，取自 distinct 个不同查询（年份与帝名关键字交替），模拟重复的热门查询"""
+    import random
+
+    rng = random.Random(0)
+    years = [y for y in range(-840, 1913) if y != 0]
+    names = sorted(repo.distinct_values("帝名"))
+    pool: List[QueryRequest] = []
+    for i in range(distinct):
+        if i % 2:
+            pool.append((QUERY_KEYWORD, {"keyword": rng.choice(names)}))
+        else:
+            pool.append((QUERY_YEAR, {"year": rng.choice(years)}))
+    return [rng.choice(pool) for _ in range(n)]
+
+
+async def _run_concurrent(
+    db_path: Path, requests: Sequence[QueryRequest], workers: int, concurrency: int
+) -> Tuple[float, int, int]:
+    """以最多 concurrency 个并发请求执行，返回 (耗时, 实际执行次数, 合并次数)"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with AsyncChronologyService(db_path, workers) as svc:
+        async def one(kind: str, params: Dict[str, Any]) -> List[HistoryEntry]:
+            async with semaphore:
+                return await svc.run(kind, params)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(kind, params) for kind, params in requests))
+        return time.perf_counter() - started, svc.executed, svc.coalesced
+
+
+def _main(argv: Optional[Sequence[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="对比同步逐个查询与异步并发查询的吞吐")
+    parser.add_argument("-n", type=int, default=2000, help="请求数")
+    parser.add_argument("--distinct", type=int, default=400, help="不同查询的数量（其余为重复请求）")
+    parser.add_argument("-j", "--workers", type=int, default=min(DEFAULT_WORKERS, os.cpu_count() or 1), help="工作线程数")
+    parser.add_argument("-c", "--concurrency", type=int, default=64, help="同时在途的请求数")
+    parser.add_argument("--db", help="年表数据库路径，缺省使用 config.DB_PATH")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        db_path = Path(args.db)
+    else:
+        import config
+        db_path = config.DB_PATH
+
+    repo = ChronologyRepository(db_path)
+    try:
+        requests = _workload(repo, args.n, args.distinct)
+        svc = ChronologyService(repo)
+        started = time.perf_counter()
+        for kind, params in requests:
+            _SYNC_QUERIES[kind](svc, params)
+        sync_seconds = time.perf_counter() - started
+    finally:
+        repo.close()
+
+    async_seconds, executed, coalesced = asyncio.run(
+        _run_concurrent(db_path, requests, args.workers, args.concurrency)
+    )
+    print(f"同步逐个：{args.n / sync_seconds:8.0f} 次/秒（{sync_seconds:.2f} 秒）")
+    print(
+        f"异步并发：{args.n / async_seconds:8.0f} 次/秒（{async_seconds:.2f} 秒，"
+        f"{args.workers} 线程，并发 {args.concurrency}，实际执行 {executed} 次，合并 {coalesced} 次）"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main())
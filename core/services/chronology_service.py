@@ -5,29 +5,102 @@
 
 from __future__ import annotations
 
-from typing import List, Optional
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
 
+from core.data.column_store import ColumnStore
+from core.data.federation import PRIMARY_DATASET, DatasetSpec, FederatedRepository, FederatedResult, SourcedEntry
+from core.data.query_cache import QueryCache
 from core.data.repository import ChronologyRepository
+from core.index.fuzzy_index import FUZZY_COLUMNS, FuzzyIndex, FuzzyMatch
+from core.index.reign_graph import GraphNode, ReignGraph
+from core.index.reign_index import RegimeOverlap, ReignIndex
+from core.index.sidecar import SidecarIndex, SidecarManager
 from core.models.history_entry import HistoryEntry
+from core.models.reign_span import ReignSpan
+from core.query.planner import QueryPlan, QueryPlanner
+from core.services.entry_store import EntryStore
+from core.services.export_service import CancelCheck, ProgressCallback, export_entries
+from core.services.occupancy_service import OccupancyMatrix
+from core.services.paged_result import PagedResult
+from core.services.ranked_search import DEFAULT_PAGE_SIZE, RankedSearch
+from core.services.statistics_service import ChronologyStatistics
+from core.services.year_prefetcher import DEFAULT_RADIUS, YearPrefetcher
+
+if TYPE_CHECKING:
+    from core.services.annotation_service import ReignYearAnnotator, ReignYearTable
+    from core.services.date_parser import DateExpressionParser
+
+# 可重放的查询类型：界面记录最近一次查询，以便导出“当前结果”
+QUERY_YEAR = "year"
+QUERY_KEYWORD = "keyword"
+QUERY_ADVANCED = "advanced"
+QUERY_FUZZY = "fuzzy"
+QUERY_RANKED = "ranked"
+QUERY_DSL = "query"
+QUERY_ALL = "all"
 
 
 class ChronologyService:
     """年表业务逻辑封装"""
 
-    def __init__(self, repo: ChronologyRepository) -> None:
+    def __init__(
+        self,
+        repo: ChronologyRepository,
+        cache: Optional[QueryCache] = None,
+        sidecar: Optional[SidecarManager] = None,
+        *,
+        low_memory: bool = False,
+    ) -> None:
         self._repo = repo
+        # 低内存模式（32 位版本）：大结果集分页流式读取，统计不使用 NumPy 向量化
+        self.low_memory = low_memory
+        # 跨会话查询结果缓存，可选；为 None 时每次直接查询
+        self._cache = cache
+        # 索引旁路文件，可选；载入后各索引直接由其构建，不再扫描全表
+        self._sidecar = sidecar
+        self._sidecar_applied: Optional[SidecarIndex] = None
+        self._column_store: Optional[ColumnStore] = None
+        self._entry_store: Optional[EntryStore] = None
+        self._reign_index: Optional[ReignIndex] = None
+        self._statistics: Optional[ChronologyStatistics] = None
+        self._reign_year_table: Optional[ReignYearTable] = None
+        self._date_parser: Optional[DateExpressionParser] = None
+        self._reign_graph: Optional[ReignGraph] = None
+        self._occupancy: Optional[OccupancyMatrix] = None
+        self._fuzzy_index: Optional[FuzzyIndex] = None
+        self._fuzzy_builder: Optional[threading.Thread] = None
+        # 相邻年份预取，首次 prefetch_years 时创建
+        self._prefetcher: Optional[YearPrefetcher] = None
+        # 多数据集联合查询，首次登记附加数据集时创建
+        self._federation: Optional[FederatedRepository] = None
 
     def get_chronology_by_year(self, year: int) -> List[HistoryEntry]:
         """
-        根据公元年份获取年表条目
+        根据公元年份获取年表条目；已预取的年份直接返回
         """
-        return self._repo.get_entries_by_year(year)
+        if self._prefetcher is not None:
+            entries = self._prefetcher.get(year)
+            if entries is not None:
+                return entries
+        entries = self._cached(QUERY_YEAR, {"year": year}, lambda: self._repo.get_entries_by_year(year))
+        if self._prefetcher is not None:
+            self._prefetcher.put(year, entries)
+        return entries
+
+    def prefetch_years(self, center: int, radius: int = DEFAULT_RADIUS) -> None:
+        """在后台预取 center 前后 radius 年，供逐年翻看时即时显示"""
+        if self._prefetcher is None:
+            self._prefetcher = YearPrefetcher(self._repo.db_path, radius)
+        self._prefetcher.radius = radius
+        self._prefetcher.request(center)
 
     def find_entries(self, keyword: str) -> List[HistoryEntry]:
         """
         简单关键字搜索，支持干支、帝号等字段
         """
-        return self._repo.search_entries(keyword)
+        return self._cached(QUERY_KEYWORD, {"keyword": keyword}, lambda: self._repo.search_entries(keyword))
 
     def advanced_search(
         self,
@@ -44,7 +117,7 @@ class ChronologyService:
         """
         多条件高级搜索，支持公元区间、干支、时期、政权、帝号、帝名、年号
         """
-        return self._repo.advanced_query(
+        params: Dict[str, Any] = dict(
             year_from=year_from,
             year_to=year_to,
             ganzhi=ganzhi,
@@ -54,3 +127,397 @@ class ChronologyService:
             emperor_name=emperor_name,
             reign_title=reign_title,
         )
+        return self._cached(QUERY_ADVANCED, params, lambda: self._repo.advanced_query(**params))
+
+    def find_entries_ranked(self, keyword: str, page_size: int = DEFAULT_PAGE_SIZE) -> RankedSearch:
+        """
+        按相关度排序的关键字搜索：返回结果游标，调用 next_page() 逐页取出
+        """
+        return RankedSearch(self._repo, keyword, page_size)
+
+    def page_query(
+        self, kind: str, params: Optional[Dict[str, Any]] = None, page_size: int = DEFAULT_PAGE_SIZE
+    ) -> PagedResult:
+        """
+        分页游标：直接读取数据库游标，内存中只保留当前一页，不经过查询缓存
+        """
+        return PagedResult(self.iter_query(kind, params), page_size, self.count_query(kind, params))
+
+    # ---------- 多数据集联合查询 ----------
+    def register_dataset(self, spec: DatasetSpec) -> None:
+        """登记附加纪年数据集；只影响 *_all 联合查询，单数据集查询不受影响"""
+        if self._federation is None:
+            self._federation = FederatedRepository(self._repo)
+        self._federation.register(spec)
+
+    def dataset_names(self) -> List[str]:
+        return self._federation.names if self._federation is not None else [PRIMARY_DATASET]
+
+    def get_chronology_by_year_all(self, year: int) -> FederatedResult:
+        """在全部数据集中按公元年份查询，结果标注来源；查询失败的附加数据集列在 failed 中"""
+        if self._federation is None:
+            return FederatedResult([SourcedEntry(PRIMARY_DATASET, e) for e in self.get_chronology_by_year(year)], {})
+        return self._federation.get_entries_by_year(year)
+
+    def find_entries_all(self, keyword: str) -> FederatedResult:
+        """在全部数据集中按关键字查询，结果按公元合并并标注来源；查询失败的附加数据集列在 failed 中"""
+        if self._federation is None:
+            return FederatedResult([SourcedEntry(PRIMARY_DATASET, e) for e in self.find_entries(keyword)], {})
+        return self._federation.search_entries(keyword)
+
+    # ---------- 查询结果缓存 ----------
+    def _cached(
+        self, kind: str, params: Dict[str, Any], compute: Callable[[], List[HistoryEntry]]
+    ) -> List[HistoryEntry]:
+        """先查缓存，未命中时执行 compute 并写回；出错的查询不缓存"""
+        if self._cache is None:
+            return compute()
+        entries = self._cache.get(kind, params)
+        if entries is None:
+            entries = compute()
+            self._cache.put(kind, params, entries)
+        return entries
+
+    def warm_up_cache(self) -> None:
+        """后台打开查询缓存旁路库并预载最近结果（未启用缓存时无操作）"""
+        if self._cache is not None:
+            self._cache.warm_up()
+
+    def cache_stats(self) -> Optional[Dict[str, int]]:
+        """查询缓存统计（未启用缓存时为 None）"""
+        return self._cache.stats() if self._cache is not None else None
+
+    # ---------- 索引旁路文件 ----------
+    def warm_up_sidecar(self) -> None:
+        """载入索引旁路文件；不存在或已失效时在后台重建，本次会话照常从数据库构建索引"""
+        if self._sidecar is not None:
+            self._sidecar.open()
+            self._sidecar_index()
+
+    def _sidecar_index(self) -> Optional[SidecarIndex]:
+        """已载入的旁路数据（后台重建完成后也会取到）；首次取到时登记其中的简繁变体"""
+        if self._sidecar is None:
+            return None
+        index = self._sidecar.index
+        if index is not None and index is not self._sidecar_applied:
+            if index.variants is not None:
+                self._repo.preload_variants(index.variants)
+            self._sidecar_applied = index
+        return index
+
+    # ---------- 检索语句 ----------
+    def column_store(self) -> ColumnStore:
+        """
+        全表列式快照（含公元索引与文本倒排表），首次使用时读入内存
+        """
+        if self._column_store is None:
+            index = self._sidecar_index()
+            if index is not None:
+                self._column_store = index.column_store()
+            else:
+                self._column_store = ColumnStore.from_rows(self._repo.iter_all_rows())
+        return self._column_store
+
+    def entry_store(self) -> EntryStore:
+        """
+        各结果页签共用的条目仓库（按整行内容去重），只索引页签仍在引用的条目
+        """
+        if self._entry_store is None:
+            self._entry_store = EntryStore()
+        return self._entry_store
+
+    def query(self, text: str) -> List[HistoryEntry]:
+        """
+        执行检索语句，如 `年号:贞观 公元:600..700 -政权:唐 OR 帝名:李*`；
+        语法错误时抛出 QuerySyntaxError
+        """
+        return self._cached(QUERY_DSL, {"text": text}, lambda: self.run_query(text)[0])
+
+    def run_query(self, text: str) -> Tuple[List[HistoryEntry], QueryPlan]:
+        """
+        执行检索语句并返回实际执行计划（谓词顺序、估计与实际行数）
+        """
+        store = self.column_store()
+        rows, plan = QueryPlanner(store, self._repo.keyword_variants).execute(text)
+        return store.entries(rows), plan
+
+    # ---------- 模糊 / 拼音检索 ----------
+    def _fuzzy_terms(self) -> Dict[str, Set[str]]:
+        """读取参与模糊检索的取值（原文 -> 所在列）"""
+        terms: Dict[str, Set[str]] = {}
+        use_store = self._sidecar_index() is not None
+        for column in FUZZY_COLUMNS:
+            values = self.column_store().postings(column) if use_store else self._repo.distinct_values(column)
+            for value in values:
+                terms.setdefault(value, set()).add(column)
+        return terms
+
+    def _fuzzy_variants(self, terms: Dict[str, Set[str]]) -> Dict[str, Set[str]]:
+        """各取值的简繁变体（不含原文）；无旁路文件时逐个调用 OpenCC，不涉及数据库连接"""
+        return {term: self._repo.text_variants(term) - {term} for term in terms}
+
+    def warm_up_fuzzy_index(self) -> None:
+        """
+        预构建模糊检索索引：只有取值在调用线程读出（连接不可跨线程），
+        简繁变体、拼音与 q-gram 计算都放到后台线程，避免阻塞界面
+        """
+        if self._fuzzy_index is not None or self._fuzzy_builder is not None:
+            return
+        terms = self._fuzzy_terms()
+        pinyin = self._fuzzy_pinyin()
+
+        def _build() -> None:
+            self._fuzzy_index = FuzzyIndex(terms, self._fuzzy_variants(terms), pinyin)
+
+        self._fuzzy_builder = threading.Thread(target=_build, name="fuzzy-index", daemon=True)
+        self._fuzzy_builder.start()
+
+    def fuzzy_index(self) -> FuzzyIndex:
+        """
+        模糊检索索引，只构建一次；后台预构建未完成时等待其结束
+        """
+        if self._fuzzy_builder is not None:
+            self._fuzzy_builder.join()
+            self._fuzzy_builder = None
+        if self._fuzzy_index is None:
+            terms = self._fuzzy_terms()
+            self._fuzzy_index = FuzzyIndex(terms, self._fuzzy_variants(terms), self._fuzzy_pinyin())
+        return self._fuzzy_index
+
+    def _fuzzy_pinyin(self) -> Optional[Dict[str, List[str]]]:
+        """旁路文件中预先算好的拼音，没有时由 FuzzyIndex 调用 pypinyin"""
+        index = self._sidecar_index()
+        return index.pinyin if index is not None else None
+
+    def find_entries_fuzzy(
+        self, query: str, limit: int = 20, time_budget: float = 0.05
+    ) -> Tuple[List[FuzzyMatch], List[HistoryEntry]]:
+        """
+        拼音 / 近似字检索：返回命中的取值（按相关度）及其对应条目，
+        条目按所属取值的相关度排序，同一取值内按公元排序
+        """
+        matches = self.fuzzy_index().search(query, limit=limit, time_budget=time_budget)
+        if not matches:
+            return matches, []
+        values_by_column: Dict[str, List[str]] = {}
+        for m in matches:
+            for column in m.columns:
+                values_by_column.setdefault(column, []).append(m.term)
+        rank = {m.term: i for i, m in enumerate(matches)}
+
+        def entry_rank(e: HistoryEntry) -> int:
+            return min(
+                rank.get(v, len(rank))
+                for v in (e.emperor_name, e.emperor_title, e.reign_title, e.regime)
+            )
+
+        entries = self._repo.get_entries_by_values(values_by_column)
+        entries.sort(key=entry_rank)  # 稳定排序，保留公元顺序
+        return matches, entries
+
+    # ---------- 流式查询与导出 ----------
+    def iter_query(self, kind: str, params: Optional[Dict[str, Any]] = None) -> Iterator[HistoryEntry]:
+        """
+        按查询类型流式返回结果，直接读取数据库游标
+        """
+        params = params or {}
+        if kind == QUERY_YEAR:
+            return self._repo.iter_entries_by_year(params["year"])
+        if kind == QUERY_KEYWORD:
+            return self._repo.iter_search_entries(params["keyword"])
+        if kind == QUERY_ADVANCED:
+            return self._repo.iter_advanced_query(**params)
+        if kind == QUERY_DSL:
+            # 只保留匹配的行号，条目逐个构造
+            store = self.column_store()
+            rows, _plan = QueryPlanner(store, self._repo.keyword_variants).execute(params["text"])
+            return map(store.entry, rows)
+        if kind == QUERY_RANKED:
+            # 与界面一致按相关度排序，逐页从堆中取出
+            return iter(RankedSearch(self._repo, params["keyword"]))
+        if kind == QUERY_FUZZY:
+            # 模糊检索结果集很小，直接复用排好序的列表
+            return iter(self.find_entries_fuzzy(params["keyword"])[1])
+        if kind == QUERY_ALL:
+            return self._repo.iter_all_entries()
+        raise ValueError(f"未知的查询类型：{kind}")
+
+    def count_query(self, kind: str, params: Optional[Dict[str, Any]] = None) -> Optional[int]:
+        """
+        预估结果行数，用于进度显示；关键字检索需去重，无法预先计数时返回 None
+        """
+        params = params or {}
+        if kind == QUERY_YEAR:
+            return self._repo.count_advanced_query(year_from=params["year"], year_to=params["year"])
+        if kind == QUERY_ADVANCED:
+            return self._repo.count_advanced_query(**params)
+        if kind == QUERY_ALL:
+            return self._repo.count_all()
+        return None
+
+    def export_query(
+        self,
+        path: str | Path,
+        kind: str,
+        params: Optional[Dict[str, Any]] = None,
+        fmt: Optional[str] = None,
+        *,
+        progress: Optional[ProgressCallback] = None,
+        cancelled: Optional[CancelCheck] = None,
+    ) -> int:
+        """
+        把查询结果流式导出到文件（CSV / JSONL / XLSX），返回写出行数
+        """
+        return export_entries(
+            self.iter_query(kind, params), path, fmt,
+            progress=progress, cancelled=cancelled,
+        )
+
+    # ---------- 在位区间（并立政权）查询 ----------
+    def reign_index(self) -> ReignIndex:
+        """
+        在位区间索引，首次使用时由全表连续行构建，之后常驻内存
+        """
+        if self._reign_index is None:
+            index = self._sidecar_index()
+            if index is not None:
+                self._reign_index = ReignIndex(index.reign_spans())
+            else:
+                self._reign_index = ReignIndex.from_entries(self._repo.iter_all_entries())
+        return self._reign_index
+
+    def get_concurrent_reigns(self, year: int) -> List[ReignSpan]:
+        """
+        某一公元年份同时在位的全部政权/君主/年号区间
+        """
+        return self.reign_index().active_in(year)
+
+    def get_reigns_between(self, year_from: int, year_to: int) -> List[ReignSpan]:
+        """
+        与公元区间 [year_from, year_to] 有交集的全部在位区间
+        """
+        return self.reign_index().overlapping(year_from, year_to)
+
+    def get_regime_overlap(self, regime_a: str, regime_b: str) -> List[RegimeOverlap]:
+        """
+        两个政权名（支持简繁体输入）下的政权同时存在的公元年份区间；
+        同名而不相干的政权（如春秋的宋、南朝宋、元末的宋）分别比较，逐对列出
+        """
+        return self.reign_index().regime_overlap(
+            self._repo.text_variants(regime_a),
+            self._repo.text_variants(regime_b),
+        )
+
+    # ---------- 政权 / 君主 / 年号 关系图 ----------
+    def reign_graph(self) -> ReignGraph:
+        """
+        交叉引用图，由在位区间一次性构建，之后的邻居与路径查询只访问内存邻接表
+        """
+        if self._reign_graph is None:
+            index = self.reign_index()
+            self._reign_graph = ReignGraph(index.spans, index.regime_split)
+        return self._reign_graph
+
+    def find_graph_nodes(self, name: str, kind: Optional[str] = None) -> List[GraphNode]:
+        """
+        按政权名、帝号、帝名或年号（支持简繁体输入，精确匹配）查找图节点
+        """
+        return self.reign_graph().find(self._repo.text_variants(name.strip()), kind)
+
+    def get_graph_neighbors(self, node_id: int, relation: Optional[str] = None) -> List[Tuple[str, GraphNode]]:
+        """
+        节点的直接关联：君主的年号与政权、政权的君主与并立政权、前任 / 继任等
+        """
+        return self.reign_graph().neighbors(node_id, relation)
+
+    def get_graph_path(
+        self, source: int, target: int, relations: Optional[List[str]] = None
+    ) -> Optional[List[Tuple[Optional[str], GraphNode]]]:
+        """
+        两节点之间的最短关联路径，不可达时返回 None
+        """
+        return self.reign_graph().shortest_path(source, target, relations)
+
+    # ---------- 政权存续总览 ----------
+    def occupancy_matrix(self) -> OccupancyMatrix:
+        """
+        公元年份 × 政权 存续矩阵，由在位区间一次性构建（游程编码），之后的查询只访问内存
+        """
+        if self._occupancy is None:
+            self._occupancy = OccupancyMatrix.from_reign_index(self.reign_index())
+        return self._occupancy
+
+    # ---------- 年号纪年标注 ----------
+    def reign_year_table(self) -> ReignYearTable:
+        """
+        年号（简繁两种写法） -> 在位区间 表，供纪年标注器构建自动机；
+        结果为普通元组，可直接传给标注子进程
+        """
+        if self._reign_year_table is None:
+            from core.services.annotation_service import build_reign_year_table
+            self._reign_year_table = build_reign_year_table(
+                self.reign_index().spans, self._repo.text_variants
+            )
+        return self._reign_year_table
+
+    def annotator(self) -> ReignYearAnnotator:
+        """当前进程内使用的纪年标注器"""
+        from core.services.annotation_service import ReignYearAnnotator
+        return ReignYearAnnotator(self.reign_year_table())
+
+    def date_parser(self) -> DateExpressionParser:
+        """纪年表达式解析器（“贞观三年”“前二二一年”“甲子年” -> 公元年份），首次调用时构建"""
+        if self._date_parser is None:
+            from core.services.date_parser import DateExpressionParser
+            spans = self.reign_index().spans
+            self._date_parser = DateExpressionParser(
+                self.reign_year_table(),
+                min(s.start_year for s in spans),
+                max(s.end_year for s in spans),
+            )
+        return self._date_parser
+
+    # ---------- 统计 ----------
+    def statistics(self) -> ChronologyStatistics:
+        """
+        统计汇总表，基于在位区间索引一次性预计算，之后的聚合查询无需访问数据库
+        """
+        if self._statistics is None:
+            use_numpy = False if self.low_memory else None
+            index = self.reign_index()
+            self._statistics = ChronologyStatistics(index.spans, use_numpy, index.regime_split)
+        return self._statistics
+
+    # ---------- 生命周期 ----------
+    def close(self) -> None:
+        """
+        关闭服务自行启动的后台部分：预取线程、附加数据集的工作线程、旁路文件重建线程；
+        仓库与查询缓存由创建者关闭
+        """
+        if self._prefetcher is not None:
+            self._prefetcher.close()
+            self._prefetcher = None
+        if self._federation is not None:
+            self._federation.close()
+            self._federation = None
+        if self._sidecar is not None:
+            self._sidecar.close()
+
+    # ---------- 内存 ----------
+    def release_memory(self) -> None:
+        """
+        丢弃可重建的内存结构（列式快照、统计表、关系图、纪年表、模糊索引、
+        查询缓存内存层、预取年份），下次使用时重新构建；在位区间索引较小，保留
+        """
+        self._column_store = None
+        self._statistics = None
+        self._reign_graph = None
+        self._reign_year_table = None
+        self._date_parser = None
+        self._occupancy = None
+        if self._fuzzy_builder is None:
+            self._fuzzy_index = None
+        if self._cache is not None:
+            self._cache.trim_memory()
+        if self._prefetcher is not None:
+            self._prefetcher.clear()
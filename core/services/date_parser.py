@@ -0,0 +1,331 @@
+# core/services/date_parser.py
+# -*- coding: utf-8 -*-
+"""
+纪年表达式解析：把用户输入的“贞观三年”“乾隆五十七年正月”“前二二一年”“甲子年”“开元己巳”
+等写法换算为公元年份，供年份框、关键字框直接查询。
+
+支持的写法（可组合）：
+- 公元年：618、-221、前221年、公元前二二一年、一九一一年；
+- 年号纪年：年号 + 序年（中文数字，或“元”表示第一年）+ 年，同名年号给出全部候选（按公元去重排序）；
+- 干支纪年：单独的“甲子年”给出范围内全部同干支年份；附在年号或公元年之后时用于筛选；
+- 月份后缀：正月、二月 … 十二月、冬月、腊月，可带“闰”，只记录不参与换算。
+
+解析只做字典查找：中文数字查 numeral_table 预展开表，年号按已知长度从长到短截取前缀查表，
+不使用正则回溯；解析结果另有有界缓存，批量解析重复的表达式时直接命中。
+
+命令行用法（在项目根目录执行）：
+    python -m core.services.date_parser 贞观三年 前二二一年 甲子年
+    python -m core.services.date_parser --bench -n 1000000   # 测量批量解析吞吐
+"""
+from __future__ import annotations
+
+import sys
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from core.index.reign_index import offset_to_year, year_to_offset
+from core.services.annotation_service import ReignYearTable, resolve_reign_year
+from core.text.numerals import (
+    FIRST_YEAR_WORDS, format_chinese_number, numeral_table, parse_chinese_number,
+)
+
+KIND_AD = "ad"
+KIND_REIGN = "reign"
+KIND_GANZHI = "ganzhi"
+
+_STEMS = "甲乙丙丁戊己庚辛壬癸"
+_BRANCHES = "子丑寅卯辰巳午未申酉戌亥"
+# 干支 -> 六十甲子序号（甲子为 0）
+SEXAGENARY: Dict[str, int] = {_STEMS[i % 10] + _BRANCHES[i % 12]: i for i in range(60)}
+
+# 月份写法 -> 月序
+MONTHS: Dict[str, int] = {format_chinese_number(m) + "月": m for m in range(1, 13)}
+MONTHS.update({"正月": 1, "元月": 1, "冬月": 11, "腊月": 12, "臘月": 12})
+_LEAP = ("闰", "閏")
+
+# 公元年前缀（含“公元前”“西元前”“前”三种写法）
+_AD_PREFIXES = ("公元", "西元")
+_BCE_PREFIX = "前"
+
+# 解析结果缓存条目上限，满后整体清空
+DEFAULT_CACHE_SIZE = 65536
+
+
+def ganzhi_of(year: int) -> str:
+    """公元年份的干支（公元 4 年为甲子年，没有公元 0 年）"""
+    astro = year + 1 if year < 0 else year
+    index = (astro - 4) % 60
+    return _STEMS[index % 10] + _BRANCHES[index % 12]
+
+
+class DateExpression(NamedTuple):
+    """一条纪年表达式的解析结果；years 为空表示写法合法但超出年表范围"""
+    text: str
+    kind: str
+    years: Tuple[int, ...]
+    reign_title: Optional[str] = None
+    regnal_year: Optional[int] = None
+    ganzhi: Optional[str] = None
+    month: Optional[int] = None
+    leap_month: bool = False
+
+
+class DateExpressionParser:
+    """
+    由年号纪年表（ChronologyService.reign_year_table）构建；year_min、year_max 为年表范围，
+    公元年与单独干支只在该范围内给出候选
+    """
+
+    def __init__(
+        self,
+        table: ReignYearTable,
+        year_min: int,
+        year_max: int,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+    ) -> None:
+        self._table = table
+        self.year_min = year_min
+        self.year_max = year_max
+        self._numbers = numeral_table()
+        # 年号长度从长到短，截取前缀时长者优先（“太平兴国”先于“兴国”）
+        self._title_lengths = sorted({len(t) for t in table}, reverse=True)
+        # 干支 -> 范围内全部同干支年份
+        by_ganzhi: Dict[str, List[int]] = {g: [] for g in SEXAGENARY}
+        for offset in range(year_to_offset(year_max, year_min) + 1):
+            year = offset_to_year(offset, year_min)
+            by_ganzhi[ganzhi_of(year)].append(year)
+        self._ganzhi_years = {g: tuple(ys) for g, ys in by_ganzhi.items()}
+        self._cache: Dict[str, Optional[DateExpression]] = {}
+        self._cache_size = cache_size
+
+    # ---------- API ----------
+    def parse(self, text: str) -> Optional[DateExpression]:
+        """解析一条表达式，不是纪年写法时返回 None"""
+        try:
+            return self._cache[text]
+        except KeyError:
+            pass
+        result = self._parse(text)
+        if self._cache_size:
+            if len(self._cache) >= self._cache_size:
+                self._cache.clear()
+            self._cache[text] = result
+        return result
+
+    def parse_many(self, texts: Iterable[str]) -> List[Optional[DateExpression]]:
+        """批量解析，结果与输入一一对应"""
+        parse = self.parse
+        return [parse(t) for t in texts]
+
+    def resolve_years(self, text: str) -> Tuple[int, ...]:
+        """表达式对应的全部公元年份；无法解析时为空"""
+        result = self.parse(text)
+        return result.years if result is not None else ()
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
+
+    # ---------- 解析 ----------
+    def _number(self, text: str) -> Optional[int]:
+        value = self._numbers.get(text)
+        if value is None and text:
+            value = parse_chinese_number(text)
+        return value
+
+    def _parse(self, text: str) -> Optional[DateExpression]:
+        s = text.strip().replace(" ", "")
+        if not s:
+            return None
+
+        month: Optional[int] = None
+        leap = False
+        if s.endswith("月"):
+            for k in (3, 2):
+                month = MONTHS.get(s[-k:])
+                if month is not None:
+                    s = s[:-k]
+                    break
+            if month is None:
+                return None
+            if s.endswith(_LEAP):
+                leap = True
+                s = s[:-1]
+
+        # “五十七年壬子”“壬子年”“乾隆五十七年”：干支可在“年”前或后
+        has_nian = s.endswith("年")
+        if has_nian:
+            s = s[:-1]
+        ganzhi: Optional[str] = None
+        if s[-2:] in SEXAGENARY:
+            ganzhi = s[-2:]
+            s = s[:-2]
+            if s.endswith("年"):
+                has_nian = True
+                s = s[:-1]
+
+        if not s:
+            if ganzhi is None or not has_nian:
+                return None  # 单独的“甲子”更可能是关键字
+            return DateExpression(
+                text, KIND_GANZHI, self._ganzhi_years[ganzhi], ganzhi=ganzhi, month=month, leap_month=leap,
+            )
+
+        ad = self._parse_ad(s, has_nian)
+        if ad is not None:
+            years = (ad,) if self._in_range(ad) else ()
+            if ganzhi is not None:
+                years = tuple(y for y in years if ganzhi_of(y) == ganzhi)
+            return DateExpression(text, KIND_AD, years, ganzhi=ganzhi, month=month, leap_month=leap)
+
+        return self._parse_reign(text, s, has_nian, ganzhi, month, leap)
+
+    def _parse_ad(self, s: str, has_nian: bool) -> Optional[int]:
+        """公元年（负数表示公元前），不是公元年写法时返回 None"""
+        explicit = s.startswith(_AD_PREFIXES)
+        if explicit:
+            s = s[2:]
+        sign = 1
+        if s.startswith(_BCE_PREFIX) or (s.startswith("-") and len(s) > 1):
+            sign = -1
+            s = s[1:]
+            explicit = True
+        if s.isascii() and s.isdigit():
+            value = int(s)
+        elif explicit or has_nian:
+            # 中文数字的公元年须带“年”或前缀，以免与关键字中的数字混淆
+            value = self._numbers.get(s)
+            if value is None or len(s) < 2 and not explicit:
+                return None
+        else:
+            return None
+        return sign * value if value > 0 else None
+
+    def _parse_reign(
+        self,
+        text: str,
+        s: str,
+        has_nian: bool,
+        ganzhi: Optional[str],
+        month: Optional[int],
+        leap: bool,
+    ) -> Optional[DateExpression]:
+        table = self._table
+        for k in self._title_lengths:
+            if k > len(s):
+                continue
+            records = table.get(s[:k])
+            if records is None:
+                continue
+            rest = s[k:]
+            if not rest:
+                if ganzhi is None:
+                    continue  # 单独的年号交给关键字检索
+                # “开元己巳”：在该年号的全部区间中找同干支的年份
+                # 同一年号的多个区间可能重叠（并立政权同用一个年号），按公元去重
+                years = sorted({
+                    y for rec in records for y in (offset_to_year(i, rec.start_year) for i in range(rec.length))
+                    if ganzhi_of(y) == ganzhi
+                })
+                return DateExpression(
+                    text, KIND_REIGN, tuple(years), reign_title=s[:k], ganzhi=ganzhi, month=month, leap_month=leap,
+                )
+            if not has_nian:
+                continue
+            regnal = 1 if rest in FIRST_YEAR_WORDS else self._number(rest)
+            if regnal is None or regnal <= 0:
+                continue
+            years = tuple(sorted({c.year_ad for c in resolve_reign_year(records, regnal)}))
+            if ganzhi is not None:
+                years = tuple(y for y in years if ganzhi_of(y) == ganzhi)
+            return DateExpression(
+                text, KIND_REIGN, years, reign_title=s[:k], regnal_year=regnal,
+                ganzhi=ganzhi, month=month, leap_month=leap,
+            )
+        return None
+
+    def _in_range(self, year: int) -> bool:
+        return year != 0 and self.year_min <= year <= self.year_max
+
+
+# ---------- 基准测试 ----------
+def sample_expressions(table: ReignYearTable, count: int, distinct: int = 10000) -> List[str]:
+    """
+    生成基准测试用的表达式：年号纪年（含元年、月份、干支后缀）、公元年、干支年混合，
+    先生成 distinct 条不同的写法再循环取满 count 条
+    """
+    import random
+
+    rng = random.Random(0)
+    titles = sorted(table)
+    ganzhi = sorted(SEXAGENARY)
+    forms: List[str] = []
+    for i in range(distinct):
+        r = i % 6
+        if r < 3:
+            rec = rng.choice(table[rng.choice(titles)])
+            n = rng.randint(rec.first_regnal_year, rec.first_regnal_year + rec.length - 1)
+            regnal = "元" if n == 1 else format_chinese_number(max(n, 1))
+            suffix = ("", "正月", "十二月", ganzhi_of(offset_to_year(n - rec.first_regnal_year, rec.start_year)))[r]
+            forms.append(f"{rec.reign_title}{regnal}年{suffix}")
+        elif r == 3:
+            forms.append(str(rng.randint(1, 1911)))
+        elif r == 4:
+            forms.append("前" + "".join("〇一二三四五六七八九"[int(d)] for d in str(rng.randint(1, 841))) + "年")
+        else:
+            forms.append(rng.choice(ganzhi) + "年")
+    return [forms[i % len(forms)] for i in range(count)]
+
+
+def _main(argv: Optional[Sequence[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="把纪年表达式换算为公元年份")
+    parser.add_argument("expressions", nargs="*", help="待解析的表达式，如 贞观三年、前二二一年")
+    parser.add_argument("--bench", action="store_true", help="测量批量解析吞吐")
+    parser.add_argument("-n", "--count", type=int, default=1000000, help="基准测试的表达式条数")
+    parser.add_argument("--distinct", type=int, default=10000, help="基准测试中不同写法的条数")
+    parser.add_argument("--db", help="年表数据库路径，缺省使用 config.DB_PATH")
+    args = parser.parse_args(argv)
+
+    from core.data.repository import ChronologyRepository
+    from core.services.chronology_service import ChronologyService
+
+    if args.db:
+        db_path = args.db
+    else:
+        import config
+        db_path = config.DB_PATH
+    repo = ChronologyRepository(db_path)
+    try:
+        svc = ChronologyService(repo)
+        date_parser = svc.date_parser()
+        table = svc.reign_year_table()
+    finally:
+        repo.close()
+
+    for text in args.expressions:
+        result = date_parser.parse(text)
+        if result is None:
+            print(f"{text}\t无法解析")
+        else:
+            years = "、".join(str(y) for y in result.years) or "超出年表范围"
+            print(f"{text}\t{years}")
+
+    if args.bench:
+        texts = sample_expressions(table, args.count, args.distinct)
+        for label, cache_size in (("无缓存", 0), ("有缓存", DEFAULT_CACHE_SIZE)):
+            bench = DateExpressionParser(table, date_parser.year_min, date_parser.year_max, cache_size)
+            started = time.perf_counter()
+            results = bench.parse_many(texts)
+            seconds = time.perf_counter() - started
+            resolved = sum(1 for r in results if r is not None and r.years)
+            print(
+                f"{label}：{len(texts)} 条，用时 {seconds:.2f} 秒，"
+                f"每分钟 {len(texts) / seconds * 60 / 1e6:.1f} 百万条，可换算 {resolved} 条",
+                file=sys.stderr,
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main())
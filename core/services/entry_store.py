@@ -0,0 +1,69 @@
+# core/services/entry_store.py
+# -*- coding: utf-8 -*-
+"""
+结果条目仓库：多个结果页签共用，内容相同的条目只保存一个 HistoryEntry 对象，
+页签只持有条目编号数组（每行 8 字节），切换页签时由数组取回共享的条目，不再查询。
+
+各查询接口返回的 HistoryEntry 来自 SQL、内存引擎或查询缓存，彼此是不同的对象；
+intern 按整行内容在“内容 -> 编号”索引中查得编号，首次出现的对象留作共享实例，
+内容完全相同的重复行归为同一条。索引只覆盖仍被页签引用的条目，随 retain 一同收缩，
+不依赖整表快照：低内存模式下只登记当前一页，仓库大小与各页签的结果之和成正比。
+"""
+from __future__ import annotations
+
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from core.models.history_entry import HistoryEntry
+
+# 整行内容，顺序同 HistoryEntry 字段
+RowKey = Tuple[int, str, str, str, Optional[str], Optional[str], Optional[str], Optional[float]]
+
+
+def row_key(e: HistoryEntry) -> RowKey:
+    return (e.year_ad, e.ganzhi, e.period, e.regime, e.emperor_title, e.emperor_name, e.reign_title, e.regnal_year)
+
+
+class EntryStore:
+    """按整行内容去重的共享条目表，条目编号在仓库内唯一、不会复用"""
+
+    def __init__(self) -> None:
+        self._id_of: Dict[RowKey, int] = {}
+        self._entries: Dict[int, HistoryEntry] = {}
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ---------- API ----------
+    def intern(self, entries: Iterable[HistoryEntry]) -> array:
+        """登记一组结果，返回对应的条目编号数组；已登记的行沿用原有对象"""
+        index = self._id_of
+        shared = self._entries
+        out = array("q")
+        for e in entries:
+            key = row_key(e)
+            entry_id = index.get(key)
+            if entry_id is None:
+                entry_id = index[key] = self._next_id
+                self._next_id += 1
+                shared[entry_id] = e
+            out.append(entry_id)
+        return out
+
+    def entries(self, entry_ids: Iterable[int]) -> List[HistoryEntry]:
+        """按编号取回共享的条目，顺序与 entry_ids 一致"""
+        shared = self._entries
+        return [shared[i] for i in entry_ids]
+
+    def retain(self, live: Iterable[Iterable[int]]) -> int:
+        """只保留仍被引用的条目（live 为各页签的编号数组），返回释放的条数"""
+        keep: Set[int] = set()
+        for entry_ids in live:
+            keep.update(entry_ids)
+        dropped = [i for i in self._entries if i not in keep]
+        for i in dropped:
+            del self._entries[i]
+        if dropped:
+            self._id_of = {k: i for k, i in self._id_of.items() if i in keep}
+        return len(dropped)
@@ -0,0 +1,182 @@
+# core/services/export_service.py
+# -*- coding: utf-8 -*-
+"""
+导出服务：把查询结果从游标流式写出为 CSV / JSONL / XLSX，
+逐行写入、不构建完整列表。CSV / JSONL 导出全表也只占用常量内存；
+XLSX 例外：openpyxl 需在内存中累积共享字符串表与行元数据，峰值随行数增长
+（全表约 12 MB，CSV / JSONL 仅数百 KB 以内）。
+"""
+from __future__ import annotations
+
+import csv
+import html
+import io
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Sequence
+
+from core.models.history_entry import DISPLAY_HEADERS, HistoryEntry
+
+# 格式 -> 文件对话框过滤器
+EXPORT_FORMATS: Dict[str, str] = {
+    "csv": "CSV 文件 (*.csv)",
+    "jsonl": "JSON Lines 文件 (*.jsonl)",
+    "xlsx": "Excel 工作簿 (*.xlsx)",
+}
+
+# 每写出多少行回调一次进度
+PROGRESS_EVERY = 500
+
+ProgressCallback = Callable[[int], None]
+CancelCheck = Callable[[], bool]
+
+
+class ExportCancelled(Exception):
+    """导出被用户取消"""
+
+
+def detect_format(path: str | Path) -> str:
+    """根据扩展名判断导出格式"""
+    fmt = Path(path).suffix.lower().lstrip(".")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"不支持的导出格式：{fmt or '（无扩展名）'}")
+    return fmt
+
+
+# ---------- 剪贴板文本格式（与文件导出共用表头与行格式） ----------
+def rows_to_tsv(rows: Iterable[Sequence[str]]) -> str:
+    """制表符分隔文本，可直接粘贴进 Excel / WPS"""
+    return "\n".join("\t".join(row) for row in rows)
+
+
+def rows_to_csv(rows: Iterable[Sequence[str]], headers: Optional[Sequence[str]] = None) -> str:
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    if headers:
+        writer.writerow(headers)
+    writer.writerows(rows)
+    return buf.getvalue()
+
+
+def rows_to_html(rows: Iterable[Sequence[str]], headers: Optional[Sequence[str]] = None) -> str:
+    parts = ["<table>"]
+    if headers:
+        parts.append("<tr>" + "".join(f"<th>{html.escape(h)}</th>" for h in headers) + "</tr>")
+    for row in rows:
+        parts.append("<tr>" + "".join(f"<td>{html.escape(v)}</td>" for v in row) + "</tr>")
+    parts.append("</table>")
+    return "".join(parts)
+
+
+def _entry_to_record(entry: HistoryEntry) -> Dict[str, object]:
+    """JSONL 记录：沿用数据库列名，保留原始类型"""
+    return {
+        "公元": entry.year_ad,
+        "干支": entry.ganzhi,
+        "时期": entry.period,
+        "政权": entry.regime,
+        "帝号": entry.emperor_title,
+        "帝名": entry.emperor_name,
+        "年号": entry.reign_title,
+        "年份": entry.regnal_year,
+    }
+
+
+class _Counter:
+    """在写出循环中计数、回调进度并检查取消"""
+
+    def __init__(self, progress: Optional[ProgressCallback], cancelled: Optional[CancelCheck]) -> None:
+        self.count = 0
+        self._progress = progress
+        self._cancelled = cancelled
+
+    def tick(self) -> None:
+        self.count += 1
+        if self.count % PROGRESS_EVERY == 0:
+            if self._cancelled is not None and self._cancelled():
+                raise ExportCancelled()
+            if self._progress is not None:
+                self._progress(self.count)
+
+
+def _write_csv(entries: Iterable[HistoryEntry], path: Path, counter: _Counter) -> None:
+    # utf-8-sig 便于 Excel 直接识别中文
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(DISPLAY_HEADERS)
+        for entry in entries:
+            writer.writerow(entry.display_row())
+            counter.tick()
+
+
+def _write_jsonl(entries: Iterable[HistoryEntry], path: Path, counter: _Counter) -> None:
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        for entry in entries:
+            f.write(json.dumps(_entry_to_record(entry), ensure_ascii=False))
+            f.write("\n")
+            counter.tick()
+
+
+def _write_xlsx(entries: Iterable[HistoryEntry], path: Path, counter: _Counter) -> None:
+    try:
+        from openpyxl import Workbook
+    except ImportError as exc:
+        raise RuntimeError("导出 XLSX 需要安装 openpyxl") from exc
+
+    # write_only 模式逐行写入工作表，避免为每个单元格建对象；
+    # 但共享字符串表等仍留在内存中，峰值随行数增长（全表约 12 MB）
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("史鉴")
+    ws.append(list(DISPLAY_HEADERS))
+    for entry in entries:
+        ws.append([
+            entry.year_ad,
+            entry.ganzhi,
+            entry.period,
+            entry.regime,
+            entry.emperor_title,
+            entry.emperor_name,
+            entry.reign_title,
+            int(entry.regnal_year) if entry.regnal_year is not None else None,
+        ])
+        counter.tick()
+    wb.save(str(path))
+
+
+_WRITERS = {
+    "csv": _write_csv,
+    "jsonl": _write_jsonl,
+    "xlsx": _write_xlsx,
+}
+
+
+def export_entries(
+    entries: Iterable[HistoryEntry],
+    path: str | Path,
+    fmt: Optional[str] = None,
+    *,
+    progress: Optional[ProgressCallback] = None,
+    cancelled: Optional[CancelCheck] = None,
+) -> int:
+    """
+    将条目流写出到 path，返回写出的行数。
+    先写入同目录临时文件，成功后再替换目标文件；取消或出错时不留下半成品。
+    """
+    path = Path(path)
+    fmt = fmt or detect_format(path)
+    if fmt not in _WRITERS:
+        raise ValueError(f"不支持的导出格式：{fmt}")
+
+    tmp = path.with_name(path.name + ".part")
+    counter = _Counter(progress, cancelled)
+    try:
+        _WRITERS[fmt](entries, tmp, counter)
+    except BaseException:
+        if tmp.exists():
+            tmp.unlink()
+        raise
+    os.replace(tmp, path)
+    if progress is not None:
+        progress(counter.count)
+    return counter.count
@@ -0,0 +1,89 @@
+# core/services/occupancy_service.py
+# -*- coding: utf-8 -*-
+"""
+公元年份 × 政权 存续矩阵（甘特图式总览）：
+每个政权一行（同名而不相干的政权按 RegimeSplit 分为多行），按始年排序；
+每行只保存合并后的存续区间（游程编码），
+全表约两千七百列 × 近百行的矩阵只需一百多个区间。单元格查询在行内二分，不访问数据库。
+"""
+from __future__ import annotations
+
+import bisect
+from array import array
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from core.index.reign_index import ReignIndex, offset_to_year, year_to_offset
+
+
+class OccupancyMatrix:
+    """游程编码的存续矩阵；列号为自 year_min 起的连续下标（跳过公元 0 年）"""
+
+    def __init__(
+        self,
+        regimes: Sequence[str],
+        periods: Sequence[str],
+        runs: Sequence[Sequence[Tuple[int, int]]],
+    ) -> None:
+        self.regimes: List[str] = list(regimes)
+        # 各行政权所属的时期，供按时期着色与悬停提示
+        self.periods: List[str] = list(periods)
+        years = [y for row in runs for run in row for y in run]
+        self.year_min = min(years) if years else 0
+        self.year_max = max(years) if years else 0
+        # 每行的区间起止列号（含），按起点升序且互不相交
+        self._starts: List[array] = []
+        self._ends: List[array] = []
+        for row in runs:
+            self._starts.append(array("i", (self.column(lo) for lo, _ in row)))
+            self._ends.append(array("i", (self.column(hi) for _, hi in row)))
+
+    @classmethod
+    def from_reign_index(cls, index: ReignIndex) -> "OccupancyMatrix":
+        split = index.regime_split
+        keys = split.keys()  # 按始年稳定排序：同年出现的按原行序
+        return cls([k[0] for k in keys], [split.period(k) for k in keys], [split.ranges(k) for k in keys])
+
+    # ---------- 坐标 ----------
+    @property
+    def row_count(self) -> int:
+        return len(self.regimes)
+
+    @property
+    def column_count(self) -> int:
+        return self.column(self.year_max) + 1 if self.regimes else 0
+
+    def column(self, year: int) -> int:
+        return year_to_offset(year, self.year_min)
+
+    def year(self, column: int) -> int:
+        return offset_to_year(column, self.year_min)
+
+    # ---------- 查询 ----------
+    def run_count(self) -> int:
+        return sum(len(s) for s in self._starts)
+
+    def occupied(self, row: int, column: int) -> bool:
+        starts = self._starts[row]
+        i = bisect.bisect_right(starts, column) - 1
+        return i >= 0 and column <= self._ends[row][i]
+
+    def run_at(self, row: int, column: int) -> Optional[Tuple[int, int]]:
+        """包含该单元格的区间（起止公元年），未存续时为 None"""
+        starts = self._starts[row]
+        i = bisect.bisect_right(starts, column) - 1
+        if i >= 0 and column <= self._ends[row][i]:
+            return self.year(starts[i]), self.year(self._ends[row][i])
+        return None
+
+    def runs_between(self, row: int, col_from: int, col_to: int) -> Iterator[Tuple[int, int]]:
+        """与列区间 [col_from, col_to] 相交的区间（列号，已裁剪）"""
+        starts, ends = self._starts[row], self._ends[row]
+        i = max(bisect.bisect_right(starts, col_from) - 1, 0)
+        while i < len(starts) and starts[i] <= col_to:
+            if ends[i] >= col_from:
+                yield max(starts[i], col_from), min(ends[i], col_to)
+            i += 1
+
+    def rows_at(self, column: int) -> List[int]:
+        """该列存续的全部行号"""
+        return [row for row in range(self.row_count) if self.occupied(row, column)]
@@ -0,0 +1,47 @@
+# core/services/paged_result.py
+# -*- coding: utf-8 -*-
+"""
+分页结果游标：把任意条目迭代器（通常直接读数据库游标）按页取出，
+内存中同时只保留一页，供低内存模式下“匹配全部”之类的大结果集使用。
+接口与 RankedSearch 一致（next_page / has_more / fetched / total），界面可互换使用。
+"""
+from __future__ import annotations
+
+from typing import Iterator, List, Optional
+
+from core.models.history_entry import HistoryEntry
+
+DEFAULT_PAGE_SIZE = 1000
+
+_EXHAUSTED = object()
+
+
+class PagedResult:
+    """按页流式取出结果；total 为预估总数，无法预先计数时为 None"""
+
+    def __init__(
+        self,
+        entries: Iterator[HistoryEntry],
+        page_size: int = DEFAULT_PAGE_SIZE,
+        total: Optional[int] = None,
+    ) -> None:
+        self._entries = iter(entries)
+        self.page_size = page_size
+        self.total = total
+        self.fetched = 0
+        # 预读一条，以便在不取下一页的情况下判断是否还有结果
+        self._lookahead = next(self._entries, _EXHAUSTED)
+
+    @property
+    def has_more(self) -> bool:
+        return self._lookahead is not _EXHAUSTED
+
+    def next_page(self, size: Optional[int] = None) -> List[HistoryEntry]:
+        """取出下一页条目；已取完时返回空列表"""
+        size = size or self.page_size
+        page: List[HistoryEntry] = []
+        while len(page) < size and self._lookahead is not _EXHAUSTED:
+            page.append(self._lookahead)
+            self._lookahead = next(self._entries, _EXHAUSTED)
+        self.fetched += len(page)
+        return page
@@ -0,0 +1,134 @@
+# core/services/ranked_search.py
+# -*- coding: utf-8 -*-
+"""
+按相关度排序的关键字检索：
+逐行流式读取匹配结果，只为每行计算一个轻量的排序键 (得分, rowid)，
+用大小为一页的有界堆选出前 k 条后才构造 HistoryEntry；其余结果按页惰性取出，
+内存只与页大小有关。
+"""
+from __future__ import annotations
+
+import heapq
+import sqlite3
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from core.data.repository import ChronologyRepository
+from core.models.history_entry import HistoryEntry
+
+# 字段权重：年号、帝名精确命中最重要，时期最弱
+FIELD_WEIGHTS: Dict[str, int] = {
+    "年号": 6,
+    "帝名": 6,
+    "帝号": 5,
+    "政权": 4,
+    "干支": 3,
+    "时期": 2,
+}
+
+# 匹配质量：完全相等 > 前缀 > 子串
+_QUALITY_EXACT = 3
+_QUALITY_PREFIX = 2
+_QUALITY_SUBSTRING = 1
+
+DEFAULT_PAGE_SIZE = 200
+
+# 排序键：(-得分, -命中字段数, 公元, 在位年, 序号, rowid)，越小越靠前
+_HeapItem = Tuple[int, int, int, float, int, int]
+
+
+def score_row(row: sqlite3.Row, variants: Sequence[str]) -> Tuple[int, int]:
+    """
+    计算一行的相关度：(最佳命中得分, 命中字段数)；
+    得分先比匹配质量，再比字段权重，例如精确命中政权高于前缀命中年号
+    """
+    best = 0
+    hits = 0
+    for col, weight in FIELD_WEIGHTS.items():
+        value = row[col]
+        if not value:
+            continue
+        quality = 0
+        for v in variants:
+            if value == v:
+                quality = _QUALITY_EXACT
+                break
+            if value.startswith(v):
+                quality = max(quality, _QUALITY_PREFIX)
+            elif v in value:
+                quality = max(quality, _QUALITY_SUBSTRING)
+        if quality:
+            hits += 1
+            best = max(best, quality * 10 + weight)
+    return best, hits
+
+
+class RankedSearch:
+    """
+    一次相关度检索的结果游标。
+    构造时流式扫描一遍，用大小为一页的有界堆（heapq.nsmallest）选出第一页并统计总数，
+    只保留这一页的排序键；之后每页重新扫描，选出排在上一页末条之后的前 k 条。
+    每页耗时 O(n log k)、内存 O(k)，与匹配总数无关；导出全部结果时才整体排序一次。
+    """
+
+    def __init__(
+        self,
+        repo: ChronologyRepository,
+        keyword: str,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> None:
+        self._repo = repo
+        self.keyword = keyword
+        self.page_size = page_size
+        self._variants = sorted(repo.keyword_variants(keyword))
+        # 已选出、尚未取走的排序键（升序）与最近取走的一条
+        self._pending: List[_HeapItem] = []
+        self._last: Optional[_HeapItem] = None
+        self.total = 0
+
+        def counted() -> Iterator[_HeapItem]:
+            for key in self._keys():
+                self.total += 1
+                yield key
+
+        self._pending = heapq.nsmallest(page_size, counted())
+        self.fetched = 0
+
+    def _keys(self, after: Optional[_HeapItem] = None) -> Iterator[_HeapItem]:
+        """流式计算各行的排序键；after 不为空时只给出排在其后的行（序号使排序键互不相同）"""
+        variants = self._variants
+        for seq, row in enumerate(self._repo.iter_search_rows(self.keyword)):
+            score, hits = score_row(row, variants)
+            regnal = row["年份"] if row["年份"] is not None else 0.0
+            key = (-score, -hits, row["公元"], regnal, seq, row["row_id"])
+            if after is None or key > after:
+                yield key
+
+    @property
+    def has_more(self) -> bool:
+        return self.fetched < self.total
+
+    def next_page(self, size: int | None = None) -> List[HistoryEntry]:
+        """按相关度取出下一页条目"""
+        size = size or self.page_size
+        want = min(size, self.total - self.fetched)
+        if len(self._pending) < want:
+            after = self._pending[-1] if self._pending else self._last
+            self._pending += heapq.nsmallest(want - len(self._pending), self._keys(after))
+        page, self._pending = self._pending[:want], self._pending[want:]
+        if page:
+            self._last = page[-1]
+        self.fetched += len(page)
+        return self._repo.get_entries_by_rowids([key[-1] for key in page])
+
+    def __iter__(self) -> Iterator[HistoryEntry]:
+        """按相关度逐页取出剩余的全部条目（用于导出）：剩余部分只扫描、排序一次"""
+        if not self.has_more:
+            return
+        after = self._pending[-1] if self._pending else self._last
+        rest = self._pending + sorted(self._keys(after))
+        self._pending = []
+        for i in range(0, len(rest), self.page_size):
+            page = rest[i:i + self.page_size]
+            self._last = page[-1]
+            self.fetched += len(page)
+            yield from self._repo.get_entries_by_rowids([key[-1] for key in page])
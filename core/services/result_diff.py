@@ -0,0 +1,99 @@
+# core/services/result_diff.py
+# -*- coding: utf-8 -*-
+"""
+结果集差异：以 HistoryEntry.dedup_key() 为键比较新旧两次查询结果，
+计算把旧结果变为新结果所需的最少行操作（删除、插入、原位更新），
+供结果表格增量刷新，避免整表重建导致的重绘、滚动与选区丢失。
+
+保留的行取新旧共有键序列的最长递增子序列，其余共有行视为“移动”（先删后插）。
+"""
+from __future__ import annotations
+
+import bisect
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, List, Sequence, Tuple
+
+from core.models.history_entry import HistoryEntry
+
+# 键 + 同键出现序号：结果中偶有重复键，按出现顺序一一配对
+_OccurrenceKey = Tuple[Hashable, int]
+
+
+@dataclass
+class EntryDiff:
+    """
+    removed：需删除的旧行号，降序（依次删除时行号不受影响）
+    inserted：需插入的新行号，升序（依次插入后各行即处于最终位置）
+    updated：键相同但展示内容变化、需原位刷新的新行号
+    mapping：新旧共有行（含移动的行）的 旧行号 -> 新行号，用于恢复选区与滚动位置
+    moved：共有行中需要移动（先删后插）的行数
+    """
+    removed: List[int] = field(default_factory=list)
+    inserted: List[int] = field(default_factory=list)
+    updated: List[int] = field(default_factory=list)
+    mapping: Dict[int, int] = field(default_factory=dict)
+    moved: int = 0
+
+    @property
+    def operations(self) -> int:
+        return len(self.removed) + len(self.inserted) + len(self.updated)
+
+    @property
+    def unchanged(self) -> bool:
+        return self.operations == 0
+
+
+def _occurrence_keys(entries: Sequence[HistoryEntry]) -> List[_OccurrenceKey]:
+    seen: Dict[Hashable, int] = {}
+    out: List[_OccurrenceKey] = []
+    for e in entries:
+        k = e.dedup_key()
+        n = seen.get(k, 0)
+        seen[k] = n + 1
+        out.append((k, n))
+    return out
+
+
+def _longest_increasing(seq: Sequence[int]) -> List[int]:
+    """最长严格递增子序列的下标（耐心排序，O(n log n)）"""
+    tails: List[int] = []       # tails[k]：长度为 k+1 的子序列末元素的值
+    tail_idx: List[int] = []    # 对应下标
+    prev = [-1] * len(seq)
+    for i, v in enumerate(seq):
+        k = bisect.bisect_left(tails, v)
+        if k == len(tails):
+            tails.append(v)
+            tail_idx.append(i)
+        else:
+            tails[k] = v
+            tail_idx[k] = i
+        prev[i] = tail_idx[k - 1] if k else -1
+    out: List[int] = []
+    i = tail_idx[-1] if tail_idx else -1
+    while i >= 0:
+        out.append(i)
+        i = prev[i]
+    out.reverse()
+    return out
+
+
+def diff_entries(old: Sequence[HistoryEntry], new: Sequence[HistoryEntry]) -> EntryDiff:
+    """计算 old -> new 的行操作"""
+    old_keys = _occurrence_keys(old)
+    new_pos = {k: i for i, k in enumerate(_occurrence_keys(new))}
+
+    # 共有行：按旧顺序排列的 (旧行号, 新行号)
+    common = [(i, new_pos[k]) for i, k in enumerate(old_keys) if k in new_pos]
+    stay = {common[j] for j in _longest_increasing([n for _, n in common])}
+
+    diff = EntryDiff(mapping=dict(common))
+    stay_old = {o for o, _ in stay}
+    diff.removed = [i for i in range(len(old) - 1, -1, -1) if i not in stay_old]
+    stay_new = {n for _, n in stay}
+    diff.inserted = [i for i in range(len(new)) if i not in stay_new]
+    diff.moved = len(common) - len(stay)
+    diff.updated = [
+        n for o, n in sorted(stay, key=lambda p: p[1])
+        if old[o].display_row() != new[n].display_row()
+    ]
+    return diff
@@ -0,0 +1,222 @@
+# core/services/statistics_service.py
+# -*- coding: utf-8 -*-
+"""
+统计服务：基于在位区间一次性预计算汇总表（rollup），
+之后的聚合查询均为常数或对数时间：
+- 各时期的君主在位次数（同一君主改元产生的多个年号区间合为一次在位）
+- 在位时长分布（有序数组 + 二分）
+- 每个世纪存在的政权数（同名而不相干的政权按 RegimeSplit 分别计数）
+- 每年并立的政权数及并立最多的年份
+
+安装 NumPy 时按年并立数等数组计算走向量化路径，否则使用 array 模块回退实现；
+NumPy 在首次构建汇总表时才导入，不拖慢程序启动。
+"""
+from __future__ import annotations
+
+import bisect
+from array import array
+from itertools import accumulate
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from core.index.reign_index import RegimeKey, RegimeSplit, next_year, offset_to_year, year_to_offset
+from core.models.reign_span import ReignSpan
+
+_UNLOADED: Any = object()
+_np: Any = _UNLOADED
+
+
+def _numpy() -> Any:
+    """首次调用时导入 NumPy，未安装时返回 None"""
+    global _np
+    if _np is _UNLOADED:
+        try:
+            import numpy
+        except ImportError:  # 可选依赖
+            numpy = None
+        _np = numpy
+    return _np
+
+
+def ruler_tenures(
+    spans: Sequence[ReignSpan], split: Optional[RegimeSplit] = None
+) -> List[Tuple[str, int, int]]:
+    """
+    把在位区间（每个年号一段）合并为君主在位：[(时期, 起始公元, 结束公元)]。
+    君主按 (政权, 帝号, 帝名) 区分（政权按 split 划分，同名而不相干的政权不混同），
+    首尾相接的区间合为一次在位，中断后复位记为两次；
+    时期取在位首段所属时期（跨西周、东周的君主只计一次）。帝号、帝名皆空的区间各自成段。
+    """
+    if split is None:
+        split = RegimeSplit(spans)
+    by_ruler: Dict[Tuple[RegimeKey, Optional[str], Optional[str]], List[ReignSpan]] = {}
+    tenures: List[Tuple[str, int, int]] = []
+    for s in spans:
+        if s.emperor_title or s.emperor_name:
+            by_ruler.setdefault((split.key(s), s.emperor_title, s.emperor_name), []).append(s)
+        else:
+            tenures.append((s.period, s.start_year, s.end_year))
+    for ruler_spans in by_ruler.values():
+        ruler_spans.sort(key=lambda x: x.start_year)
+        period, start, end = ruler_spans[0].period, ruler_spans[0].start_year, ruler_spans[0].end_year
+        for s in ruler_spans[1:]:
+            if s.start_year <= next_year(end):
+                end = max(end, s.end_year)
+            else:
+                tenures.append((period, start, end))
+                period, start, end = s.period, s.start_year, s.end_year
+        tenures.append((period, start, end))
+    return tenures
+
+
+def century_of(year: int) -> int:
+    """公元年份所属世纪：公元 1~100 年为 1，公元前 100~1 年为 -1"""
+    if year > 0:
+        return (year - 1) // 100 + 1
+    return -((-year - 1) // 100 + 1)
+
+
+class ChronologyStatistics:
+    """
+    年表统计汇总表。spans 为 ReignIndex 的在位区间（每段连续使用的帝号/年号记为一个在位区间），
+    在位次数与在位时长按君主合并后统计（见 ruler_tenures）。use_numpy 为 None 时自动检测 NumPy。
+    split 为政权划分（缺省由 spans 构建，通常传入 ReignIndex.regime_split）。
+    """
+
+    def __init__(
+        self, spans: Sequence[ReignSpan], use_numpy: Optional[bool] = None, split: Optional[RegimeSplit] = None
+    ) -> None:
+        self._vectorized = use_numpy is not False and _numpy() is not None
+        if split is None:
+            split = RegimeSplit(spans)
+
+        # —— 各时期君主在位次数、在位时长有序数组 ——
+        self._reigns_per_period: Dict[str, int] = {}
+        lengths_by_period: Dict[str, List[int]] = {}
+        for period, start, end in sorted(ruler_tenures(spans, split), key=lambda t: t[1]):
+            length = year_to_offset(end, start) + 1
+            self._reigns_per_period[period] = self._reigns_per_period.get(period, 0) + 1
+            lengths_by_period.setdefault(period, []).append(length)
+        self._lengths: Dict[str, List[int]] = {p: sorted(v) for p, v in lengths_by_period.items()}
+        self._all_lengths: List[int] = sorted(x for v in lengths_by_period.values() for x in v)
+
+        # —— 政权存续区间 ——
+        regime_ranges = {k: split.ranges(k) for k in split.keys()}
+
+        # —— 每个世纪存在的政权 ——
+        regimes_by_century: Dict[int, Set[RegimeKey]] = {}
+        for regime, ranges in regime_ranges.items():
+            for start, end in ranges:
+                for c in range(century_of(start), century_of(end) + 1):
+                    if c != 0:
+                        regimes_by_century.setdefault(c, set()).add(regime)
+        self._regimes_per_century: Dict[int, int] = {
+            c: len(v) for c, v in sorted(regimes_by_century.items())
+        }
+
+        # —— 每年并立政权数（差分数组 + 前缀和） ——
+        if spans:
+            self._first_year = min(s.start_year for s in spans)
+            last_year = max(s.end_year for s in spans)
+            n_years = year_to_offset(last_year, self._first_year) + 1
+        else:
+            self._first_year, n_years = 0, 0
+        bounds = [
+            (year_to_offset(start, self._first_year), year_to_offset(end, self._first_year))
+            for ranges in regime_ranges.values()
+            for start, end in ranges
+        ]
+        self._concurrency, self._busiest = self._concurrency_rollup(bounds, n_years)
+
+    @property
+    def vectorized(self) -> bool:
+        """是否使用了 NumPy 向量化路径"""
+        return self._vectorized
+
+    def _concurrency_rollup(
+        self, bounds: List[Tuple[int, int]], n_years: int
+    ) -> Tuple[Sequence[int], Sequence[int]]:
+        """返回 (每年并立数, 按并立数降序的年份下标)"""
+        if self._vectorized:
+            np = _numpy()
+            diff = np.zeros(n_years + 1, dtype=np.int32)
+            if bounds:
+                b = np.asarray(bounds, dtype=np.int64)
+                np.add.at(diff, b[:, 0], 1)
+                np.add.at(diff, b[:, 1] + 1, -1)
+            counts = np.cumsum(diff[:-1])
+            order = np.argsort(-counts, kind="stable")
+            return counts.tolist(), order.tolist()
+
+        diff = array("i", bytes(4 * (n_years + 1)))
+        for lo, hi in bounds:
+            diff[lo] += 1
+            diff[hi + 1] -= 1
+        counts = array("i", accumulate(diff[:-1]))
+        order = sorted(range(n_years), key=lambda i: -counts[i])
+        return counts, order
+
+    # ---------- 君主在位 ----------
+    def reigns_per_period(self) -> Dict[str, int]:
+        """各时期的君主在位次数（按时期首次出现顺序）"""
+        return dict(self._reigns_per_period)
+
+    def reign_count(self, period: Optional[str] = None) -> int:
+        if period is None:
+            return len(self._all_lengths)
+        return self._reigns_per_period.get(period, 0)
+
+    def _sorted_lengths(self, period: Optional[str]) -> List[int]:
+        return self._all_lengths if period is None else self._lengths.get(period, [])
+
+    def count_reigns_at_least(self, years: int, period: Optional[str] = None) -> int:
+        """在位时长不少于 years 年的君主在位次数，O(log n)"""
+        lengths = self._sorted_lengths(period)
+        return len(lengths) - bisect.bisect_left(lengths, years)
+
+    def reign_length_percentile(self, q: float, period: Optional[str] = None) -> Optional[int]:
+        """在位时长的 q 分位数（0 ≤ q ≤ 1，最近秩法），O(1)"""
+        lengths = self._sorted_lengths(period)
+        if not lengths:
+            return None
+        idx = min(len(lengths) - 1, max(0, int(round(q * (len(lengths) - 1)))))
+        return lengths[idx]
+
+    def reign_length_histogram(
+        self, bucket: int = 10, period: Optional[str] = None
+    ) -> List[Tuple[int, int, int]]:
+        """
+        在位时长直方图：[(下限, 上限, 在位次数)]，每个桶用两次二分计数
+        """
+        lengths = self._sorted_lengths(period)
+        if not lengths:
+            return []
+        out: List[Tuple[int, int, int]] = []
+        lo = 1
+        while lo <= lengths[-1]:
+            hi = lo + bucket - 1
+            n = bisect.bisect_right(lengths, hi) - bisect.bisect_left(lengths, lo)
+            out.append((lo, hi, n))
+            lo = hi + 1
+        return out
+
+    # ---------- 政权 ----------
+    def regimes_per_century(self) -> Dict[int, int]:
+        """每个世纪存在过的政权数，键为世纪（公元前为负）"""
+        return dict(self._regimes_per_century)
+
+    def regimes_in_century(self, century: int) -> int:
+        return self._regimes_per_century.get(century, 0)
+
+    def concurrency(self, year: int) -> int:
+        """某年并立的政权数，O(1)"""
+        offset = year_to_offset(year, self._first_year)
+        if 0 <= offset < len(self._concurrency):
+            return int(self._concurrency[offset])
+        return 0
+
+    def busiest_years(self, n: int = 10) -> List[Tuple[int, int]]:
+        """并立政权最多的 n 个年份：[(公元, 政权数)]，同数时年份早者在前"""
+        return [
+            (offset_to_year(i, self._first_year), int(self._concurrency[i]))
+            for i in self._busiest[:n]
+        ]
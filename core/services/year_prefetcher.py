@@ -0,0 +1,120 @@
+# core/services/year_prefetcher.py
+# -*- coding: utf-8 -*-
+"""
+相邻年份预取：按年份查询后，用户通常会逐年前后翻看。
+后台线程用独立的只读连接（SQLite 连接不可跨线程）一次区间查询取回
+中心年份前后 radius 年的条目，按年分组放入内存 LRU，翻年时直接命中。
+
+只保留最新一次的预取请求：快速连续翻年时，过时的中心年份不再预取。
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from itertools import groupby
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from core.models.history_entry import HistoryEntry
+
+# 默认预取半径（前后各若干年）与内存中保留的年份数
+DEFAULT_RADIUS = 5
+DEFAULT_CAPACITY = 256
+
+
+class YearPrefetcher:
+    """后台预取相邻年份；get / put 可在任意线程调用"""
+
+    def __init__(self, db_path: str | Path, radius: int = DEFAULT_RADIUS, capacity: int = DEFAULT_CAPACITY) -> None:
+        self._db_path = Path(db_path)
+        self.radius = radius
+        self._capacity = max(capacity, 2 * radius + 1)
+        self._lock = threading.Lock()
+        self._years: "OrderedDict[int, List[HistoryEntry]]" = OrderedDict()
+        self._pending: Optional[int] = None
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    # ---------- 读写 ----------
+    def get(self, year: int) -> Optional[List[HistoryEntry]]:
+        """已预取的条目（副本）；未预取时为 None"""
+        with self._lock:
+            entries = self._years.get(year)
+            if entries is None:
+                return None
+            self._years.move_to_end(year)
+            return list(entries)
+
+    def put(self, year: int, entries: List[HistoryEntry]) -> None:
+        """登记前台查到的结果，往回翻时同样可以命中"""
+        with self._lock:
+            self._store(year, list(entries))
+
+    def request(self, center: int) -> None:
+        """请求预取 center 前后 radius 年；立即返回"""
+        if self._closed:
+            return
+        with self._lock:
+            self._pending = center
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="year-prefetch", daemon=True)
+            self._thread.start()
+        self._wake.set()
+
+    def clear(self) -> None:
+        """丢弃已预取的年份（内存紧张时）"""
+        with self._lock:
+            self._years.clear()
+
+    def close(self) -> None:
+        """停止后台线程并等待其关闭连接"""
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    # ---------- 后台 ----------
+    def _store(self, year: int, entries: List[HistoryEntry]) -> None:
+        self._years[year] = entries
+        self._years.move_to_end(year)
+        while len(self._years) > self._capacity:
+            self._years.popitem(last=False)
+
+    def _missing(self, center: int) -> List[int]:
+        with self._lock:
+            return [
+                y for y in range(center - self.radius, center + self.radius + 1)
+                if y not in self._years
+            ]
+
+    def _run(self) -> None:
+        from core.data.repository import ChronologyRepository
+
+        repo = ChronologyRepository(self._db_path)
+        try:
+            while True:
+                self._wake.wait()
+                self._wake.clear()
+                if self._closed:
+                    return
+                with self._lock:
+                    center, self._pending = self._pending, None
+                if center is None:
+                    continue
+                missing = self._missing(center)
+                if not missing:
+                    continue
+                lo, hi = missing[0], missing[-1]
+                grouped: Dict[int, List[HistoryEntry]] = {
+                    year: list(entries)
+                    for year, entries in groupby(repo.iter_entries_by_year_range(lo, hi), key=lambda e: e.year_ad)
+                }
+                with self._lock:
+                    for year in missing:
+                        # 无记录的年份（如公元 0 年）同样登记为空结果
+                        if year not in self._years:
+                            self._store(year, grouped.get(year, []))
+        finally:
+            repo.close()
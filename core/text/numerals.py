@@ -0,0 +1,125 @@
+# core/text/numerals.py
+# -*- coding: utf-8 -*-
+"""
+中文数字解析：把“二十”“廿一”“五十七”“一百二”“三〇”等写法转换为整数，
+并识别纪年中表示第一年的“元年”；numeral_table 预先展开常见写法供批量解析查表。
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+# 个位数字（含大写、异体）
+DIGITS: Dict[str, int] = {
+    "〇": 0, "零": 0, "○": 0,
+    "一": 1, "壹": 1, "二": 2, "贰": 2, "貳": 2, "两": 2, "兩": 2,
+    "三": 3, "叁": 3, "參": 3, "四": 4, "肆": 4, "五": 5, "伍": 5,
+    "六": 6, "陆": 6, "陸": 6, "七": 7, "柒": 7, "八": 8, "捌": 8, "九": 9, "玖": 9,
+}
+# 位值单位
+UNITS: Dict[str, int] = {"十": 10, "拾": 10, "百": 100, "佰": 100, "千": 1000, "仟": 1000}
+# 合文：廿 = 二十，卅 = 三十，卌 = 四十
+COMPOUNDS: Dict[str, int] = {"廿": 20, "卄": 20, "卅": 30, "卌": 40}
+# 纪年中表示第一年的写法（“初年”指在位初期、“正”只用于“正月”，都不是序年）
+FIRST_YEAR_WORDS = ("元",)
+
+# 可出现在数字中的全部字符，供正则或扫描使用
+NUMERAL_CHARS = "".join(DIGITS) + "".join(UNITS) + "".join(COMPOUNDS)
+# 规范写法所用的数字
+_PLAIN_DIGITS = "〇一二三四五六七八九"
+
+
+def parse_chinese_number(text: str) -> Optional[int]:
+    """
+    解析中文数字，无法解析时返回 None。
+    支持位值写法（二十七、一百零五、百二）与逐位写法（一九一一、三〇）。
+    """
+    if not text:
+        return None
+    if all(ch in DIGITS for ch in text):
+        # 逐位写法
+        if len(text) == 1:
+            return DIGITS[text]
+        value = 0
+        for ch in text:
+            value = value * 10 + DIGITS[ch]
+        return value
+
+    total = 0
+    digit: Optional[int] = None
+    last_unit = 10 ** 9
+    for ch in text:
+        if ch in DIGITS:
+            if digit is not None and DIGITS[ch] != 0 and digit != 0:
+                return None  # 如“二三十”，位值写法中数字不可相连
+            digit = DIGITS[ch]
+        elif ch in UNITS:
+            unit = UNITS[ch]
+            if unit >= last_unit:
+                return None  # 单位须递减，如“十百”非法
+            total += (1 if digit is None else digit) * unit
+            digit = None
+            last_unit = unit
+        elif ch in COMPOUNDS:
+            if last_unit <= 10:
+                return None
+            total += COMPOUNDS[ch]
+            digit = None
+            last_unit = 10
+        else:
+            return None
+    if digit is not None:
+        # 省略末位单位：“百二” = 120，“千五” = 1500
+        if last_unit >= 100 and text[-2] in UNITS:
+            total += digit * (last_unit // 10)
+        else:
+            total += digit
+    return total
+
+
+def parse_regnal_year(text: str) -> Optional[int]:
+    """解析序年（不含“年”字）：元 -> 1，其余按中文数字解析"""
+    if text in FIRST_YEAR_WORDS:
+        return 1
+    value = parse_chinese_number(text)
+    if value is None or value <= 0:
+        return None
+    return value
+
+
+def format_chinese_number(n: int) -> str:
+    """正整数（1 ~ 9999）的规范位值写法：12 -> 十二，105 -> 一百零五，1911 -> 一千九百一十一"""
+    out: List[str] = []
+    zero = False
+    for value, unit in ((1000, "千"), (100, "百"), (10, "十"), (1, "")):
+        d = n // value % 10
+        if d == 0:
+            zero = bool(out)
+            continue
+        if zero:
+            out.append("零")
+            zero = False
+        if not (d == 1 and unit == "十" and not out):
+            out.append(_PLAIN_DIGITS[d])
+        out.append(unit)
+    return "".join(out)
+
+
+@lru_cache(maxsize=None)
+def numeral_table(limit: int = 3000) -> Dict[str, int]:
+    """
+    预先展开的 中文数字 -> 整数 查找表（1 ~ limit）：规范位值写法、廿/卅/卌 合文、
+    以〇/○/零 作零的逐位写法。常见写法一次字典查找即可，其余仍由 parse_chinese_number 解析。
+    """
+    table: Dict[str, int] = {}
+    for n in range(1, limit + 1):
+        table[format_chinese_number(n)] = n
+        if 20 <= n < 50:
+            for ch, value in COMPOUNDS.items():
+                if value == n // 10 * 10:
+                    table[ch + (_PLAIN_DIGITS[n % 10] if n % 10 else "")] = n
+        if n >= 10:
+            digits = str(n)
+            for zero in ("〇", "○", "零"):
+                table["".join(zero if d == "0" else _PLAIN_DIGITS[int(d)] for d in digits)] = n
+    return table
@@ -1,16 +1,11 @@
 # pyinstaller/entry_pyside6.py
+# 打包入口：与源码运行走同一条启动路径（数据库就绪检查、样式、--startup-budget 等调试开关）
 
-import sys
-from ui_pyside6.main_window import MainWindow
-from PySide6.QtWidgets import QApplication
+from app_bootstrap import run_app
 
 
 def main():
-    app = QApplication(sys.argv)
-    db_path = "resources/History_Chronology.db"
-    window = MainWindow(db_path)
-    window.show()
-    sys.exit(app.exec_())
+    run_app("pyside6")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,68 @@
+# tests/test_federation.py
+# -*- coding: utf-8 -*-
+"""附加数据集出错时，主数据集与其它数据集的结果照常返回，出错的数据集列在 failed 中"""
+import sqlite3
+
+import pytest
+
+import config
+from core.data.federation import PRIMARY_DATASET, DatasetSpec, FederatedRepository
+from core.data.repository import ChronologyRepository
+from core.data.schema_mapping import SchemaMapping
+
+NENGO_COLUMNS = {"公元": "seireki", "年号": "gengo", "年份": "nen"}
+
+
+def _nengo_db(path, year_value):
+    conn = sqlite3.connect(str(path))
+    conn.execute("CREATE TABLE nengo (seireki, gengo TEXT, nen INTEGER)")
+    conn.execute("INSERT INTO nengo VALUES (?, '大化', 1)", (year_value,))
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def federation(tmp_path):
+    repo = ChronologyRepository(config.DB_PATH)
+    fed = FederatedRepository(repo)
+    good = _nengo_db(tmp_path / "good.db", 645)
+    text_year = _nengo_db(tmp_path / "text.db", "大化元年")
+    fed.register(DatasetSpec("日本年号", good, SchemaMapping("nengo", NENGO_COLUMNS, {"政权": "日本"})))
+    fed.register(DatasetSpec("缺表", good, SchemaMapping("no_such_table", NENGO_COLUMNS)))
+    fed.register(DatasetSpec("缺列", good, SchemaMapping("nengo", {**NENGO_COLUMNS, "帝号": "tenno"})))
+    fed.register(DatasetSpec("公元非整数", text_year, SchemaMapping("nengo", NENGO_COLUMNS)))
+    yield fed
+    fed.close()
+    repo.close()
+
+
+def test_failed_datasets_do_not_discard_other_results(federation):
+    result = federation.get_entries_by_year(645)
+    assert {s.source for s in result.entries} == {PRIMARY_DATASET, "日本年号"}
+    assert all(s.entry.year_ad == 645 for s in result.entries)
+    assert set(result.failed) == {"缺表", "缺列"}
+    assert "no_such_table" in result.failed["缺表"]
+    assert "tenno" in result.failed["缺列"]
+
+
+def test_non_integer_year_lands_in_failed(federation):
+    # 关键字检索会读到公元列为文本的行，不能让合并排序出错
+    result = federation.search_entries("大化")
+    assert "日本年号" in {s.source for s in result.entries}
+    assert all(isinstance(s.entry.year_ad, int) for s in result.entries)
+    assert set(result.failed) == {"缺表", "缺列", "公元非整数"}
+    assert "大化元年" in result.failed["公元非整数"]
+
+
+def test_numeric_text_year_is_converted(tmp_path):
+    repo = ChronologyRepository(config.DB_PATH)
+    fed = FederatedRepository(repo)
+    try:
+        fed.register(DatasetSpec("文本公元", _nengo_db(tmp_path / "t.db", "645"), SchemaMapping("nengo", NENGO_COLUMNS)))
+        result = fed.search_entries("大化")
+        assert not result.failed
+        assert [s.entry.year_ad for s in result.entries if s.source == "文本公元"] == [645]
+    finally:
+        fed.close()
+        repo.close()
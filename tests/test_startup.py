@@ -0,0 +1,46 @@
+# tests/test_startup.py
+# -*- coding: utf-8 -*-
+"""
+启动回归检查（均在独立进程中运行，不受本进程已导入模块的影响）：
+- 导入主窗口时不应带入 requests / opencc / pypinyin / numpy（它们在用到时才导入）；
+- 离屏启动应用，首个窗口显示耗时不超过预算（环境变量 STARTUP_BUDGET_MS，缺省 5000 毫秒）。
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+BACKENDS = ("pyside6", "pyside2")
+LAZY_MODULES = ("requests", "opencc", "pypinyin", "numpy")
+BUDGET_MS = os.environ.get("STARTUP_BUDGET_MS", "5000")
+
+
+def _run(code: str, *args: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    return subprocess.run(
+        [sys.executable, "-c", code, *args],
+        cwd=str(ROOT), env=env, capture_output=True, text=True, timeout=120,
+    )
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_main_window_import_skips_lazy_modules(backend):
+    pytest.importorskip("PySide6" if backend == "pyside6" else "PySide2")
+    proc = _run(
+        f"import sys, ui_{backend}.main_window\n"
+        f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.strip() == "", f"导入主窗口时已载入：{proc.stdout.strip()}"
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_first_window_within_budget(backend):
+    pytest.importorskip("PySide6" if backend == "pyside6" else "PySide2")
+    proc = _run(f"from app_bootstrap import run_app; run_app({backend!r})", f"--startup-budget={BUDGET_MS}")
+    report = "\n".join(line for line in proc.stdout.splitlines() if line.startswith("[STARTUP]"))
+    assert "[STARTUP]" in report, proc.stdout + proc.stderr
+    assert proc.returncode == 0, report
@@ -0,0 +1,28 @@
+# ui/dialogs/occupancy_dialog.py
+"""
+政权存续总览窗口：非模态，单击某一年份时发出 year_clicked，由主窗口查询该年
+"""
+
+from __future__ import annotations
+
+from PySide2.QtWidgets import QDialog, QLabel, QVBoxLayout
+
+from core.services.occupancy_service import OccupancyMatrix
+from ui_pyside2.widgets.occupancy_widget import OccupancyWidget
+
+
+class OccupancyDialog(QDialog):
+    def __init__(self, matrix: OccupancyMatrix, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("政权存续总览")
+        self.setModal(False)
+        self.resize(960, 560)
+        layout = QVBoxLayout(self)
+        hint = QLabel(
+            f"{matrix.row_count} 个政权，公元 {matrix.year_min} ~ {matrix.year_max} 年。"
+            "拖动平移，滚轮缩放，单击查询该年份。"
+        )
+        layout.addWidget(hint)
+        self.view = OccupancyWidget(matrix, self)
+        self.year_clicked = self.view.year_clicked
+        layout.addWidget(self.view, 1)
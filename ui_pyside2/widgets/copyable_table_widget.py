@@ -1,20 +1,35 @@
 # ui/widgets/copyable_table_widget.py
 """
 扩展 QTableWidget：支持框选复制（Ctrl+C）
+复制时直接读取底层 HistoryEntry 数据，支持多个不相连的选区
+重新填充结果时按条目键做差异更新，只增删改变化的行，保持滚动位置与选区
+整表重填时只为可见区域前后各一屏创建单元格，其余行滚动到时再填，大结果集的切换与重填不随行数变慢
+列宽按全部条目计算（各列最长的文本），不依赖已填充的行
 """
 
 from __future__ import annotations
-from typing import List
 
-from PySide2.QtGui import QKeySequence
+import math
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from PySide2.QtCore import QByteArray, QItemSelection, QItemSelectionModel, QMimeData
+from PySide2.QtGui import QFontMetricsF, QKeySequence
 from PySide2.QtWidgets import (
     QApplication,
     QAbstractItemView,
+    QStyle,
     QTableWidget,
     QTableWidgetItem,
     QShortcut,
 )
 
+from core.models.history_entry import DISPLAY_HEADERS, HistoryEntry
+from core.services.export_service import rows_to_csv, rows_to_html, rows_to_tsv
+from core.services.result_diff import EntryDiff, diff_entries
+
+# 需改动的行超过新旧行数较大者的该比例时，逐行增删不如整表重填
+FULL_REFILL_RATIO = 0.5
+
 
 class CopyableTableWidget(QTableWidget):
     """按 Ctrl+C 复制选中区域为 TSV 文本"""
@@ -26,26 +41,183 @@ class CopyableTableWidget(QTableWidget):
         self.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectItems)
         # 绑定 Ctrl+C 快捷键
         QShortcut(QKeySequence.Copy, self, activated=self.copy_selection)
+        # 表格展示的数据源，行号与 _entries 下标一一对应
+        self._entries: List[HistoryEntry] = []
+        # 为 True 时额外写入 HTML / CSV 格式，便于粘贴到富文本编辑器
+        self.rich_copy = False
+        # 各行是否已创建单元格（1 为已填）
+        self._filled = bytearray()
+        self.verticalScrollBar().valueChanged.connect(self._fill_visible)
+
+    # ---------- 数据 ----------
+    def set_entries(self, entries: List[HistoryEntry]) -> None:
+        """
+        填充表格并记录数据源。与当前内容按条目键比较，只删除、插入、刷新变化的行；
+        变化过多时整表重填。两种方式都会把选区与顶部可见行恢复到对应条目上。
+        """
+        old = self._entries
+        self._entries = entries
+        diff = diff_entries(old, entries)
+        if diff.unchanged:
+            return
+
+        selected = [(i.row(), i.column()) for i in self.selectedIndexes()]
+        current = (self.currentRow(), self.currentColumn())
+        top = self.rowAt(0)
+
+        self.setUpdatesEnabled(False)
+        try:
+            if diff.operations > max(len(old), len(entries)) * FULL_REFILL_RATIO:
+                self.clearContents()
+                self.setRowCount(len(entries))
+                self._filled = bytearray(len(entries))
+            else:
+                for r in diff.removed:
+                    self.removeRow(r)
+                    del self._filled[r]
+                for r in diff.inserted:
+                    self.insertRow(r)
+                    self._filled.insert(r, 1)
+                    self._fill_row(r, entries[r])
+                for r in diff.updated:
+                    if self._filled[r]:
+                        self._fill_row(r, entries[r])
+            self._restore_view(diff, selected, current, top)
+            self._fill_visible()
+        finally:
+            self.setUpdatesEnabled(True)
+
+    def _fill_visible(self, *_args) -> None:
+        """为可见行及其前后各一屏中尚未填充的行创建单元格"""
+        n = len(self._filled)
+        if not n:
+            return
+        height = self.viewport().height()
+        top = max(self.rowAt(0), 0)
+        bottom = self.rowAt(height - 1)
+        if bottom < 0:
+            # 末行在视口之内，或尚未布局：按默认行高估算
+            bottom = top + height // max(self.verticalHeader().defaultSectionSize(), 1)
+        span = bottom - top + 1
+        for r in range(max(top - span, 0), min(bottom + span + 1, n)):
+            if not self._filled[r]:
+                self._fill_row(r, self._entries[r])
+                self._filled[r] = 1
+
+    def resize_columns_to_entries(self) -> None:
+        """
+        按全部条目调整列宽。单元格是惰性填充的，resizeColumnsToContents 只能量到已填的行；
+        这里对每列只测量字符数最多的几个取值，再与表头宽度比较
+        """
+        widest: List[Set[str]] = [set() for _ in DISPLAY_HEADERS]
+        lengths = [0] * len(DISPLAY_HEADERS)
+        for entry in self._entries:
+            for c, v in enumerate(entry.display_row()):
+                if len(v) > lengths[c]:
+                    lengths[c] = len(v)
+                    widest[c] = {v}
+                elif len(v) == lengths[c]:
+                    widest[c].add(v)
+        # 按小数宽度向上取整，与单元格文本排版的结果一致
+        fm = QFontMetricsF(self.font())
+        # 与单元格文本左右留白一致（样式的焦点框边距 + 1），显示网格线时另加 1
+        margin = int(self.showGrid()) + 2 * (self.style().pixelMetric(QStyle.PM_FocusFrameHMargin, None, self) + 1)
+        header = self.horizontalHeader()
+        for c, values in enumerate(widest):
+            text = max((math.ceil(fm.horizontalAdvance(v)) for v in values), default=0)
+            self.setColumnWidth(c, max(text + margin, header.sectionSizeHint(c)))
+
+    def resizeEvent(self, event) -> None:
+        super().resizeEvent(event)
+        self._fill_visible()
 
+    def _fill_row(self, row: int, entry: HistoryEntry) -> None:
+        """写入一行；已有单元格只在文本变化时更新"""
+        for c, v in enumerate(entry.display_row()):
+            item = self.item(row, c)
+            if item is None:
+                self.setItem(row, c, QTableWidgetItem(v))
+            elif item.text() != v:
+                item.setText(v)
+
+    def _restore_view(
+        self, diff: EntryDiff, selected: List[Tuple[int, int]],
+        current: Tuple[int, int], top: int,
+    ) -> None:
+        """按 旧行号 -> 新行号 映射恢复选区、当前单元格与顶部可见行"""
+        model = self.model()
+        selection = QItemSelection()
+        for row, col in selected:
+            new_row = diff.mapping.get(row)
+            if new_row is not None:
+                idx = model.index(new_row, col)
+                selection.select(idx, idx)
+        sel_model = self.selectionModel()
+        sel_model.select(selection, QItemSelectionModel.ClearAndSelect)
+
+        new_current: Optional[int] = diff.mapping.get(current[0])
+        if new_current is not None and current[1] >= 0:
+            sel_model.setCurrentIndex(model.index(new_current, current[1]), QItemSelectionModel.NoUpdate)
+
+        new_top = diff.mapping.get(top)
+        if new_top is not None:
+            self.scrollTo(model.index(new_top, 0), QAbstractItemView.PositionAtTop)
+
+    def entries(self) -> List[HistoryEntry]:
+        return self._entries
+
+    def _row_texts(self, row: int) -> Sequence[str]:
+        if row < len(self._entries):
+            return self._entries[row].display_row()
+        # 未通过 set_entries 填充的行，退回读取单元格
+        return [
+            item.text() if item is not None else ""
+            for item in (self.item(row, c) for c in range(self.columnCount()))
+        ]
+
+    # ---------- 复制 ----------
     def copy_selection(self) -> None:
-        """把当前选区内容复制到剪贴板，格式为制表符分隔"""
-        sel_ranges = self.selectedRanges()
-        if not sel_ranges:
+        """把当前全部选区复制到剪贴板，格式为制表符分隔；不相连的选区按行、列并集对齐"""
+        sel = self.selectedRanges()
+        if not sel:
             return
 
-        rng = sel_ranges[0]
-        rows = range(rng.topRow(), rng.bottomRow() + 1)
-        cols = range(rng.leftColumn(), rng.rightColumn() + 1)
+        # 行号 -> 该行被选中的列
+        row_cols: Dict[int, Set[int]] = {}
+        for rng in sel:
+            cols = range(rng.leftColumn(), rng.rightColumn() + 1)
+            for r in range(rng.topRow(), rng.bottomRow() + 1):
+                row_cols.setdefault(r, set()).update(cols)
+        all_cols = sorted(set().union(*row_cols.values()))
+
+        rows: List[List[str]] = []
+        for r in sorted(row_cols):
+            texts = self._row_texts(r)
+            picked = row_cols[r]
+            rows.append([texts[c] if c in picked else "" for c in all_cols])
 
-        lines: List[str] = []
-        for r in rows:
-            cells: List[str] = []
-            for c in cols:
-                item = self.item(r, c)
-                cells.append(item.text() if item else "")
-            lines.append("\t".join(cells))
+        self._put_on_clipboard(rows, [DISPLAY_HEADERS[c] for c in all_cols])
 
-        QApplication.clipboard().setText("\n".join(lines))
+    def copy_selected_rows(self) -> None:
+        """复制所有含选中单元格的整行"""
+        row_set: Set[int] = set()
+        for rng in self.selectedRanges():
+            row_set.update(range(rng.topRow(), rng.bottomRow() + 1))
+        if not row_set:
+            return
+        rows = [list(self._row_texts(r)) for r in sorted(row_set)]
+        self._put_on_clipboard(rows, list(DISPLAY_HEADERS))
+
+    def _put_on_clipboard(self, rows: List[List[str]], headers: List[str]) -> None:
+        tsv = rows_to_tsv(rows)
+        if not self.rich_copy:
+            QApplication.clipboard().setText(tsv)
+            return
+        mime = QMimeData()
+        mime.setText(tsv)
+        mime.setHtml(rows_to_html(rows, headers))
+        mime.setData("text/csv", QByteArray(rows_to_csv(rows, headers).encode("utf-8")))
+        QApplication.clipboard().setMimeData(mime)
 
     @staticmethod
     def createItem(text: str) -> QTableWidgetItem:
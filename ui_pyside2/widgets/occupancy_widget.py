@@ -0,0 +1,224 @@
+# ui_pyside2/widgets/occupancy_widget.py
+# -*- coding: utf-8 -*-
+"""
+政权存续总览：公元年份 × 政权 矩阵按 256 像素见方的图块绘制并缓存，
+每个缩放级别各自缓存，平移与重绘只贴图；图块按需生成，最近使用的保留在 LRU 中。
+悬停与单击直接由坐标换算出 (行, 列)，在 OccupancyMatrix 中二分查找，不访问数据库。
+"""
+
+from __future__ import annotations
+
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from PySide2.QtCore import QPoint, QPointF, QRect, Qt, Signal
+from PySide2.QtGui import QColor, QFont, QImage, QPainter
+from PySide2.QtWidgets import QToolTip, QWidget
+
+from core.services.occupancy_service import OccupancyMatrix
+
+TILE = 256
+# 缩放级别：(每年像素, 每行像素)
+ZOOM_LEVELS: Tuple[Tuple[float, int], ...] = ((0.5, 3), (1, 4), (2, 6), (4, 10), (8, 16), (16, 20))
+DEFAULT_LEVEL = 1
+# 缓存的图块数上限（每块 256 KB）
+MAX_TILES = 96
+# 顶部公元刻度的高度
+RULER = 18
+# 拖动超过该距离（像素）视为平移而非单击
+CLICK_SLOP = 4
+
+
+class OccupancyWidget(QWidget):
+    """拖动平移、滚轮缩放（以光标为中心）、悬停显示政权与存续区间、单击发出该年份"""
+
+    year_clicked = Signal(int)
+
+    def __init__(self, matrix: OccupancyMatrix, parent=None) -> None:
+        super().__init__(parent)
+        self._matrix = matrix
+        self._level = DEFAULT_LEVEL
+        # 视口左上角在内容坐标中的位置
+        self._offset = QPointF(0, 0)
+        self._tiles: "OrderedDict[Tuple[int, int, int], QImage]" = OrderedDict()
+        self._colors: Dict[str, QColor] = {}
+        self._press: Optional[QPoint] = None
+        self._press_offset = QPointF(0, 0)
+        self._dragged = False
+        self.setMouseTracking(True)
+        self.setMinimumSize(320, 200)
+
+    # ---------- 坐标 ----------
+    @property
+    def _scale(self) -> Tuple[float, int]:
+        return ZOOM_LEVELS[self._level]
+
+    def _content_size(self, level: int) -> Tuple[float, float]:
+        px_year, px_row = ZOOM_LEVELS[level]
+        return self._matrix.column_count * px_year, self._matrix.row_count * px_row
+
+    def cell_at(self, pos: QPoint) -> Tuple[int, int]:
+        """控件坐标处的 (行, 列)；超出矩阵时为 -1"""
+        px_year, px_row = self._scale
+        col = int((pos.x() + self._offset.x()) // px_year)
+        row = int((pos.y() - RULER + self._offset.y()) // px_row)
+        if pos.y() < RULER or not 0 <= row < self._matrix.row_count:
+            row = -1
+        if not 0 <= col < self._matrix.column_count:
+            col = -1
+        return row, col
+
+    def _clamp(self) -> None:
+        w, h = self._content_size(self._level)
+        max_x = max(w - self.width(), 0)
+        max_y = max(h - (self.height() - RULER), 0)
+        self._offset = QPointF(min(max(self._offset.x(), 0), max_x), min(max(self._offset.y(), 0), max_y))
+
+    def tile_count(self) -> int:
+        return len(self._tiles)
+
+    # ---------- 图块 ----------
+    def _color(self, period: str) -> QColor:
+        color = self._colors.get(period)
+        if color is None:
+            # 按时期名取稳定的色相（str 的 hash 每次启动不同）
+            color = self._colors[period] = QColor.fromHsv(zlib.crc32(period.encode("utf-8")) % 360, 110, 215)
+        return color
+
+    def _tile(self, level: int, tx: int, ty: int) -> QImage:
+        key = (level, tx, ty)
+        image = self._tiles.get(key)
+        if image is not None:
+            self._tiles.move_to_end(key)
+            return image
+        image = self._render_tile(level, tx, ty)
+        self._tiles[key] = image
+        while len(self._tiles) > MAX_TILES:
+            self._tiles.popitem(last=False)
+        return image
+
+    def _render_tile(self, level: int, tx: int, ty: int) -> QImage:
+        m = self._matrix
+        px_year, px_row = ZOOM_LEVELS[level]
+        image = QImage(TILE, TILE, QImage.Format_RGB32)
+        image.fill(QColor("#fafafa"))
+        painter = QPainter(image)
+        font = QFont(painter.font())
+        font.setPixelSize(max(px_row - 5, 8))
+        painter.setFont(font)
+        x0, y0 = tx * TILE, ty * TILE
+        col_from = int(x0 // px_year)
+        col_to = int((x0 + TILE) // px_year)
+        row_from = y0 // px_row
+        row_to = min((y0 + TILE) // px_row, m.row_count - 1)
+        gap = 1 if px_row >= 4 else 0
+        for row in range(row_from, row_to + 1):
+            color = self._color(m.periods[row])
+            top = row * px_row - y0
+            for lo, hi in m.runs_between(row, col_from, col_to):
+                left = lo * px_year - x0
+                width = max((hi - lo + 1) * px_year, 1)
+                painter.fillRect(QRect(int(left), top, int(round(width)), px_row - gap), color)
+                # 放大到足够时在区间内写政权名（跨图块的区间在每块中各写一次）
+                if px_row >= 10 and width >= 40:
+                    painter.setPen(QColor("#222"))
+                    painter.drawText(QRect(int(left) + 3, top, int(width) - 6, px_row - gap),
+                                     Qt.AlignVCenter, m.regimes[row])
+        painter.end()
+        return image
+
+    # ---------- 绘制 ----------
+    def paintEvent(self, event) -> None:
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("#fafafa"))
+        ox, oy = self._offset.x(), self._offset.y()
+        w, h = self._content_size(self._level)
+        tx_from, tx_to = int(ox // TILE), int(min(ox + self.width(), w) // TILE)
+        ty_from, ty_to = int(oy // TILE), int(min(oy + self.height() - RULER, h) // TILE)
+        for ty in range(ty_from, ty_to + 1):
+            for tx in range(tx_from, tx_to + 1):
+                pos = QPointF(tx * TILE - ox, ty * TILE - oy + RULER)
+                painter.drawImage(pos, self._tile(self._level, tx, ty))
+        self._paint_ruler(painter)
+
+    def _paint_ruler(self, painter: QPainter) -> None:
+        """顶部刻度：整十、整百年份，约每 80 像素一个；没有公元 0 年"""
+        m = self._matrix
+        px_year, _ = self._scale
+        painter.fillRect(QRect(0, 0, self.width(), RULER), QColor("#eeeeee"))
+        painter.setPen(QColor("#555"))
+        step = next(s for s in (10, 20, 50, 100, 200, 500, 1000) if s * px_year >= 80)
+        first = m.year(int(self._offset.x() // px_year))
+        last = m.year(int((self._offset.x() + self.width()) // px_year))
+        for year in range(-(-first // step) * step, last + 1, step):
+            if year == 0:
+                continue
+            x = int(m.column(year) * px_year - self._offset.x())
+            painter.drawLine(x, RULER - 5, x, RULER)
+            painter.drawText(x + 2, RULER - 5, str(year))
+
+    # ---------- 交互 ----------
+    def wheelEvent(self, event) -> None:
+        step = 1 if event.angleDelta().y() > 0 else -1
+        level = min(max(self._level + step, 0), len(ZOOM_LEVELS) - 1)
+        if level == self._level:
+            return
+        # 保持光标下的内容位置不变
+        pos = QPointF(event.pos())
+        old_year, old_row = self._scale
+        new_year, new_row = ZOOM_LEVELS[level]
+        cx = (pos.x() + self._offset.x()) / old_year
+        cy = (pos.y() - RULER + self._offset.y()) / old_row
+        self._level = level
+        self._offset = QPointF(cx * new_year - pos.x(), cy * new_row - (pos.y() - RULER))
+        self._clamp()
+        self.update()
+
+    def mousePressEvent(self, event) -> None:
+        if event.button() == Qt.LeftButton:
+            self._press = event.pos()
+            self._press_offset = QPointF(self._offset)
+            self._dragged = False
+
+    def mouseMoveEvent(self, event) -> None:
+        pos = event.pos()
+        if self._press is not None:
+            delta = pos - self._press
+            if delta.manhattanLength() > CLICK_SLOP:
+                self._dragged = True
+            if self._dragged:
+                self._offset = self._press_offset - QPointF(delta)
+                self._clamp()
+                self.update()
+                return
+        self._show_cell_tip(pos, event.globalPos())
+
+    def mouseReleaseEvent(self, event) -> None:
+        if event.button() == Qt.LeftButton and self._press is not None:
+            if not self._dragged:
+                _row, col = self.cell_at(event.pos())
+                if col >= 0:
+                    self.year_clicked.emit(self._matrix.year(col))
+            self._press = None
+
+    def resizeEvent(self, event) -> None:
+        self._clamp()
+        super().resizeEvent(event)
+
+    def _show_cell_tip(self, pos: QPoint, global_pos: QPoint) -> None:
+        row, col = self.cell_at(pos)
+        if row < 0 or col < 0:
+            QToolTip.hideText()
+            return
+        m = self._matrix
+        year = m.year(col)
+        run = m.run_at(row, col)
+        if run is None:
+            QToolTip.showText(global_pos, f"{year} 年", self)
+            return
+        QToolTip.showText(
+            global_pos,
+            f"{m.regimes[row]}（{m.periods[row]}）\n{year} 年\n存续 {run[0]} ~ {run[1]}",
+            self,
+        )
@@ -0,0 +1,43 @@
+# ui_pyside2/widgets/result_model.py
+# -*- coding: utf-8 -*-
+"""
+结果表格与时间轴共用的结果集：两个视图引用同一个条目列表，行号即节点序号，
+当前行在任一视图中改变时通过 current_changed 通知另一个视图
+"""
+
+from __future__ import annotations
+
+from typing import List
+
+from PySide2.QtCore import QObject, Signal
+
+from core.models.history_entry import HistoryEntry
+
+
+class ResultModel(QObject):
+    entries_changed = Signal()
+    current_changed = Signal(int)   # 当前行号，-1 表示无
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self._entries: List[HistoryEntry] = []
+        self._current = -1
+
+    def entries(self) -> List[HistoryEntry]:
+        return self._entries
+
+    def set_entries(self, entries: List[HistoryEntry]) -> None:
+        self._entries = entries
+        self._current = -1
+        self.entries_changed.emit()
+
+    def current(self) -> int:
+        return self._current
+
+    def set_current(self, row: int) -> None:
+        """设置当前行；行号不变时不发信号，避免两个视图相互触发"""
+        if not 0 <= row < len(self._entries):
+            row = -1
+        if row != self._current:
+            self._current = row
+            self.current_changed.emit(row)
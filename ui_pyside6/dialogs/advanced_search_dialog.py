@@ -34,6 +34,16 @@ class AdvancedSearchDialog(QDialog):
 
         form = QFormLayout()
 
+        # — 检索语句（填写后忽略下方各项） —
+        self.query_text = QLineEdit()
+        self.query_text.setPlaceholderText("如：年号:贞观 公元:600..700 -政权:唐 OR 帝名:李*")
+        self.query_text.setToolTip(
+            "字段:值 为子串匹配，值含 * 时按通配符匹配；公元:a..b 为区间；\n"
+            "-条件 取反；空格表示“与”，OR 表示“或”，可用括号分组。\n"
+            "填写检索语句后，下方各项条件将被忽略。"
+        )
+        form.addRow("检索语句：", self.query_text)
+
         # — 年份区间 —
         self.year_from = QSpinBox()
         self.year_from.setRange(YEAR_MIN, YEAR_MAX)
@@ -82,6 +92,11 @@ class AdvancedSearchDialog(QDialog):
         root.addLayout(form)
         root.addLayout(btn_box)
 
+    def get_query_text(self) -> Optional[str]:
+        """检索语句，未填写时返回 None"""
+        t = self.query_text.text().strip()
+        return t or None
+
     def get_params(self) -> dict:
         """
         获取用户输入的参数，spinBox 如为最小值则视为 None
@@ -0,0 +1,215 @@
+# ui/dialogs/diagnostics_dialog.py
+"""
+诊断面板：最近操作的分阶段耗时、tracemalloc 内存差异、缓存统计与界面项数，
+可把最近若干次操作的 cProfile 采集导出为 .prof 文件。
+面板显示期间才记录，关闭后记录器、内存跟踪与性能分析全部停用。
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Callable, List, Tuple
+
+from PySide6.QtCore import QTimer
+from PySide6.QtGui import QFontDatabase
+from PySide6.QtWidgets import (
+    QAbstractItemView,
+    QCheckBox,
+    QDialog,
+    QFileDialog,
+    QFormLayout,
+    QHBoxLayout,
+    QLabel,
+    QMessageBox,
+    QPlainTextEdit,
+    QPushButton,
+    QSpinBox,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+)
+
+from core.diagnostics.perf_recorder import (
+    PERF,
+    PHASE_LABELS,
+    PHASE_MATERIALIZE,
+    PHASE_QUERY,
+    PHASE_RENDER,
+    PHASE_RESIZE,
+)
+
+# 表格中依次显示的阶段
+_PHASES = (PHASE_QUERY, PHASE_MATERIALIZE, PHASE_RENDER, PHASE_RESIZE)
+# 自动刷新间隔（毫秒）
+REFRESH_MS = 1000
+
+
+class DiagnosticsDialog(QDialog):
+    """非模态诊断面板；stats_provider 返回 (项目, 说明) 列表，如缓存统计与表格项数"""
+
+    def __init__(self, stats_provider: Callable[[], List[Tuple[str, str]]], parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("诊断面板")
+        self.setModal(False)
+        self.resize(760, 560)
+        self._stats_provider = stats_provider
+
+        # — 开关 —
+        self.memory_check = QCheckBox("内存跟踪（tracemalloc）")
+        self.memory_check.setToolTip("跟踪期间内存分配会明显变慢")
+        self.memory_check.toggled.connect(self._on_memory_toggled)
+        self.profile_check = QCheckBox("cProfile 采集")
+        self.profile_check.setToolTip("对之后的每次操作做性能分析，可导出为 .prof 文件")
+        self.profile_check.toggled.connect(self._on_profile_toggled)
+        switches = QHBoxLayout()
+        switches.addWidget(self.memory_check)
+        switches.addWidget(self.profile_check)
+        switches.addStretch(1)
+
+        # — 操作耗时 —
+        headers = ["时间", "操作", "行数"] + [f"{PHASE_LABELS[p]}(ms)" for p in _PHASES] + ["合计(ms)", "内存(KB)"]
+        self.ops_table = QTableWidget(0, len(headers))
+        self.ops_table.setHorizontalHeaderLabels(headers)
+        self.ops_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.ops_table.verticalHeader().setVisible(False)
+        self.ops_table.horizontalHeader().setStretchLastSection(True)
+
+        # — 缓存与界面项数 —
+        self.stats_form = QFormLayout()
+
+        # — 内存差异 —
+        self.memory_text = QPlainTextEdit()
+        self.memory_text.setReadOnly(True)
+        self.memory_text.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+        self.memory_text.setMaximumHeight(160)
+
+        # — 按钮 —
+        clear_btn = QPushButton("清空记录")
+        clear_btn.clicked.connect(self._on_clear)
+        baseline_btn = QPushButton("重置内存基线")
+        baseline_btn.clicked.connect(self._on_reset_baseline)
+        self.profile_last = QSpinBox()
+        self.profile_last.setRange(1, 50)
+        self.profile_last.setValue(10)
+        self.profile_last.setPrefix("最近 ")
+        self.profile_last.setSuffix(" 次")
+        dump_btn = QPushButton("导出性能分析…")
+        dump_btn.clicked.connect(self._on_dump_profile)
+        close_btn = QPushButton("关闭")
+        close_btn.clicked.connect(self.close)
+        btn_box = QHBoxLayout()
+        btn_box.addWidget(clear_btn)
+        btn_box.addWidget(baseline_btn)
+        btn_box.addStretch(1)
+        btn_box.addWidget(self.profile_last)
+        btn_box.addWidget(dump_btn)
+        btn_box.addWidget(close_btn)
+
+        root = QVBoxLayout(self)
+        root.addLayout(switches)
+        root.addWidget(QLabel("最近操作："))
+        root.addWidget(self.ops_table, 1)
+        root.addLayout(self.stats_form)
+        root.addWidget(QLabel("内存差异（相对基线）："))
+        root.addWidget(self.memory_text)
+        root.addLayout(btn_box)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(REFRESH_MS)
+        self._timer.timeout.connect(self.refresh)
+
+    # ---------- 显示 / 关闭 ----------
+    def showEvent(self, event) -> None:
+        PERF.enabled = True
+        PERF.profiling = self.profile_check.isChecked()
+        if self.memory_check.isChecked():
+            PERF.start_memory_tracking()
+        self.refresh()
+        self._timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event) -> None:
+        # 面板关闭后不再产生任何记录开销
+        self._timer.stop()
+        PERF.enabled = False
+        PERF.profiling = False
+        PERF.stop_memory_tracking()
+        super().hideEvent(event)
+
+    # ---------- 刷新 ----------
+    def refresh(self) -> None:
+        self._fill_operations()
+        self._fill_stats()
+        self._fill_memory()
+
+    def _fill_operations(self) -> None:
+        records = list(reversed(PERF.records()))
+        tbl = self.ops_table
+        tbl.setRowCount(len(records))
+        for r, rec in enumerate(records):
+            values = [
+                time.strftime("%H:%M:%S", time.localtime(rec.started_at)),
+                rec.label + ("（已采集）" if rec.profiled else ""),
+                "" if rec.rows is None else str(rec.rows),
+            ]
+            values += [f"{rec.phase_ms(p):.1f}" if p in rec.phases else "" for p in _PHASES]
+            values += [f"{rec.total_ms:.1f}", "" if rec.memory_kb is None else f"{rec.memory_kb:+.1f}"]
+            for c, text in enumerate(values):
+                item = tbl.item(r, c)
+                if item is None:
+                    tbl.setItem(r, c, QTableWidgetItem(text))
+                else:
+                    item.setText(text)
+        tbl.resizeColumnsToContents()
+
+    def _fill_stats(self) -> None:
+        rows = self._stats_provider()
+        form = self.stats_form
+        if form.rowCount() != len(rows):
+            while form.rowCount():
+                form.removeRow(0)
+            for name, _ in rows:
+                form.addRow(f"{name}：", QLabel())
+        for i, (_, text) in enumerate(rows):
+            label = form.itemAt(i, QFormLayout.ItemRole.FieldRole).widget()
+            label.setText(text)
+
+    def _fill_memory(self) -> None:
+        if not PERF.memory_tracking:
+            self.memory_text.setPlainText("未启用内存跟踪")
+            return
+        total_kb, lines = PERF.memory_delta()
+        self.memory_text.setPlainText("\n".join([f"合计：{total_kb:+.1f} KB"] + lines))
+
+    # ---------- 按钮 ----------
+    def _on_memory_toggled(self, checked: bool) -> None:
+        if checked:
+            PERF.start_memory_tracking()
+        else:
+            PERF.stop_memory_tracking()
+        self.refresh()
+
+    def _on_profile_toggled(self, checked: bool) -> None:
+        PERF.profiling = checked
+
+    def _on_clear(self) -> None:
+        PERF.clear()
+        self.refresh()
+
+    def _on_reset_baseline(self) -> None:
+        PERF.reset_memory_baseline()
+        self.refresh()
+
+    def _on_dump_profile(self) -> None:
+        if not PERF.profile_count:
+            QMessageBox.information(self, "提示", "尚无性能分析数据，请先勾选“cProfile 采集”并执行查询")
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "导出性能分析", "shijian.prof", "性能分析 (*.prof)")
+        if not path:
+            return
+        try:
+            count = PERF.dump_profile(path, self.profile_last.value())
+        except (OSError, ValueError) as exc:
+            QMessageBox.warning(self, "导出失败", str(exc))
+            return
+        QMessageBox.information(self, "导出完成", f"已合并最近 {count} 次操作的性能分析数据：\n{path}")
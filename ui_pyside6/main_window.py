@@ -4,24 +4,44 @@
 """
 from __future__ import annotations
 from pathlib import Path
-from typing import List
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, Union
 
-from PySide6.QtCore import Qt, QPoint, QSettings
+from PySide6.QtCore import Qt, QPoint, QSettings, QTimer
 from PySide6.QtGui import QCursor, QAction
 from PySide6.QtWidgets import (QApplication, QHBoxLayout, QLabel, QLineEdit, QMainWindow, QMenu, QMessageBox,
-                               QPushButton, QTableWidgetItem, QToolTip, QVBoxLayout, QWidget, QDialog,
-                               QAbstractItemView)
+                               QPushButton, QToolTip, QVBoxLayout, QWidget, QDialog,
+                               QAbstractItemView, QFileDialog, QProgressDialog, QCheckBox, QSplitter)
 
 import config
+from core.diagnostics.memory_monitor import MemoryGuard, resolve_low_memory
+from core.diagnostics.perf_recorder import PERF, PHASE_QUERY, PHASE_RENDER, PHASE_RESIZE
+from core.index.sidecar import SidecarManager, default_sidecar_path
+from core.data.query_cache import QueryCache
 from core.data.repository import ChronologyRepository
-from core.models.history_entry import HistoryEntry
-from core.services.chronology_service import ChronologyService
-from ui_pyside6.dialogs.advanced_search_dialog import AdvancedSearchDialog
+from core.models.history_entry import DISPLAY_HEADERS, HistoryEntry
+from core.query.parser import QuerySyntaxError
+from core.services.chronology_service import (ChronologyService, QUERY_ADVANCED, QUERY_ALL, QUERY_DSL,
+                                              QUERY_FUZZY, QUERY_KEYWORD, QUERY_RANKED, QUERY_YEAR)
+from core.services.export_service import EXPORT_FORMATS
+from core.services.paged_result import PagedResult
+from core.services.ranked_search import RankedSearch
 from ui_pyside6.widgets.copyable_table_widget import CopyableTableWidget
+from ui_pyside6.widgets.result_model import ResultModel
+from ui_pyside6.widgets.result_tabs import ResultTab, ResultTabBar
+from ui_pyside6.widgets.timeline_widget import TimelineWidget
+
+if TYPE_CHECKING:
+    from core.services.date_parser import DateExpression
+    from ui_pyside6.dialogs.diagnostics_dialog import DiagnosticsDialog
+    from ui_pyside6.dialogs.occupancy_dialog import OccupancyDialog
+    from ui_pyside6.workers.export_worker import ExportWorker
 
 YEAR_MIN, YEAR_MAX = config.YEAR_MIN, config.YEAR_MAX
 GITHUB_URL = "https://github.com/Hellohistory/OpenPrepTools"
 GITEE_URL = "https://gitee.com/Hellohistory/OpenPrepTools"
+# 低内存模式下查询缓存内存层保留的结果数与常驻内存检查间隔
+LOW_MEMORY_CACHE_ITEMS = 8
+MEMORY_CHECK_INTERVAL_MS = 5000
 
 
 class MainWindow(QMainWindow):
@@ -31,16 +51,66 @@ class MainWindow(QMainWindow):
         super().__init__(parent)
         self.setWindowTitle("史鉴 (for Windows 10/11)")
         self.settings = QSettings("Hellohistory", "ShiJian")
+        self._db_path = db_path
+        # 低内存模式（32 位进程默认启用）：大结果集分页显示，内存缓存只保留少量结果
+        self._low_memory = resolve_low_memory(config.LOW_MEMORY_MODE)
         repo = ChronologyRepository(db_path)
-        self._svc = ChronologyService(repo)
+        cache = None
+        if config.QUERY_CACHE_ENABLED:
+            cache_kwargs = {"memory_items": LOW_MEMORY_CACHE_ITEMS} if self._low_memory else {}
+            cache = QueryCache(db_path, config.QUERY_CACHE_PATH, max_bytes=config.QUERY_CACHE_MAX_BYTES,
+                               **cache_kwargs)
+        sidecar = None
+        if config.INDEX_SIDECAR_ENABLED:
+            local_path = default_sidecar_path(db_path)
+            sidecar = SidecarManager(db_path, [local_path, config.INDEX_SIDECAR_FALLBACK_DIR / local_path.name])
+        self._svc = ChronologyService(repo, cache, sidecar, low_memory=self._low_memory)
+        # 仓库与查询缓存由窗口创建，关闭窗口时一并关闭
+        self._repo, self._query_cache = repo, cache
+        # 常驻内存接近预算时释放可重建的缓存与索引
+        self._memory_guard = MemoryGuard(config.MEMORY_BUDGET_MB * 1024 * 1024)
+        self._memory_guard.register(self._svc.release_memory)
+        # 最近一次查询（类型, 参数），用于导出当前结果
+        self._last_query: Optional[Tuple[str, Dict[str, Any]]] = None
+        self._export_worker: Optional[ExportWorker] = None
+        # 相关度检索或分页结果的游标，用于“加载更多” / “下一页”
+        self._pager: Optional[Union[RankedSearch, PagedResult]] = None
+        # 表格与时间轴共用的结果集
+        self._results = ResultModel(self)
+        # 结果页签：各页签只保存条目编号数组，条目共用同一个仓库
+        self._entry_store = self._svc.entry_store()
+        self._active_tab: Optional[ResultTab] = ResultTab()
+        # 诊断面板，首次打开时创建
+        self._diagnostics: Optional[DiagnosticsDialog] = None
+        # 政权存续总览，首次打开时创建
+        self._occupancy: Optional[OccupancyDialog] = None
         self._create_menu()
         self._build_ui()
         theme_path_str = self.settings.value("theme", str(config.LIGHT_STYLE_QSS))
         self._apply_theme(Path(theme_path_str))
+        # 窗口显示后再载入索引旁路文件、预热查询缓存与模糊检索索引
+        QTimer.singleShot(0, self._svc.warm_up_sidecar)
+        QTimer.singleShot(0, self._svc.warm_up_cache)
+        if self._low_memory:
+            # 模糊检索索引用到时再构建；定时检查常驻内存
+            self._memory_timer = QTimer(self)
+            self._memory_timer.setInterval(MEMORY_CHECK_INTERVAL_MS)
+            self._memory_timer.timeout.connect(self._check_memory)
+            self._memory_timer.start()
+        else:
+            QTimer.singleShot(0, self._svc.warm_up_fuzzy_index)
 
     def _create_menu(self) -> None:
         menubar = self.menuBar()
         file_menu = menubar.addMenu("文件")
+        export_act = QAction("导出当前结果…", self)
+        export_act.setShortcut("Ctrl+E")
+        export_act.triggered.connect(self._on_export_current)
+        file_menu.addAction(export_act)
+        export_all_act = QAction("导出全表…", self)
+        export_all_act.triggered.connect(lambda: self._start_export(QUERY_ALL, {}))
+        file_menu.addAction(export_all_act)
+        file_menu.addSeparator()
         exit_act = QAction("退出", self);
         exit_act.setShortcut("Ctrl+Q");
         exit_act.triggered.connect(self.close);
@@ -53,6 +123,20 @@ class MainWindow(QMainWindow):
             act = QAction(name, self);
             act.triggered.connect(lambda checked=False, p=qss_path: self._apply_theme(p));
             view_menu.addAction(act)
+        overview_menu = menubar.addMenu("查看")
+        new_tab_act = QAction("新建结果页签", self)
+        new_tab_act.setShortcut("Ctrl+T")
+        new_tab_act.triggered.connect(self._new_tab)
+        overview_menu.addAction(new_tab_act)
+        close_tab_act = QAction("关闭结果页签", self)
+        close_tab_act.setShortcut("Ctrl+W")
+        close_tab_act.triggered.connect(lambda: self._close_tab(self.tab_bar.currentIndex()))
+        overview_menu.addAction(close_tab_act)
+        overview_menu.addSeparator()
+        occupancy_act = QAction("政权存续总览…", self)
+        occupancy_act.setShortcut("Ctrl+Shift+O")
+        occupancy_act.triggered.connect(self._show_occupancy)
+        overview_menu.addAction(occupancy_act)
         help_menu = menubar.addMenu("帮助")
         about_act = QAction("关于", self);
         about_act.triggered.connect(self._show_about);
@@ -60,6 +144,11 @@ class MainWindow(QMainWindow):
         thanks_act = QAction("感谢", self);
         thanks_act.triggered.connect(self._show_thanks);
         help_menu.addAction(thanks_act)
+        help_menu.addSeparator()
+        diag_act = QAction("诊断面板…", self)
+        diag_act.setShortcut("Ctrl+Shift+D")
+        diag_act.triggered.connect(self._show_diagnostics)
+        help_menu.addAction(diag_act)
 
     def _apply_theme(self, qss_path: Path) -> None:
         app = QApplication.instance()
@@ -78,6 +167,14 @@ class MainWindow(QMainWindow):
         QMessageBox.information(self, "感谢",
                                 "<h2>特别感谢</h2><p>感谢 <b>经世国学馆 耕田四哥</b>！</p><p>如果没有四哥所制作的 <i>中华甲子历史年表</i>，本项目不可能诞生。</p><p><b>特别声明：</b>本人与经世国学馆无任何关联，仅怀揣学习之心编写此项目。</p>")
 
+    def closeEvent(self, event) -> None:
+        # 先停后台线程，再关闭查询缓存（写回最近使用时间）与主仓库
+        self._svc.close()
+        if self._query_cache is not None:
+            self._query_cache.close()
+        self._repo.close()
+        super().closeEvent(event)
+
     def _build_ui(self) -> None:
         root = QWidget();
         layout = QVBoxLayout(root);
@@ -86,12 +183,22 @@ class MainWindow(QMainWindow):
         form = QHBoxLayout();
         form.setSpacing(8)
         self.year_edit = QLineEdit();
-        self.year_edit.setPlaceholderText("公元年份，如 618 或 -841");
+        self.year_edit.setPlaceholderText("公元年份或纪年，如 618、前221、贞观三年");
         form.addWidget(QLabel("年份："));
         form.addWidget(self.year_edit)
         year_btn = QPushButton("查询年份");
         year_btn.clicked.connect(self._on_search_year);
         form.addWidget(year_btn)
+        prev_btn = QPushButton("上一年");
+        prev_btn.setShortcut("Alt+Left");
+        prev_btn.setToolTip("上一年（Alt+←）");
+        prev_btn.clicked.connect(lambda: self._on_step_year(-1));
+        form.addWidget(prev_btn)
+        next_btn = QPushButton("下一年");
+        next_btn.setShortcut("Alt+Right");
+        next_btn.setToolTip("下一年（Alt+→）");
+        next_btn.clicked.connect(lambda: self._on_step_year(1));
+        form.addWidget(next_btn)
         self.key_edit = QLineEdit();
         self.key_edit.setPlaceholderText("关键字，如 李世民 / 贞观");
         form.addWidget(QLabel("关键字："));
@@ -99,18 +206,43 @@ class MainWindow(QMainWindow):
         key_btn = QPushButton("关键字搜索");
         key_btn.clicked.connect(self._on_search_keyword);
         form.addWidget(key_btn)
+        self.rank_check = QCheckBox("按相关度");
+        self.rank_check.setToolTip("关键字搜索结果按匹配程度排序，分页加载");
+        form.addWidget(self.rank_check)
         adv_btn = QPushButton("高级搜索…");
         adv_btn.clicked.connect(self._on_advanced_search);
         form.addWidget(adv_btn)
         layout.addLayout(form)
         self.table = self._create_table();
-        layout.addWidget(self.table)
+        self.timeline = TimelineWidget();
+        self.timeline.setMinimumHeight(90);
+        # 时间轴先于表格响应结果变化：表格恢复当前行时，时间轴已按新结果排好节点
+        self.timeline.set_model(self._results)
+        self._results.entries_changed.connect(lambda: self.table.set_entries(self._results.entries()))
+        self._results.current_changed.connect(self._on_result_current_changed)
+        self.table.currentCellChanged.connect(lambda row, col, prev_row, prev_col: self._results.set_current(row))
+        self.tab_bar = ResultTabBar();
+        self.tab_bar.add_tab(self._active_tab);
+        self.tab_bar.currentChanged.connect(self._on_tab_changed);
+        self.tab_bar.tabCloseRequested.connect(self._close_tab);
+        layout.addWidget(self.tab_bar)
+        splitter = QSplitter(Qt.Vertical);
+        splitter.addWidget(self.table);
+        splitter.addWidget(self.timeline);
+        splitter.setStretchFactor(0, 3);
+        splitter.setStretchFactor(1, 1);
+        layout.addWidget(splitter)
+        self.more_btn = QPushButton("加载更多");
+        self.more_btn.clicked.connect(self._on_load_more);
+        self.more_btn.setVisible(False);
+        layout.addWidget(self.more_btn)
         self.setCentralWidget(root)
 
     def _create_table(self) -> CopyableTableWidget:
         tbl = CopyableTableWidget(columnCount=8);
+        tbl.rich_copy = True;
         tbl.setEditTriggers(QAbstractItemView.NoEditTriggers);
-        tbl.setHorizontalHeaderLabels(["公元", "干支", "时期", "政权", "帝号", "帝名", "年号", "在位年"]);
+        tbl.setHorizontalHeaderLabels(list(DISPLAY_HEADERS));
         tbl.horizontalHeader().setStretchLastSection(True);
         tbl.horizontalHeader().sectionClicked.connect(self._on_header_clicked);
         tbl.setContextMenuPolicy(Qt.CustomContextMenu);
@@ -124,21 +256,117 @@ class MainWindow(QMainWindow):
 
     def _on_search_year(self) -> None:
         text = self.year_edit.text().strip()
-        if not self._is_int(text): self._msg("请输入整数年份"); return
+        if not self._is_int(text):
+            # “贞观三年”“前二二一年”“甲子年”等纪年写法
+            expr = self._svc.date_parser().parse(text) if text else None
+            if expr is None: self._msg("请输入公元年份或纪年，如 618、前221、贞观三年、甲子年"); return
+            self._show_date_expression(expr)
+            return
         year = int(text)
         if not (YEAR_MIN <= year <= YEAR_MAX): self._msg(f"仅支持 {YEAR_MIN} ~ {YEAR_MAX} 年"); return
-        self._render(self._svc.get_chronology_by_year(year))
+        self._show_year(year)
+
+    def _on_step_year(self, step: int) -> None:
+        text = self.year_edit.text().strip()
+        if not self._is_int(text): self._msg("请先输入或查询一个年份"); return
+        year = int(text) + step
+        if year == 0: year += step  # 没有公元 0 年
+        if not (YEAR_MIN <= year <= YEAR_MAX): return
+        self.year_edit.setText(str(year))
+        self._show_year(year)
+
+    def _show_year(self, year: int) -> None:
+        self._last_query = (QUERY_YEAR, {"year": year})
+        with PERF.operation("年份查询"):
+            with PERF.phase(PHASE_QUERY):
+                entries = self._svc.get_chronology_by_year(year)
+            self._render(entries)
+        # 后台预取前后相邻年份，逐年翻看时直接命中
+        self._svc.prefetch_years(year, config.YEAR_PREFETCH_RADIUS)
+
+    def _show_date_expression(self, expr: DateExpression) -> None:
+        """显示纪年表达式对应的年份；有多个候选（同名年号、干支）时取最接近上次所查年份的一个"""
+        years = expr.years
+        if not years: self._msg(f"“{expr.text}”超出年表范围"); return
+        year = years[0]
+        if self._last_query is not None and self._last_query[0] == QUERY_YEAR:
+            last = self._last_query[1]["year"]
+            year = min(years, key=lambda y: abs(y - last))
+        self.year_edit.setText(str(year))
+        self._show_year(year)
+        if len(years) > 1:
+            shown = "、".join(str(y) for y in years[:8]) + ("…" if len(years) > 8 else "")
+            self.statusBar().showMessage(f"“{expr.text}”对应 {len(years)} 个公元年份：{shown}；当前显示 {year} 年", 15000)
+        else:
+            self.statusBar().clearMessage()
 
     def _on_search_keyword(self) -> None:
         kw = self.key_edit.text().strip()
         if not kw: self._msg("关键字不能为空"); return
-        self._render(self._svc.find_entries(kw))
+        if not self._is_int(kw):
+            # 关键字本身是纪年写法时直接按年份查询
+            expr = self._svc.date_parser().parse(kw)
+            if expr is not None and expr.years:
+                self._show_date_expression(expr)
+                return
+        self._last_query = (QUERY_KEYWORD, {"keyword": kw})
+        with PERF.operation("关键字检索"):
+            self._search_keyword(kw)
+
+    def _fetch(
+        self, kind: str, params: Dict[str, Any], compute: Callable[[], List[HistoryEntry]]
+    ) -> Tuple[List[HistoryEntry], Optional[PagedResult]]:
+        """低内存模式下只读取第一页并返回分页游标，否则一次取回全部结果"""
+        if not self._low_memory:
+            return compute(), None
+        pager = self._svc.page_query(kind, params, config.LOW_MEMORY_PAGE_ROWS)
+        return pager.next_page(), pager
+
+    def _search_keyword(self, kw: str) -> None:
+        if self.rank_check.isChecked():
+            with PERF.phase(PHASE_QUERY):
+                ranked = self._svc.find_entries_ranked(kw)
+                page = ranked.next_page() if ranked.total else []
+            if page:
+                # 导出当前结果时按相关度顺序重放
+                self._last_query = (QUERY_RANKED, {"keyword": kw})
+                self._render(page, ranked)
+                return
+        with PERF.phase(PHASE_QUERY):
+            entries, pager = self._fetch(QUERY_KEYWORD, {"keyword": kw}, lambda: self._svc.find_entries(kw))
+        if not entries:
+            # 精确检索无结果时，退回拼音 / 近似字检索
+            with PERF.phase(PHASE_QUERY):
+                matches, entries = self._svc.find_entries_fuzzy(kw)
+            if entries:
+                self._last_query = (QUERY_FUZZY, {"keyword": kw})
+                terms = "、".join(m.term for m in matches[:5])
+                self.statusBar().showMessage(f"未找到“{kw}”，显示近似结果：{terms}", 10000)
+        self._render(entries, pager)
 
     def _on_advanced_search(self) -> None:
+        # 对话框首次打开时再导入，不计入启动耗时
+        from ui_pyside6.dialogs.advanced_search_dialog import AdvancedSearchDialog
         dlg = AdvancedSearchDialog(self)
         if dlg.exec() == QDialog.Accepted:
+            query_text = dlg.get_query_text()
+            if query_text:
+                with PERF.operation("检索语句"):
+                    try:
+                        with PERF.phase(PHASE_QUERY):
+                            entries, pager = self._fetch(QUERY_DSL, {"text": query_text},
+                                                         lambda: self._svc.query(query_text))
+                    except QuerySyntaxError as exc:
+                        self._msg(f"检索语句有误：{exc}"); return
+                    self._last_query = (QUERY_DSL, {"text": query_text})
+                    self._render(entries, pager)
+                return
             params = dlg.get_params()
-            self._render(self._svc.advanced_search(**params))
+            self._last_query = (QUERY_ADVANCED, params)
+            with PERF.operation("高级搜索"):
+                with PERF.phase(PHASE_QUERY):
+                    entries, pager = self._fetch(QUERY_ADVANCED, params, lambda: self._svc.advanced_search(**params))
+                self._render(entries, pager)
 
     def _on_table_context_menu(self, pos: QPoint) -> None:
         tbl = self.table;
@@ -147,33 +375,199 @@ class MainWindow(QMainWindow):
         copy_sel.triggered.connect(tbl.copy_selection);
         menu.addAction(copy_sel)
         copy_row = QAction("复制整行", self)
-
-        def _copy_row():
-            row = tbl.selectedRanges()[0].topRow()
-            texts = [tbl.item(row, c).text() if tbl.item(row, c) else "" for c in range(tbl.columnCount())]
-            QApplication.clipboard().setText("\t".join(texts))
-
-        if tbl.selectedRanges(): copy_row.triggered.connect(_copy_row); menu.addAction(copy_row)
+        if tbl.selectedRanges(): copy_row.triggered.connect(tbl.copy_selected_rows); menu.addAction(copy_row)
         item = tbl.itemAt(pos)
         if item:
             search_val = QAction(f"搜索“{item.text()}”", self)
 
-            def _search_item(): self._render(self._svc.find_entries(item.text()))
+            def _search_item():
+                kw = item.text()
+                self._last_query = (QUERY_KEYWORD, {"keyword": kw})
+                with PERF.operation("搜索单元格"):
+                    with PERF.phase(PHASE_QUERY):
+                        entries, pager = self._fetch(QUERY_KEYWORD, {"keyword": kw}, lambda: self._svc.find_entries(kw))
+                    self._render(entries, pager)
 
             search_val.triggered.connect(_search_item);
             menu.addAction(search_val)
         menu.exec(tbl.mapToGlobal(pos))
 
-    def _render(self, entries: List[HistoryEntry]) -> None:
+    def _render(self, entries: List[HistoryEntry], pager: Optional[Union[RankedSearch, PagedResult]] = None) -> None:
         if not entries: self._msg("未找到任何匹配记录"); return
+        self._pager = pager
         tbl = self.table;
-        tbl.setRowCount(len(entries))
-        for r, e in enumerate(entries):
-            regnal_year_str = str(int(e.regnal_year)) if e.regnal_year is not None else ""
-            row = [str(e.year_ad), e.ganzhi or "", e.period or "", e.regime or "", e.emperor_title or "",
-                   e.emperor_name or "", e.reign_title or "", regnal_year_str]
-            for c, v in enumerate(row): tbl.setItem(r, c, QTableWidgetItem(v))
-        tbl.resizeColumnsToContents()
+        with PERF.phase(PHASE_RENDER):
+            # 结果登记到共享仓库，当前页签只记条目编号；表格显示的是仓库中的共享条目
+            tab = self._active_tab
+            tab.entry_ids = self._entry_store.intern(entries)
+            self._entry_store.retain(t.entry_ids for t in self.tab_bar.tabs())
+            self._results.set_entries(self._entry_store.entries(tab.entry_ids))
+        title, tooltip = self._query_title(self._last_query)
+        self.tab_bar.set_title(self.tab_bar.currentIndex(), title, tooltip)
+        with PERF.phase(PHASE_RESIZE):
+            tbl.resize_columns_to_entries()
+        PERF.set_rows(len(entries))
+        self._update_more_btn()
+
+    # ---------- 结果页签 ----------
+    def _new_tab(self) -> None:
+        self.tab_bar.setCurrentIndex(self.tab_bar.add_tab(ResultTab()))
+
+    def _close_tab(self, index: int) -> None:
+        if index < 0: return
+        if self.tab_bar.count() == 1:
+            self._new_tab()  # 关闭最后一个页签时换上空页签
+        if self.tab_bar.tab(index) is self._active_tab:
+            self._active_tab = None  # 关闭的页签不必保存状态
+        self.tab_bar.removeTab(index)
+        # 只被关闭页签引用的条目随之释放
+        self._entry_store.retain(t.entry_ids for t in self.tab_bar.tabs())
+
+    def _on_tab_changed(self, index: int) -> None:
+        """保存离开页签的查询与视图状态，由条目编号数组恢复目标页签（不重新查询）"""
+        if index < 0: return
+        tab, old = self.tab_bar.tab(index), self._active_tab
+        if tab is old: return  # 拖动排序
+        if old is not None:
+            old.query, old.pager = self._last_query, self._pager
+            old.current, old.top = self._results.current(), self.table.rowAt(0)
+        self._active_tab = tab
+        self._last_query, self._pager = tab.query, tab.pager
+        self.table.clearSelection()
+        self._results.set_entries(self._entry_store.entries(tab.entry_ids))
+        self._results.set_current(tab.current)
+        if tab.top > 0:
+            self.table.scrollTo(self.table.model().index(tab.top, 0), QAbstractItemView.PositionAtTop)
+        self._update_more_btn()
+
+    @staticmethod
+    def _query_title(query: Optional[Tuple[str, Dict[str, Any]]]) -> Tuple[str, str]:
+        """页签标题与完整提示"""
+        if query is None: return "结果", "结果"
+        kind, params = query
+        if kind == QUERY_YEAR: text = f"{params['year']} 年"
+        elif kind in (QUERY_KEYWORD, QUERY_RANKED, QUERY_FUZZY): text = params["keyword"]
+        elif kind == QUERY_DSL: text = params["text"]
+        elif kind == QUERY_ADVANCED: text = "高级搜索：" + "、".join(str(v) for v in params.values() if v)
+        else: text = "全表"
+        return (text if len(text) <= 16 else text[:15] + "…"), text
+
+    def _on_result_current_changed(self, row: int) -> None:
+        # 在时间轴上点击节点时选中表格对应行；由表格发起时行号已相同
+        if row >= 0 and self.table.currentRow() != row:
+            self.table.selectRow(row)
+            self.table.scrollTo(self.table.model().index(row, 0))
+
+    def _on_load_more(self) -> None:
+        pager = self._pager
+        if pager is None or not pager.has_more: return
+        with PERF.operation("加载更多"):
+            with PERF.phase(PHASE_QUERY):
+                page = pager.next_page()
+            # 低内存模式下表格只保留当前一页
+            self._render(page if self._low_memory else self._results.entries() + page, pager)
+
+    def _update_more_btn(self) -> None:
+        pager = self._pager
+        self.more_btn.setVisible(pager is not None and pager.has_more)
+        if pager is None:
+            return
+        if not self._low_memory:
+            self.more_btn.setText(f"加载更多（已显示 {pager.fetched} / {pager.total}）")
+            return
+        first = pager.fetched - self.table.rowCount() + 1
+        total = f" / 共 {pager.total}" if pager.total is not None else ""
+        self.more_btn.setText(f"下一页（当前第 {first}–{pager.fetched} 条{total}）")
+
+    def _check_memory(self) -> None:
+        if self._memory_guard.check():
+            self.statusBar().showMessage(f"内存接近预算，已释放缓存：{self._memory_guard.describe()}", 10000)
+
+    # ---------- 政权存续总览 ----------
+    def _show_occupancy(self) -> None:
+        if self._occupancy is None:
+            from ui_pyside6.dialogs.occupancy_dialog import OccupancyDialog
+            self._occupancy = OccupancyDialog(self._svc.occupancy_matrix(), self)
+            self._occupancy.year_clicked.connect(self._on_occupancy_year)
+        self._occupancy.show()
+        self._occupancy.raise_()
+        self._occupancy.activateWindow()
+
+    def _on_occupancy_year(self, year: int) -> None:
+        self.year_edit.setText(str(year))
+        self._show_year(year)
+
+    # ---------- 诊断 ----------
+    def _show_diagnostics(self) -> None:
+        if self._diagnostics is None:
+            # 诊断面板很少使用，首次打开时再导入
+            from ui_pyside6.dialogs.diagnostics_dialog import DiagnosticsDialog
+            self._diagnostics = DiagnosticsDialog(self._diagnostic_stats, self)
+        self._diagnostics.show()
+        self._diagnostics.raise_()
+        self._diagnostics.activateWindow()
+
+    def _diagnostic_stats(self) -> List[Tuple[str, str]]:
+        tbl = self.table
+        rows, cols = tbl.rowCount(), tbl.columnCount()
+        stats: List[Tuple[str, str]] = [
+            ("表格单元格", f"{rows} 行 × {cols} 列 = {rows * cols} 项"),
+            ("时间轴图元", f"节点 {self.timeline.node_count()} 个（直接绘制），场景图元 {self.timeline.item_count()} 个"),
+            ("结果页签", f"{self.tab_bar.count()} 个，共引用 {sum(len(t.entry_ids) for t in self.tab_bar.tabs())} 行，"
+                         f"共享条目 {len(self._entry_store)} 条"),
+        ]
+        mode = "低内存模式" if self._low_memory else "标准模式"
+        stats.append(("进程内存", f"{self._memory_guard.describe()}（{mode}）"))
+        cache = self._svc.cache_stats()
+        if cache is None:
+            stats.append(("查询缓存", "未启用"))
+        else:
+            stats.append(("查询缓存",
+                          f"命中 {cache['hits']} / 未命中 {cache['misses']}，内存 {cache['memory_items']} 项，"
+                          f"磁盘 {cache['disk_items']} 项（{cache['disk_bytes'] / 1024:.0f} KB）"))
+        return stats
+
+    # ---------- 导出 ----------
+    def _on_export_current(self) -> None:
+        if self._last_query is None: self._msg("请先进行一次查询"); return
+        kind, params = self._last_query
+        self._start_export(kind, params)
+
+    def _start_export(self, kind: str, params: Dict[str, Any]) -> None:
+        if self._export_worker is not None: self._msg("已有导出任务正在进行"); return
+        filters = ";;".join(EXPORT_FORMATS.values())
+        path, selected = QFileDialog.getSaveFileName(self, "导出", "史鉴导出.csv", filters)
+        if not path: return
+        # 未写扩展名时按所选过滤器补全
+        if not Path(path).suffix:
+            fmt = next((k for k, v in EXPORT_FORMATS.items() if v == selected), "csv")
+            path = f"{path}.{fmt}"
+
+        total = self._svc.count_query(kind, params)
+        dlg = QProgressDialog("正在导出…", "取消", 0, total or 0, self)
+        dlg.setWindowTitle("导出")
+        dlg.setWindowModality(Qt.WindowModal)
+        dlg.setMinimumDuration(300)
+
+        from ui_pyside6.workers.export_worker import ExportWorker
+        worker = ExportWorker(self._db_path, path, kind, params, self)
+        self._export_worker = worker
+
+        def _on_progress(count: int) -> None:
+            if total: dlg.setValue(min(count, total))
+            dlg.setLabelText(f"正在导出… 已写出 {count} 行")
+
+        def _on_done() -> None:
+            dlg.reset()
+            self._export_worker = None
+            worker.deleteLater()
+
+        worker.progress.connect(_on_progress)
+        worker.succeeded.connect(lambda n: self._msg(f"导出完成，共 {n} 行：\n{path}"))
+        worker.failed.connect(lambda err: QMessageBox.warning(self, "导出失败", err))
+        worker.finished.connect(_on_done)
+        dlg.canceled.connect(worker.cancel)
+        worker.start()
 
     @staticmethod
     def _is_int(s: str) -> bool:
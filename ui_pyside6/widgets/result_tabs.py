@@ -0,0 +1,53 @@
+# ui_pyside6/widgets/result_tabs.py
+# -*- coding: utf-8 -*-
+"""
+结果页签：多次检索的结果并排保留。页签只记录条目编号数组与查询状态（查询、分页游标、
+当前行、顶部可见行），条目存放在共享的 EntryStore 中；表格与时间轴只有一份，
+始终显示当前页签，其余页签不持有任何表格单元格。
+"""
+
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from PySide6.QtWidgets import QTabBar
+
+
+@dataclass
+class ResultTab:
+    title: str = "结果"
+    entry_ids: array = field(default_factory=lambda: array("q"))
+    query: Optional[Tuple[str, Dict[str, Any]]] = None
+    # RankedSearch / PagedResult，“加载更多”时继续读取
+    pager: Optional[Any] = None
+    current: int = -1
+    top: int = 0
+
+
+class ResultTabBar(QTabBar):
+    """可关闭、可拖动排序的页签栏，每个页签的 tabData 为对应的 ResultTab"""
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.setTabsClosable(True)
+        self.setMovable(True)
+        self.setExpanding(False)
+        self.setDocumentMode(True)
+
+    def add_tab(self, tab: ResultTab) -> int:
+        index = self.addTab(tab.title)
+        self.setTabData(index, tab)
+        return index
+
+    def tab(self, index: int) -> ResultTab:
+        return self.tabData(index)
+
+    def tabs(self) -> List[ResultTab]:
+        return [self.tabData(i) for i in range(self.count())]
+
+    def set_title(self, index: int, title: str, tooltip: str = "") -> None:
+        self.tab(index).title = title
+        self.setTabText(index, title)
+        self.setTabToolTip(index, tooltip or title)
@@ -1,83 +1,192 @@
 # ui/widgets/timeline_widget.py
 """
 TimelineWidget：提示文本加入 period、regime
+
+节点不再逐条创建图元，而是在 drawForeground 中按可见区域直接绘制；
+同一年的多个条目自上而下分道排列。行号与节点之间用预先算好的映射互查：
+行号 -> (年份列, 道) 数组，(年份, 道) -> 行号 字典，选中与点击都不遍历图元。
 """
 
 from __future__ import annotations
 
-from typing import List
+from array import array
+from typing import Dict, List, Optional, Tuple
 
-from PySide6.QtCore import QPointF, QRectF, Qt
+from PySide6.QtCore import QEvent, QPointF, QRectF, Qt
 from PySide6.QtGui import QColor, QPainter, QPen
-from PySide6.QtWidgets import (
-    QGraphicsEllipseItem,
-    QGraphicsItem,
-    QGraphicsScene,
-    QGraphicsTextItem,
-    QGraphicsView,
-)
+from PySide6.QtWidgets import QGraphicsScene, QGraphicsView, QToolTip
 
 from core.models.history_entry import HistoryEntry
+from ui_pyside6.widgets.result_model import ResultModel
 
 
 class TimelineWidget(QGraphicsView):
     _year_span = 10
+    _lane_height = 14
+    _axis_y = 18
+    _lanes_top = 26
+    _radius = 4
 
     def __init__(self, parent=None) -> None:
         super().__init__(parent)
         self.setRenderHint(QPainter.RenderHint.Antialiasing)
         self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOn)
-        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
+        self.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop)
         self._scene = QGraphicsScene(self)
         self.setScene(self._scene)
         self._entries: List[HistoryEntry] = []
+        self._model: Optional[ResultModel] = None
+        self._current = -1
+        # 行号 -> 节点位置
+        self._min_year = 0
+        self._node_year = array("i")
+        self._node_lane = array("i")
+        # (年份, 道) -> 行号；年份 -> 该年道数
+        self._slots: Dict[Tuple[int, int], int] = {}
+        self._lanes: Dict[int, int] = {}
 
     # ---------- API ----------
+    def set_model(self, model: ResultModel) -> None:
+        """与表格共用结果集：结果变化时重排节点，当前行变化时高亮并滚动到节点"""
+        self._model = model
+        model.entries_changed.connect(lambda: self.set_entries(model.entries()))
+        model.current_changed.connect(self.set_current)
+
     def set_entries(self, entries: List[HistoryEntry]) -> None:
         self._entries = entries
+        self._current = -1
         self._rebuild_scene()
 
+    def item_count(self) -> int:
+        """场景中的图元数（供诊断面板显示）"""
+        return len(self._scene.items())
+
+    def node_count(self) -> int:
+        return len(self._entries)
+
+    def set_current(self, row: int) -> None:
+        """高亮第 row 行对应的节点并滚动到可见处；-1 取消高亮"""
+        if not 0 <= row < len(self._entries):
+            row = -1
+        previous, self._current = self._current, row
+        if previous >= 0:
+            self._scene.update(self._node_rect(previous))
+        if row >= 0:
+            rect = self._node_rect(row)
+            self._scene.update(rect)
+            self.ensureVisible(rect, 40, 10)
+
+    def row_at(self, pos: QPointF) -> int:
+        """场景坐标处节点的行号，没有节点时为 -1"""
+        if not self._entries or pos.x() < 0 or pos.y() < self._lanes_top:
+            return -1
+        year = self._min_year + int(pos.x() // self._year_span)
+        lane = int((pos.y() - self._lanes_top) // self._lane_height)
+        return self._slots.get((year, lane), -1)
+
+    # ---------- 布局 ----------
     def _rebuild_scene(self) -> None:
         self._scene.clear()
+        self._slots = {}
+        self._lanes = {}
+        self._node_year = array("i", bytes(4 * len(self._entries)))
+        self._node_lane = array("i", bytes(4 * len(self._entries)))
         if not self._entries:
             self._scene.setSceneRect(QRectF(0, 0, 1, 1))
             return
 
-        min_y = min(e.year_ad for e in self._entries)
-        max_y = max(e.year_ad for e in self._entries)
-        w = (max_y - min_y + 1) * self._year_span
-        self._scene.setSceneRect(0, 0, w, 120)
+        lanes = self._lanes
+        for row, e in enumerate(self._entries):
+            lane = lanes.get(e.year_ad, 0)
+            lanes[e.year_ad] = lane + 1
+            self._node_year[row] = e.year_ad
+            self._node_lane[row] = lane
+            self._slots[(e.year_ad, lane)] = row
+        self._min_year = min(lanes)
+        max_year = max(lanes)
+        w = (max_year - self._min_year + 1) * self._year_span
+        h = self._lanes_top + max(lanes.values()) * self._lane_height + 4
+        self._scene.setSceneRect(0, 0, w, h)
 
         base_pen = QPen(QColor("#888"), 2)
-        self._scene.addLine(0, 60, w, 60, base_pen)
-
-        for e in self._entries:
-            x = (e.year_ad - min_y) * self._year_span
-            self._create_node(x, e)
-
-    def _create_node(self, x: float, e: HistoryEntry) -> None:
-        r = 4
-        dot: QGraphicsEllipseItem = self._scene.addEllipse(
-            QRectF(x - r, 60 - r, r * 2, r * 2),
-            QPen(Qt.PenStyle.NoPen),
-            QColor("#1e88e5"),
-        )
-        dot.setToolTip(self._tooltip(e))
-        dot.setZValue(1)
+        self._scene.addLine(0, self._axis_y, w, self._axis_y, base_pen)
 
-        txt: QGraphicsTextItem = self._scene.addText(
-            f"{e.reign_title}{int(e.regnal_year)}"
-        )
-        txt.setDefaultTextColor(QColor("#333"))
-        txt.setPos(QPointF(x - txt.boundingRect().width() / 2, 30))
-        txt.setToolTip(self._tooltip(e))
-        txt.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable)
+    def _node_center(self, row: int) -> QPointF:
+        x = (self._node_year[row] - self._min_year) * self._year_span + self._year_span / 2
+        y = self._lanes_top + self._node_lane[row] * self._lane_height + self._lane_height / 2
+        return QPointF(x, y)
+
+    def _node_rect(self, row: int) -> QRectF:
+        """节点及其标签的重绘范围"""
+        c = self._node_center(row)
+        return QRectF(c.x() - 8, c.y() - 8, 160, 16)
+
+    # ---------- 绘制 ----------
+    def drawForeground(self, painter: QPainter, rect: QRectF) -> None:
+        if not self._entries:
+            return
+        span = self._year_span
+        first = max(int(rect.left() // span), 0)
+        last = int(rect.right() // span) + 1
+        lane_lo = max(int((rect.top() - self._lanes_top) // self._lane_height), 0)
+        lane_hi = int((rect.bottom() - self._lanes_top) // self._lane_height) + 1
+
+        # 公元刻度：整十（或更大的整数倍）年份，约每 60 像素一个；没有公元 0 年
+        step = max(10, -(-60 // span // 10) * 10)
+        painter.setPen(QColor("#666"))
+        first_tick = -(-(self._min_year + first) // step) * step
+        for year in range(first_tick, self._min_year + last + 1, step):
+            if year == 0:
+                continue
+            x = (year - self._min_year) * span
+            painter.drawLine(QPointF(x, self._axis_y - 3), QPointF(x, self._axis_y + 3))
+            painter.drawText(QPointF(x + 2, self._axis_y - 5), str(year))
+
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor("#1e88e5"))
+        r = self._radius
+        for year in range(self._min_year + first, self._min_year + last + 1):
+            for lane in range(lane_lo, min(lane_hi + 1, self._lanes.get(year, 0))):
+                row = self._slots[(year, lane)]
+                if row != self._current:
+                    painter.drawEllipse(self._node_center(row), r, r)
+
+        if self._current >= 0:
+            c = self._node_center(self._current)
+            painter.setBrush(QColor("#fb8c00"))
+            painter.drawEllipse(c, r + 2, r + 2)
+            painter.setPen(QColor("#333"))
+            painter.drawText(QPointF(c.x() + r + 4, c.y() + 4), self._label(self._entries[self._current]))
+
+    # ---------- 交互 ----------
+    def mousePressEvent(self, event) -> None:
+        row = self.row_at(self.mapToScene(event.position().toPoint()))
+        if row >= 0 and self._model is not None:
+            self._model.set_current(row)
+        super().mousePressEvent(event)
+
+    def viewportEvent(self, event) -> bool:
+        if event.type() == QEvent.Type.ToolTip:
+            row = self.row_at(self.mapToScene(event.pos()))
+            if row >= 0:
+                QToolTip.showText(event.globalPos(), self._tooltip(self._entries[row]), self)
+            else:
+                QToolTip.hideText()
+            return True
+        return super().viewportEvent(event)
+
+    @staticmethod
+    def _label(e: HistoryEntry) -> str:
+        regnal = int(e.regnal_year) if e.regnal_year is not None else ""
+        return f"{e.year_ad} {e.reign_title or e.emperor_title or e.emperor_name or e.regime}{regnal}"
 
     @staticmethod
     def _tooltip(e: HistoryEntry) -> str:
+        regnal = f" 第 {int(e.regnal_year)} 年" if e.regnal_year is not None else ""
         return (
             f"{e.year_ad}（{e.ganzhi}）\n"
             f"{e.period}·{e.regime}\n"
-            f"{e.emperor_title}·{e.emperor_name}\n"
-            f"{e.reign_title} 第 {int(e.regnal_year)} 年"
+            f"{e.emperor_title or ''}·{e.emperor_name or ''}\n"
+            f"{e.reign_title or ''}{regnal}"
         )
@@ -0,0 +1,61 @@
+# ui_pyside6/workers/export_worker.py
+# -*- coding: utf-8 -*-
+"""
+后台导出线程：在独立线程中打开只读连接，流式写出查询结果并汇报进度
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+from PySide6.QtCore import QThread, Signal
+
+from core.data.repository import ChronologyRepository
+from core.services.chronology_service import ChronologyService
+from core.services.export_service import ExportCancelled
+
+
+class ExportWorker(QThread):
+    """导出工作线程：SQLite 连接不能跨线程共享，因此在线程内新建仓库"""
+
+    progress = Signal(int)      # 已写出行数
+    succeeded = Signal(int)     # 导出完成，总行数
+    failed = Signal(str)        # 出错信息
+    cancelled = Signal()
+
+    def __init__(
+        self,
+        db_path: str,
+        out_path: str,
+        kind: str,
+        params: Optional[Dict[str, Any]] = None,
+        parent=None,
+    ) -> None:
+        super().__init__(parent)
+        self._db_path = db_path
+        self._out_path = out_path
+        self._kind = kind
+        self._params = params
+        self._cancel_requested = False
+
+    def cancel(self) -> None:
+        self._cancel_requested = True
+
+    def run(self) -> None:
+        repo = ChronologyRepository(self._db_path)
+        try:
+            count = ChronologyService(repo).export_query(
+                self._out_path,
+                self._kind,
+                self._params,
+                progress=self.progress.emit,
+                cancelled=lambda: self._cancel_requested,
+            )
+        except ExportCancelled:
+            self.cancelled.emit()
+        except Exception as exc:
+            self.failed.emit(str(exc))
+        else:
+            self.succeeded.emit(count)
+        finally:
+            repo.close()